@@ -2,7 +2,27 @@ from .config import (
     categorias,
     tipos,
     arquivo_final_dados,
-    filtros_validos
+    filtros_validos,
+    armazenamento_lancamentos,
+    sincronizar_journal,
+    diretorio_pdf,
+    processos_pdf,
+    url_api_telegram,
+    timeout_telegram,
+    conexoes_telegram,
+    janela_telegram,
+    taxa_telegram,
+    rajada_telegram,
+    tentativas_telegram,
+    espera_telegram,
+    espera_encerramento_telegram,
+    retencao_notificacoes_quantidade,
+    retencao_notificacoes_dias,
+    periodo_planejamento_meses
 )
 
-__all__ = ['categorias', 'tipos', 'arquivo_final_dados', 'filtros_validos']
\ No newline at end of file
+__all__ = ['categorias', 'tipos', 'arquivo_final_dados', 'filtros_validos', 'armazenamento_lancamentos', 'sincronizar_journal',
+           'diretorio_pdf', 'processos_pdf', 'url_api_telegram', 'timeout_telegram', 'conexoes_telegram',
+           'janela_telegram', 'taxa_telegram', 'rajada_telegram', 'tentativas_telegram', 'espera_telegram',
+           'espera_encerramento_telegram',
+           'retencao_notificacoes_quantidade', 'retencao_notificacoes_dias', 'periodo_planejamento_meses']
\ No newline at end of file
@@ -3,6 +3,50 @@ categorias = ['Moradia', 'Alimentação', 'Transporte', 'Saúde', 'Educação',
 tipos = ['receita', 'despesa']
 
 ### Para filtrar a lista de lancamentos ###
-filtros_validos = {'valor', 'data', 'tipo', 'categoria'}
+filtros_validos = {'valor', 'data', 'tipo', 'categoria',
+                   'data_inicio', 'data_fim', 'valor_min', 'valor_max'}
 
-arquivo_final_dados = "data/lancamentos.json"
\ No newline at end of file
+arquivo_final_dados = "data/lancamentos.json"
+
+### Armazenamento dos lançamentos: "memoria" (JSON + journal), "colunar" (mesmos arquivos,
+### colunas compactas para ledgers grandes) ou "sqlite" ###
+armazenamento_lancamentos = "memoria"
+
+### Journal dos lançamentos: True = os.fsync a cada escrita (sobrevive a queda do sistema ou
+### de energia); False = só flush (sobrevive apenas a queda do processo, escritas mais rápidas) ###
+sincronizar_journal = True
+
+### Exportação de relatórios em PDF: diretório de saída (relativo à raiz do projeto)
+### e número de processos da exportação em segundo plano, PDFs e gráficos (None = nº de CPUs) ###
+diretorio_pdf = "tests/pdf_files"
+processos_pdf = None
+
+### Envio de notificações pelo Telegram: URL base da API, timeout das requisições
+### em segundos (conexão, leitura) e tamanho do pool de conexões HTTP ###
+url_api_telegram = "https://api.telegram.org"
+timeout_telegram = (3.05, 10)
+conexoes_telegram = 4
+
+### Despacho das notificações: janela (s) em que mensagens do mesmo chat são agrupadas,
+### limite de taxa (mensagens por segundo e rajada máxima) e repetição de falhas
+### transitórias (nº de tentativas e espera inicial em s, dobrada a cada tentativa) ###
+janela_telegram = 2.0
+taxa_telegram = 25.0
+rajada_telegram = 25
+tentativas_telegram = 4
+espera_telegram = 0.5
+
+### Tempo máximo (s) que o encerramento do programa espera pelos envios em andamento;
+### o que não for entregue fica pendente na caixa de saída e sai na próxima execução ###
+espera_encerramento_telegram = 5.0
+
+### Retenção do histórico de notificações: quantidade máxima e idade máxima (dias) mantidas
+### em memória e em notificacoes.json; as demais vão para arquivos mensais comprimidos
+### (None = sem limite; desativada por padrão, ver README) ###
+retencao_notificacoes_quantidade = None
+retencao_notificacoes_dias = None
+
+
+### Período do planejamento: nº de meses (o mês da despesa e os anteriores) cujas despesas
+### são comparadas ao limite da categoria; o limite mensal é multiplicado por esse número ###
+periodo_planejamento_meses = 1
@@ -89,7 +89,8 @@ def menu_relatorio():
         print("\n===== Menu Relatório =====")
         print("1. Gerar um relatório financeiro em um período específico")
         print("2. Gerar um comparativo entre dois anos completos")
-        print("3. Sair")
+        print("3. Gerar uma tabela de tendência de vários anos")
+        print("4. Sair")
         
         opcao = input("Escolha uma opção: ")
 
@@ -124,8 +125,19 @@ def menu_relatorio():
             else:
                 print("\nErro na elaboração do comparativo.")
 
-
         elif opcao == "3":
+            ano_inicio = int(input("Escolha o primeiro ano: "))
+            ano_fim = int(input("Escolha o último ano: "))
+            response = gerar_comparativo_anos(list(range(ano_inicio, ano_fim + 1)))
+            if (response["Status"] == 200):
+                print(f"\n{'Ano':<6} {'Receitas':>12} {'Despesas':>12} {'Saldo final':>12}")
+                for ano, resumo in response["Content"].items():
+                    print(f"{ano:<6} {resumo['receitas']['total']:>12.2f} "
+                          f"{resumo['despesas']['total']:>12.2f} {resumo['saldoFinal']:>12.2f}")
+            else:
+                print("\nErro na elaboração da tabela de tendência.")
+
+        elif opcao == "4":
             print("\nSaindo...")
             break
 
@@ -319,6 +331,30 @@ def menu_lancamentos():
                     print("Data inválida. Use o formato YYYY-MM-DD.")
                     continue
 
+            # Faixa de datas
+            data_inicio_str = input("Data inicial (YYYY-MM-DD): ").strip()
+            data_fim_str = input("Data final (YYYY-MM-DD): ").strip()
+            try:
+                if data_inicio_str:
+                    filtros["data_inicio"] = datetime.strptime(data_inicio_str, "%Y-%m-%d")
+                if data_fim_str:
+                    filtros["data_fim"] = datetime.strptime(data_fim_str, "%Y-%m-%d")
+            except ValueError:
+                print("Data inválida. Use o formato YYYY-MM-DD.")
+                continue
+
+            # Faixa de valores
+            valor_min_str = input("Valor mínimo: ").strip()
+            valor_max_str = input("Valor máximo: ").strip()
+            try:
+                if valor_min_str:
+                    filtros["valor_min"] = float(valor_min_str)
+                if valor_max_str:
+                    filtros["valor_max"] = float(valor_max_str)
+            except ValueError:
+                print("Valor inválido. Digite um número.")
+                continue
+
             # Tipo
             tipo = input("Tipo (receita/despesa): ").strip().lower()
             if tipo:
@@ -335,14 +371,23 @@ def menu_lancamentos():
                     continue
                 filtros["categoria"] = categoria
 
-            # Consulta
-            response = listarLancamentos(filtros)
-            if response["Status"] == 200:
+            # Consulta paginada
+            cursor = None
+            while True:
+                response = paginarLancamentos(filtros, limite=20, cursor=cursor)
+                if response["Status"] != 200:
+                    print(f"\n❌ {response['Content']}")
+                    break
+
                 print("\n📄 Lançamentos encontrados:")
-                for lanc in response["Content"]:
+                for lanc in response["Content"]["lancamentos"]:
                     print(f"- ID {lanc['id']} | {lanc['descricao']} | R$ {lanc['valor']} | {lanc['data'].strftime('%Y-%m-%d')} | {lanc['tipo']} | {lanc['categoria']}")
-            else:
-                print(f"\n❌ {response['Content']}")
+
+                cursor = response["Content"]["proximo_cursor"]
+                if cursor is None:
+                    break
+                if input("\nEnter para a próxima página, 'q' para parar: ").strip().lower() == "q":
+                    break
 
         elif opcao == "5":
             # Cálculo do saldo mensal
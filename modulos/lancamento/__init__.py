@@ -1,19 +1,44 @@
 from .lancamento import (
     criarLancamento,
+    importarLancamentos,
     editarLancamento,
     removerLancamento,
     listarLancamentos,
+    iterarLancamentos,
+    paginarLancamentos,
     calcularSaldoMensal,
+    calcularSaldosMensais,
+    calcularSaldoAte,
     resetarDados,
     setArquivoPersistencia,
-    somarDespesasPorCategoria
+    setArmazenamento,
+    somarDespesasPorCategoria,
+    verificarConsistencia,
+    obterVersaoDados,
+    obterSnapshotLancamentos,
+    obterAlteracoesDesde,
+    aquecerLancamentos
 )
+from .importacao import lerLancamentosCSV, lerLancamentosJSONL
 
 __all__ = ['criarLancamento', 
+           'importarLancamentos',
+           'lerLancamentosCSV',
+           'lerLancamentosJSONL',
            'editarLancamento', 
            'removerLancamento',
            'listarLancamentos',
+           'iterarLancamentos',
+           'paginarLancamentos',
            'calcularSaldoMensal', 
+           'calcularSaldosMensais',
+           'calcularSaldoAte',
            'setArquivoPersistencia', 
+           'setArmazenamento',
            'resetarDados', 
-           "somarDespesasPorCategoria"]
\ No newline at end of file
+           "somarDespesasPorCategoria",
+           "verificarConsistencia",
+           "obterVersaoDados",
+           "obterSnapshotLancamentos",
+           "obterAlteracoesDesde",
+           "aquecerLancamentos"]
\ No newline at end of file
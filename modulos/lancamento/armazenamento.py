@@ -0,0 +1,574 @@
+"""
+Armazenamento em memória dos lançamentos financeiros
+INF1301 - Programação Modular
+
+Os lançamentos ficam num dicionário indexado pelo ID, com índices
+secundários (categoria, tipo e data) e agregados (totais mensais e
+despesas por categoria, no total e por mês) atualizados a cada operação.
+
+O saldo acumulado até uma data vem de um vetor de somas de prefixo
+(receita - despesa) alinhado à ordem de datas: uma busca binária por
+consulta. Inclusões no fim da ordem (o caso comum) estendem o vetor em
+O(1); alterações no meio o invalidam e ele é refeito na próxima consulta.
+
+Persistência: snapshot JSON + journal de operações. Cada criação/edição/
+remoção é acrescentada ao journal em O(1) (uma importação em lote, numa
+única escrita); ao carregar, o journal é reaplicado sobre o snapshot. Quando
+o journal fica maior que o próprio ledger (e que _LIMITE_JOURNAL), ele é
+compactado num novo snapshot.
+
+Com config.sincronizar_journal (padrão), cada escrita no journal e cada novo
+snapshot passam por os.fsync antes de a operação retornar, então sobrevivem
+a uma queda do sistema ou de energia; sem ele, só a uma queda do processo.
+Uma linha do journal incompleta ou mal formada (queda durante a escrita)
+encerra a reaplicação e é descartada.
+
+Todos os armazenamentos (ver também armazenamento_sqlite) oferecem a mesma
+interface, usada pelas funções públicas de modulos.lancamento.
+"""
+
+import json
+import math
+import os
+from bisect import bisect_left, bisect_right
+from datetime import datetime
+from itertools import accumulate, islice
+from typing import Dict, List, Optional, Set, Tuple
+
+from config import sincronizar_journal
+
+_LIMITE_JOURNAL = 10_000
+_SINCRONIZAR = sincronizar_journal
+
+_CAMPOS = ('id', 'descricao', 'valor', 'data', 'tipo', 'categoria')
+
+
+def _serializar(lancamento):
+    """Cópia do lançamento com a data em ISO para serialização JSON"""
+    lancamento_copy = lancamento.copy()
+    if isinstance(lancamento_copy['data'], datetime):
+        lancamento_copy['data'] = lancamento_copy['data'].isoformat()
+    return lancamento_copy
+
+
+def _sincronizar_diretorio(caminho):
+    """Grava no disco a entrada do diretório (o rename de um novo snapshot)"""
+    try:
+        descritor = os.open(os.path.dirname(os.path.abspath(caminho)), os.O_RDONLY)
+    except OSError:
+        return  # sistemas sem fsync de diretório (Windows)
+    try:
+        os.fsync(descritor)
+    except OSError:
+        pass
+    finally:
+        os.close(descritor)
+
+
+def _valor_assinado(lancamento):
+    """Valor com sinal: positivo para receita, negativo para despesa"""
+    if lancamento['tipo'] == 'receita':
+        return lancamento['valor']
+    if lancamento['tipo'] == 'despesa':
+        return -lancamento['valor']
+    return 0.0
+
+
+class ArmazenamentoMemoria:
+    """Lançamentos em memória, indexados, persistidos em snapshot JSON + journal"""
+
+    def __init__(self, arquivo_dados: str):
+        self._arquivo_dados = arquivo_dados
+        self._arquivo_journal = os.path.splitext(arquivo_dados)[0] + '.journal'
+        self._journal = None
+        self._entradas_journal = 0
+        self._proximo_id = 1
+
+        # Dados encapsulados - lançamentos indexados pelo ID
+        # (o dicionário preserva a ordem de inserção, usada na persistência)
+        self._lancamentos: Dict[int, Dict[str, object]] = {}
+
+        # Índices secundários usados na filtragem
+        self._indice_categoria: Dict[str, Set[int]] = {}
+        self._indice_tipo: Dict[str, Set[int]] = {}
+        self._indice_data: List[Tuple[datetime, int]] = []   # (data, id) em ordem crescente
+
+        # Somas de prefixo do valor assinado, alinhadas a _indice_data (None = refazer)
+        self._saldos_acumulados: Optional[List[float]] = None
+
+        # Agregados: (ano, mes) -> {receita, despesa, quantidade},
+        # categoria -> {total, quantidade} das despesas
+        # e (ano, mes, categoria) -> {total, quantidade} das despesas do mês
+        self._totais_mensais: Dict[Tuple[int, int], Dict[str, float]] = {}
+        self._despesas_por_categoria: Dict[str, Dict[str, float]] = {}
+        self._despesas_mensais: Dict[Tuple[int, int, str], Dict[str, float]] = {}
+
+        self._carregar_dados()
+
+    # ----- Índices e agregados -----
+
+    def _acumular(self, lancamento, sinal):
+        """Soma (sinal=1) ou subtrai (sinal=-1) o lançamento dos agregados"""
+        chave = (lancamento['data'].year, lancamento['data'].month)
+        totais = self._totais_mensais.setdefault(chave, {'receita': 0.0, 'despesa': 0.0, 'quantidade': 0})
+        if lancamento['tipo'] in ('receita', 'despesa'):
+            totais[lancamento['tipo']] += sinal * lancamento['valor']
+        totais['quantidade'] += sinal
+        if totais['quantidade'] == 0:
+            # Descarta o mês vazio para não acumular resíduo de ponto flutuante
+            del self._totais_mensais[chave]
+
+        if lancamento['tipo'] == 'despesa':
+            categoria = lancamento['categoria']
+            for agregado, chave_despesa in ((self._despesas_por_categoria, categoria),
+                                            (self._despesas_mensais, chave + (categoria,))):
+                despesas = agregado.setdefault(chave_despesa, {'total': 0.0, 'quantidade': 0})
+                despesas['total'] += sinal * lancamento['valor']
+                despesas['quantidade'] += sinal
+                if despesas['quantidade'] == 0:
+                    del agregado[chave_despesa]
+
+    def _reconstruir_agregados(self):
+        """Recalcula os agregados a partir de todos os lançamentos"""
+        self._totais_mensais.clear()
+        self._despesas_por_categoria.clear()
+        self._despesas_mensais.clear()
+        self._saldos_acumulados = None
+        for lancamento in self._iterar():
+            self._acumular(lancamento, 1)
+
+    def _saldo_incluido(self, posicao, lancamento):
+        """Atualiza as somas de prefixo após incluir o lançamento na posição da ordem de datas"""
+        saldos = self._saldos_acumulados
+        if saldos is None:
+            return
+        if posicao == len(saldos):
+            saldos.append((saldos[-1] if saldos else 0.0) + _valor_assinado(lancamento))
+        else:
+            self._saldos_acumulados = None
+
+    def _saldo_retirado(self, posicao):
+        """Atualiza as somas de prefixo após retirar a posição da ordem de datas"""
+        saldos = self._saldos_acumulados
+        if saldos is None:
+            return
+        if posicao == len(saldos) - 1:
+            saldos.pop()
+        else:
+            self._saldos_acumulados = None
+
+    def _calcular_saldos_acumulados(self):
+        """Somas de prefixo do valor assinado na ordem de datas"""
+        return list(accumulate(_valor_assinado(self._lancamentos[id_lancamento])
+                               for _, id_lancamento in self._indice_data))
+
+    def _posicao_da_data(self, data):
+        """Quantidade de lançamentos com data anterior a `data`"""
+        return bisect_left(self._indice_data, (data,))
+
+    # ----- Representação das linhas (redefinida em ArmazenamentoColunar) -----
+
+    def _montar(self, lancamentos):
+        """Adota os lançamentos carregados (id -> dicionário) e recria índices e agregados"""
+        self._lancamentos = lancamentos
+        self._indice_categoria.clear()
+        self._indice_tipo.clear()
+        for lancamento in lancamentos.values():
+            self._indice_categoria.setdefault(lancamento['categoria'], set()).add(lancamento['id'])
+            self._indice_tipo.setdefault(lancamento['tipo'], set()).add(lancamento['id'])
+        self._indice_data = sorted((l['data'], l['id']) for l in lancamentos.values())
+        self._reconstruir_agregados()
+
+    def _iterar(self):
+        """Percorre todos os lançamentos (sem cópia)"""
+        return iter(self._lancamentos.values())
+
+    def _quantidade(self):
+        return len(self._lancamentos)
+
+    def _guardar(self, lancamento):
+        """Inclui um lançamento nos dados e nos índices secundários"""
+        self._lancamentos[lancamento['id']] = lancamento
+        self._indice_categoria.setdefault(lancamento['categoria'], set()).add(lancamento['id'])
+        self._indice_tipo.setdefault(lancamento['tipo'], set()).add(lancamento['id'])
+        chave = (lancamento['data'], lancamento['id'])
+        posicao = bisect_right(self._indice_data, chave)
+        self._indice_data.insert(posicao, chave)
+        self._saldo_incluido(posicao, lancamento)
+
+    def _guardar_lote(self, lancamentos):
+        """Inclui vários lançamentos (IDs novos e crescentes), reordenando o índice de datas uma única vez"""
+        for lancamento in lancamentos:
+            self._lancamentos[lancamento['id']] = lancamento
+            self._indice_categoria.setdefault(lancamento['categoria'], set()).add(lancamento['id'])
+            self._indice_tipo.setdefault(lancamento['tipo'], set()).add(lancamento['id'])
+        chaves = sorted((l['data'], l['id']) for l in lancamentos)
+        if self._indice_data and chaves[0] < self._indice_data[-1]:
+            # Fora de ordem: uma ordenação (timsort aproveita os dois trechos já ordenados)
+            self._indice_data.extend(chaves)
+            self._indice_data.sort()
+            self._saldos_acumulados = None
+        else:
+            for chave in chaves:
+                self._indice_data.append(chave)
+                self._saldo_incluido(len(self._indice_data) - 1, self._lancamentos[chave[1]])
+
+    def _retirar(self, id_lancamento):
+        """Retira um lançamento dos dados e dos índices secundários e o retorna"""
+        lancamento = self._lancamentos.pop(id_lancamento)
+        self._indice_categoria[lancamento['categoria']].discard(id_lancamento)
+        self._indice_tipo[lancamento['tipo']].discard(id_lancamento)
+        posicao = bisect_left(self._indice_data, (lancamento['data'], id_lancamento))
+        del self._indice_data[posicao]
+        self._saldo_retirado(posicao)
+        return lancamento
+
+    # ----- Persistência -----
+
+    def _registrar(self, *operacoes):
+        """Acrescenta operações ao journal (numa única escrita) e compacta se ele cresceu demais"""
+        try:
+            if self._journal is None:
+                self._journal = open(self._arquivo_journal, 'a', encoding='utf-8')
+            self._journal.write(''.join(json.dumps(operacao, ensure_ascii=False, separators=(',', ':')) + '\n'
+                                        for operacao in operacoes))
+            self._journal.flush()
+            if _SINCRONIZAR:
+                os.fsync(self._journal.fileno())
+        except IOError:
+            # Em caso de erro ao salvar, continua com dados em memória
+            return
+
+        self._entradas_journal += len(operacoes)
+        if self._entradas_journal >= max(_LIMITE_JOURNAL, self._quantidade()):
+            self._salvar_dados()
+
+    def _aplicar(self, lancamentos, operacao):
+        """
+        Reaplica uma operação do journal sobre os lançamentos carregados.
+        As operações são idempotentes: reaplicá-las sobre um snapshot que já as
+        contém (queda entre gravar o snapshot e truncar o journal) não muda o resultado.
+        Levanta ValueError, sem alterar nada, se a operação estiver mal formada.
+        """
+        op = operacao.get('op') if isinstance(operacao, dict) else None
+        if op in ('criar', 'editar'):
+            lancamento = operacao.get('lancamento')
+            if (not isinstance(lancamento, dict) or any(campo not in lancamento for campo in _CAMPOS)
+                    or not isinstance(lancamento['id'], int) or not isinstance(lancamento['data'], str)):
+                raise ValueError("Operação mal formada")
+            lancamento['data'] = datetime.fromisoformat(lancamento['data'])
+            lancamentos[lancamento['id']] = lancamento
+            self._proximo_id = max(self._proximo_id, lancamento['id'] + 1)
+        elif op == 'remover' and isinstance(operacao.get('id'), int):
+            lancamentos.pop(operacao['id'], None)
+        else:
+            raise ValueError("Operação mal formada")
+
+    def _carregar_journal(self, lancamentos):
+        """
+        Reaplica o journal sobre os lançamentos carregados.
+        Retorna False se encontrar uma linha incompleta ou mal formada (queda
+        durante a escrita); ela e as seguintes não são reaplicadas.
+        """
+        self._entradas_journal = 0
+        if not os.path.exists(self._arquivo_journal):
+            return True
+
+        with open(self._arquivo_journal, 'r', encoding='utf-8') as arquivo:
+            for linha in arquivo:
+                try:
+                    self._aplicar(lancamentos, json.loads(linha))
+                except ValueError:  # inclui json.JSONDecodeError
+                    return False
+                self._entradas_journal += 1
+        return True
+
+    def _carregar_dados(self):
+        """Carrega o snapshot JSON e reaplica o journal"""
+        lancamentos = {}
+        if os.path.exists(self._arquivo_dados):
+            try:
+                with open(self._arquivo_dados, 'r', encoding='utf-8') as arquivo:
+                    dados = json.load(arquivo)
+                    self._proximo_id = dados.get('proximo_id', 1)
+
+                    # Converte strings de data de volta para datetime e indexa pelo ID
+                    for lancamento in dados.get('lancamentos', []):
+                        if isinstance(lancamento['data'], str):
+                            lancamento['data'] = datetime.fromisoformat(lancamento['data'])
+                        lancamentos[lancamento['id']] = lancamento
+            except (json.JSONDecodeError, KeyError, ValueError):
+                # Se houver erro no arquivo, reinicia com dados vazios
+                lancamentos = {}
+                self._proximo_id = 1
+
+        journal_completo = self._carregar_journal(lancamentos)
+        self._montar(lancamentos)
+
+        if not journal_completo:
+            # Descarta a linha incompleta antes de voltar a acrescentar operações
+            self._salvar_dados()
+
+    def _salvar_dados(self):
+        """Grava um novo snapshot JSON (de forma atômica) e esvazia o journal"""
+        dados_para_salvar = {
+            'lancamentos': [_serializar(l) for l in self._iterar()],
+            'proximo_id': self._proximo_id
+        }
+
+        arquivo_temporario = self._arquivo_dados + '.tmp'
+        try:
+            with open(arquivo_temporario, 'w', encoding='utf-8') as arquivo:
+                json.dump(dados_para_salvar, arquivo, ensure_ascii=False, separators=(',', ':'))
+                if _SINCRONIZAR:
+                    # O snapshot tem de estar no disco antes de o journal ser esvaziado
+                    arquivo.flush()
+                    os.fsync(arquivo.fileno())
+            os.replace(arquivo_temporario, self._arquivo_dados)
+            if _SINCRONIZAR:
+                _sincronizar_diretorio(self._arquivo_dados)
+
+            # O snapshot já contém todas as operações: o journal recomeça vazio
+            self.fechar()
+            open(self._arquivo_journal, 'w', encoding='utf-8').close()
+            self._entradas_journal = 0
+        except IOError:
+            # Em caso de erro ao salvar, continua com dados em memória
+            pass
+
+    def fechar(self):
+        """Fecha o journal aberto (os dados já estão gravados)"""
+        if self._journal is not None:
+            self._journal.close()
+            self._journal = None
+
+    # ----- Operações -----
+
+    def resetar(self):
+        """Apaga todos os lançamentos"""
+        self._montar({})
+        self._salvar_dados()
+
+    def existe(self, id_lancamento) -> bool:
+        """Consulta O(1) no índice por ID"""
+        return id_lancamento in self._lancamentos
+
+    def inserir(self, dados):
+        """Grava um novo lançamento (dados já validados) e retorna uma cópia com o ID"""
+        novo_lancamento = {'id': self._proximo_id, **dados}
+        self._guardar(novo_lancamento)
+        self._acumular(novo_lancamento, 1)
+        self._proximo_id += 1
+        self._registrar({'op': 'criar', 'lancamento': _serializar(novo_lancamento)})
+        return novo_lancamento.copy()
+
+    def inserir_lote(self, lista_dados):
+        """
+        Grava vários lançamentos (dados já validados) com IDs num único bloco
+        consecutivo, atualizando índices e agregados de uma vez. Retorna o range dos IDs.
+        """
+        ids = range(self._proximo_id, self._proximo_id + len(lista_dados))
+        if not ids:
+            return ids
+        novos = [{'id': id_lancamento, **dados} for id_lancamento, dados in zip(ids, lista_dados)]
+        self._guardar_lote(novos)
+        for lancamento in novos:
+            self._acumular(lancamento, 1)
+        self._proximo_id = ids.stop
+        if self._entradas_journal + len(novos) >= max(_LIMITE_JOURNAL, self._quantidade()):
+            # O journal seria compactado logo em seguida: grava direto o snapshot
+            self._salvar_dados()
+        else:
+            self._registrar(*({'op': 'criar', 'lancamento': _serializar(l)} for l in novos))
+        return ids
+
+    def atualizar(self, id_lancamento, dados):
+        """Substitui os dados de um lançamento existente"""
+        antigo = self._retirar(id_lancamento)
+        self._acumular(antigo, -1)
+        lancamento = {**antigo, **dados}
+        self._guardar(lancamento)
+        self._acumular(lancamento, 1)
+        self._registrar({'op': 'editar', 'lancamento': _serializar(lancamento)})
+
+    def remover(self, id_lancamento):
+        """Remove um lançamento existente"""
+        self._acumular(self._retirar(id_lancamento), -1)
+        self._registrar({'op': 'remover', 'id': id_lancamento})
+
+    def _ids_em_ordem_decrescente(self, inicio, fim, apos=None):
+        """
+        Percorre _indice_data[inicio:fim] da data mais recente para a mais antiga.
+        Lançamentos da mesma data saem em ordem de ID (ordem de criação).
+        Se `apos` = (data, id) for informado, retoma logo depois desse lançamento.
+        """
+        indice = self._indice_data
+        if apos is not None:
+            inicio_grupo = bisect_left(indice, (apos[0],), inicio, fim)
+            fim_grupo = bisect_right(indice, (apos[0], math.inf), inicio, fim)
+            for posicao in range(bisect_right(indice, apos, inicio, fim), fim_grupo):
+                yield indice[posicao][1]
+            fim = inicio_grupo
+
+        while fim > inicio:
+            data = indice[fim - 1][0]
+            grupo = fim - 1
+            while grupo > inicio and indice[grupo - 1][0] == data:
+                grupo -= 1
+            for posicao in range(grupo, fim):
+                yield indice[posicao][1]
+            fim = grupo
+
+    def _filtrar_ids(self, consulta, apos=None):
+        """
+        Gera os IDs que atendem à consulta, em ordem de data decrescente.
+
+        Parte do menor conjunto de candidatos (bucket de categoria ou tipo, ou a faixa
+        de datas do índice ordenado) e só testa os demais filtros nesses candidatos.
+        A faixa [inferior, superior) é localizada por busca binária: O(log n + k).
+        """
+        valor = consulta['valor']
+        valor_min = consulta['valor_min']
+        valor_max = consulta['valor_max']
+        inferior = consulta['inferior']
+        superior = consulta['superior']
+
+        conjuntos = []
+        if consulta['tipo'] is not None:
+            conjuntos.append(self._indice_tipo.get(consulta['tipo'], set()))
+        if consulta['categoria'] is not None:
+            conjuntos.append(self._indice_categoria.get(consulta['categoria'], set()))
+        conjuntos.sort(key=len)
+
+        inicio = bisect_left(self._indice_data, (inferior,)) if inferior is not None else 0
+        fim = bisect_left(self._indice_data, (superior,)) if superior is not None else len(self._indice_data)
+        fim = max(fim, inicio)
+
+        def atende(id_lancamento, demais):
+            if any(id_lancamento not in conjunto for conjunto in demais):
+                return False
+            valor_lancamento = self._lancamentos[id_lancamento]['valor']
+            return ((valor is None or valor_lancamento == valor)
+                    and (valor_min is None or valor_lancamento >= valor_min)
+                    and (valor_max is None or valor_lancamento <= valor_max))
+
+        if not conjuntos or fim - inicio <= len(conjuntos[0]):
+            # A faixa de datas é o menor conjunto: já sai ordenada
+            for id_lancamento in self._ids_em_ordem_decrescente(inicio, fim, apos):
+                if atende(id_lancamento, conjuntos):
+                    yield id_lancamento
+            return
+
+        def na_faixa(id_lancamento):
+            data_lancamento = self._lancamentos[id_lancamento]['data']
+            return ((inferior is None or data_lancamento >= inferior)
+                    and (superior is None or data_lancamento < superior))
+
+        def depois_do_cursor(id_lancamento):
+            data_lancamento = self._lancamentos[id_lancamento]['data']
+            return (data_lancamento < apos[0]
+                    or (data_lancamento == apos[0] and id_lancamento > apos[1]))
+
+        menor, demais = conjuntos[0], conjuntos[1:]
+        ids = sorted(
+            i for i in menor
+            if atende(i, demais) and na_faixa(i) and (apos is None or depois_do_cursor(i))
+        )
+        ids.sort(key=lambda i: self._lancamentos[i]['data'], reverse=True)
+        yield from ids
+
+    def filtrar(self, consulta, apos=None, limite=None, deslocamento=0):
+        """
+        Gera cópias dos lançamentos que atendem à consulta normalizada,
+        do mais recente ao mais antigo (empates em ordem de ID).
+        """
+        fim = None if limite is None else deslocamento + limite
+        for id_lancamento in islice(self._filtrar_ids(consulta, apos), deslocamento, fim):
+            yield self._lancamentos[id_lancamento].copy()
+
+    def totais_do_mes(self, ano, mes):
+        """Retorna (receitas, despesas) do mês"""
+        totais = self._totais_mensais.get((ano, mes))
+        return (totais['receita'], totais['despesa']) if totais else (0.0, 0.0)
+
+    def despesas_da_categoria(self, categoria, ano=None, mes=None):
+        """Total corrente das despesas da categoria (só do mês, se ano e mes forem informados)"""
+        if ano is None:
+            despesas = self._despesas_por_categoria.get(categoria)
+        else:
+            despesas = self._despesas_mensais.get((ano, mes, categoria))
+        return despesas['total'] if despesas else 0
+
+    def saldo_ate(self, data):
+        """Receitas menos despesas dos lançamentos anteriores a `data` (busca binária)"""
+        if self._saldos_acumulados is None:
+            self._saldos_acumulados = self._calcular_saldos_acumulados()
+        posicao = self._posicao_da_data(data)
+        return self._saldos_acumulados[posicao - 1] if posicao else 0.0
+
+    def _divergencias_indices(self):
+        """Compara os índices secundários com um recálculo completo"""
+        divergencias = []
+        categorias_esperadas: Dict[str, Set[int]] = {}
+        tipos_esperados: Dict[str, Set[int]] = {}
+        for lancamento in self._lancamentos.values():
+            categorias_esperadas.setdefault(lancamento['categoria'], set()).add(lancamento['id'])
+            tipos_esperados.setdefault(lancamento['tipo'], set()).add(lancamento['id'])
+
+        if {c: ids for c, ids in self._indice_categoria.items() if ids} != categorias_esperadas:
+            divergencias.append("Índice de categorias")
+        if {t: ids for t, ids in self._indice_tipo.items() if ids} != tipos_esperados:
+            divergencias.append("Índice de tipos")
+        if self._indice_data != sorted((l['data'], l['id']) for l in self._lancamentos.values()):
+            divergencias.append("Índice de datas")
+        return divergencias
+
+    def verificar_consistencia(self):
+        """
+        Compara índices e agregados com um recálculo completo.
+        Retorna a lista de divergências (vazia se tudo confere).
+        """
+        divergencias = self._divergencias_indices()
+
+        mensais_esperados: Dict[Tuple[int, int], Dict[str, float]] = {}
+        despesas_esperadas: Dict[str, float] = {}
+        despesas_mensais_esperadas: Dict[Tuple[int, int, str], float] = {}
+        for lancamento in self._iterar():
+            chave = (lancamento['data'].year, lancamento['data'].month)
+            totais = mensais_esperados.setdefault(chave, {'receita': 0.0, 'despesa': 0.0})
+            if lancamento['tipo'] in totais:
+                totais[lancamento['tipo']] += lancamento['valor']
+            if lancamento['tipo'] == 'despesa':
+                despesas_esperadas[lancamento['categoria']] = (
+                    despesas_esperadas.get(lancamento['categoria'], 0.0) + lancamento['valor'])
+                chave_despesa = chave + (lancamento['categoria'],)
+                despesas_mensais_esperadas[chave_despesa] = (
+                    despesas_mensais_esperadas.get(chave_despesa, 0.0) + lancamento['valor'])
+
+        if set(self._totais_mensais) != set(mensais_esperados):
+            divergencias.append("Meses dos totais mensais")
+        for chave, esperado in mensais_esperados.items():
+            obtido = self._totais_mensais.get(chave, {})
+            for tipo in ('receita', 'despesa'):
+                if not math.isclose(obtido.get(tipo, 0.0), esperado[tipo], abs_tol=1e-6):
+                    divergencias.append(f"Total de {tipo} em {chave[1]:02d}/{chave[0]}")
+
+        if self._saldos_acumulados is not None:
+            esperados = self._calcular_saldos_acumulados()
+            if len(esperados) != len(self._saldos_acumulados) or not all(
+                    math.isclose(a, b, abs_tol=1e-6) for a, b in zip(esperados, self._saldos_acumulados)):
+                divergencias.append("Saldos acumulados")
+
+        if set(self._despesas_por_categoria) != set(despesas_esperadas):
+            divergencias.append("Categorias das despesas")
+        for categoria, esperado in despesas_esperadas.items():
+            if not math.isclose(self.despesas_da_categoria(categoria), esperado, abs_tol=1e-6):
+                divergencias.append(f"Despesas da categoria {categoria}")
+
+        if set(self._despesas_mensais) != set(despesas_mensais_esperadas):
+            divergencias.append("Meses das despesas por categoria")
+        for (ano, mes, categoria), esperado in despesas_mensais_esperadas.items():
+            if not math.isclose(self.despesas_da_categoria(categoria, ano, mes), esperado, abs_tol=1e-6):
+                divergencias.append(f"Despesas da categoria {categoria} em {mes:02d}/{ano}")
+
+        return divergencias
@@ -0,0 +1,249 @@
+"""
+Armazenamento colunar em memória dos lançamentos financeiros
+INF1301 - Programação Modular
+
+Variante compacta do armazenamento em memória para ledgers grandes: em vez
+de um dicionário por lançamento, cada campo fica numa coluna contígua.
+
+  - valor: array('d')
+  - data: array('q') em microssegundos desde 1970-01-01 (datas sem fuso)
+  - tipo/categoria: códigos inteiros pequenos (array('H')) a partir de
+    config.tipos e config.categorias
+  - descrição: lista de strings internadas (descrições repetidas são
+    guardadas uma única vez)
+
+As linhas são mantidas em ordem de (data, id), então a própria coluna de
+datas serve de índice ordenado; um dicionário id -> data localiza a linha
+por busca binária. Os dicionários de lançamento só são montados na
+fronteira da API (consultas e persistência).
+
+Compromissos em relação a ArmazenamentoMemoria: inserções em ordem
+cronológica continuam baratas, mas inserções fora de ordem, edições e
+remoções deslocam as colunas (memmove O(n)); filtros por tipo/categoria
+sem faixa de datas percorrem as colunas. A persistência (snapshot JSON +
+journal) e os agregados são os mesmos, então os dois formatos leem os
+mesmos arquivos.
+"""
+
+import math
+import sys
+from array import array
+from bisect import bisect_left, bisect_right
+from datetime import datetime, timedelta
+from itertools import accumulate, chain, islice
+from typing import Dict, List
+
+from config import categorias, tipos
+from .armazenamento import ArmazenamentoMemoria
+
+_EPOCA = datetime(1970, 1, 1)
+_MICROSSEGUNDO = timedelta(microseconds=1)
+
+
+def _para_chave(data):
+    """Converte a data em microssegundos desde a época (ordena como a data)"""
+    return (data - _EPOCA) // _MICROSSEGUNDO
+
+
+def _para_data(chave):
+    return _EPOCA + timedelta(microseconds=chave)
+
+
+class _Codigos:
+    """Tabela de códigos inteiros para os valores de um campo categórico"""
+
+    def __init__(self, valores):
+        self.rotulos: List[str] = []
+        self._codigos: Dict[str, int] = {}
+        for valor in valores:
+            self.codificar(valor)
+
+    def codificar(self, valor):
+        """Código do valor, criando um novo se ele ainda não estiver na tabela"""
+        codigo = self._codigos.get(valor)
+        if codigo is None:
+            codigo = self._codigos[valor] = len(self.rotulos)
+            self.rotulos.append(valor)
+        return codigo
+
+    def buscar(self, valor):
+        """Código do valor, ou None se ele nunca foi usado"""
+        return self._codigos.get(valor)
+
+
+class ArmazenamentoColunar(ArmazenamentoMemoria):
+    """Lançamentos em colunas compactas, persistidos em snapshot JSON + journal"""
+
+    def __init__(self, arquivo_dados: str):
+        self._codigos_tipo = _Codigos(tipos)
+        self._codigos_categoria = _Codigos(categorias)
+        self._colunas_vazias()
+        super().__init__(arquivo_dados)
+
+        # A representação em dicionários não é usada por este armazenamento
+        self._lancamentos = None
+
+    def _colunas_vazias(self):
+        self._ids = array('q')
+        self._datas = array('q')
+        self._valores = array('d')
+        self._tipos = array('H')
+        self._categorias = array('H')
+        self._descricoes: List[str] = []
+        self._data_por_id: Dict[int, int] = {}
+        self._saldos_acumulados = None
+
+    # ----- Representação das linhas -----
+
+    def _linha(self, posicao):
+        """Monta o dicionário do lançamento na posição informada"""
+        return {
+            'id': self._ids[posicao],
+            'descricao': self._descricoes[posicao],
+            'valor': self._valores[posicao],
+            'data': _para_data(self._datas[posicao]),
+            'tipo': self._codigos_tipo.rotulos[self._tipos[posicao]],
+            'categoria': self._codigos_categoria.rotulos[self._categorias[posicao]]
+        }
+
+    def _posicao(self, id_lancamento):
+        """Localiza a linha do lançamento por busca binária em (data, id)"""
+        chave = self._data_por_id[id_lancamento]
+        inicio = bisect_left(self._datas, chave)
+        fim = bisect_right(self._datas, chave, inicio)
+        return bisect_left(self._ids, id_lancamento, inicio, fim)
+
+    def _montar(self, lancamentos):
+        """Converte os lançamentos carregados em colunas ordenadas por (data, id)"""
+        self._colunas_vazias()
+        linhas = sorted(lancamentos.values(), key=lambda l: (l['data'], l['id']))
+        lancamentos.clear()
+        for lancamento in linhas:
+            self._acrescentar(len(self._ids), lancamento)
+        self._reconstruir_agregados()
+
+    def _acrescentar(self, posicao, lancamento):
+        chave = _para_chave(lancamento['data'])
+        self._ids.insert(posicao, lancamento['id'])
+        self._datas.insert(posicao, chave)
+        self._valores.insert(posicao, lancamento['valor'])
+        self._tipos.insert(posicao, self._codigos_tipo.codificar(lancamento['tipo']))
+        self._categorias.insert(posicao, self._codigos_categoria.codificar(lancamento['categoria']))
+        self._descricoes.insert(posicao, sys.intern(lancamento['descricao']))
+        self._data_por_id[lancamento['id']] = chave
+        self._saldo_incluido(posicao, lancamento)
+
+    def _iterar(self):
+        return (self._linha(posicao) for posicao in range(len(self._ids)))
+
+    def _quantidade(self):
+        return len(self._ids)
+
+    def _guardar(self, lancamento):
+        chave = _para_chave(lancamento['data'])
+        inicio = bisect_left(self._datas, chave)
+        fim = bisect_right(self._datas, chave, inicio)
+        self._acrescentar(bisect_left(self._ids, lancamento['id'], inicio, fim), lancamento)
+
+    def _guardar_lote(self, lancamentos):
+        linhas = sorted(lancamentos, key=lambda l: (l['data'], l['id']))
+        if self._datas and _para_chave(linhas[0]['data']) < self._datas[-1]:
+            # Fora de ordem: refaz as colunas uma única vez em vez de deslocá-las a cada linha
+            linhas = sorted(chain(self._iterar(), linhas), key=lambda l: (l['data'], l['id']))
+            self._colunas_vazias()
+        for lancamento in linhas:
+            self._acrescentar(len(self._ids), lancamento)
+
+    def _retirar(self, id_lancamento):
+        posicao = self._posicao(id_lancamento)
+        lancamento = self._linha(posicao)
+        for coluna in (self._ids, self._datas, self._valores, self._tipos,
+                       self._categorias, self._descricoes):
+            del coluna[posicao]
+        del self._data_por_id[id_lancamento]
+        self._saldo_retirado(posicao)
+        return lancamento
+
+    def _calcular_saldos_acumulados(self):
+        sinais = [1.0 if tipo == 'receita' else -1.0 if tipo == 'despesa' else 0.0
+                  for tipo in self._codigos_tipo.rotulos]
+        return array('d', accumulate(valor * sinais[tipo] for valor, tipo in zip(self._valores, self._tipos)))
+
+    def _posicao_da_data(self, data):
+        return bisect_left(self._datas, _para_chave(data))
+
+    # ----- Operações -----
+
+    def existe(self, id_lancamento) -> bool:
+        return id_lancamento in self._data_por_id
+
+    def _posicoes_em_ordem_decrescente(self, inicio, fim, apos=None):
+        """
+        Percorre as linhas [inicio, fim) da data mais recente para a mais antiga,
+        com empates em ordem de ID; `apos` = (data, id) retoma depois desse lançamento.
+        """
+        datas = self._datas
+        if apos is not None:
+            chave = _para_chave(apos[0])
+            inicio_grupo = bisect_left(datas, chave, inicio, fim)
+            fim_grupo = bisect_right(datas, chave, inicio, fim)
+            yield from range(bisect_right(self._ids, apos[1], inicio_grupo, fim_grupo), fim_grupo)
+            fim = inicio_grupo
+
+        while fim > inicio:
+            grupo = bisect_left(datas, datas[fim - 1], inicio, fim)
+            yield from range(grupo, fim)
+            fim = grupo
+
+    def _filtrar_posicoes(self, consulta, apos=None):
+        """Gera as posições das linhas que atendem à consulta, em ordem de data decrescente"""
+        tipo = categoria = None
+        if consulta['tipo'] is not None:
+            tipo = self._codigos_tipo.buscar(consulta['tipo'])
+            if tipo is None:
+                return
+        if consulta['categoria'] is not None:
+            categoria = self._codigos_categoria.buscar(consulta['categoria'])
+            if categoria is None:
+                return
+
+        valor = consulta['valor']
+        valor_min = -math.inf if consulta['valor_min'] is None else consulta['valor_min']
+        valor_max = math.inf if consulta['valor_max'] is None else consulta['valor_max']
+        inferior = consulta['inferior']
+        superior = consulta['superior']
+
+        inicio = bisect_left(self._datas, _para_chave(inferior)) if inferior is not None else 0
+        fim = bisect_left(self._datas, _para_chave(superior)) if superior is not None else len(self._datas)
+        fim = max(fim, inicio)
+
+        tipos_, categorias_, valores = self._tipos, self._categorias, self._valores
+        for posicao in self._posicoes_em_ordem_decrescente(inicio, fim, apos):
+            if ((tipo is None or tipos_[posicao] == tipo)
+                    and (categoria is None or categorias_[posicao] == categoria)
+                    and (valor is None or valores[posicao] == valor)
+                    and valor_min <= valores[posicao] <= valor_max):
+                yield posicao
+
+    def filtrar(self, consulta, apos=None, limite=None, deslocamento=0):
+        """
+        Gera os lançamentos que atendem à consulta normalizada,
+        do mais recente ao mais antigo (empates em ordem de ID).
+        """
+        fim = None if limite is None else deslocamento + limite
+        for posicao in islice(self._filtrar_posicoes(consulta, apos), deslocamento, fim):
+            yield self._linha(posicao)
+
+    def _divergencias_indices(self):
+        """Confere o tamanho das colunas, a ordem (data, id) e o mapa id -> data"""
+        divergencias = []
+        quantidade = len(self._ids)
+        if any(len(coluna) != quantidade for coluna in (self._datas, self._valores, self._tipos,
+                                                        self._categorias, self._descricoes)):
+            divergencias.append("Tamanho das colunas")
+        chaves = list(zip(self._datas, self._ids))
+        if chaves != sorted(chaves):
+            divergencias.append("Ordem das colunas")
+        if self._data_por_id != {id_lancamento: chave for chave, id_lancamento in chaves}:
+            divergencias.append("Mapa de IDs")
+        return divergencias
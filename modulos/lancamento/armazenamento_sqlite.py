@@ -0,0 +1,180 @@
+"""
+Armazenamento SQLite dos lançamentos financeiros
+INF1301 - Programação Modular
+
+Alternativa ao armazenamento em memória para ledgers que não cabem (ou não
+devem ser carregados inteiros) na memória. Usa apenas o módulo sqlite3 da
+biblioteca padrão, com índices em data, categoria e tipo; filtros,
+ordenação, paginação e somas são executados pelo próprio SQLite.
+
+A data é gravada em ISO 8601, que ordena corretamente como texto.
+"""
+
+import sqlite3
+from datetime import datetime
+
+_ESQUEMA = """
+CREATE TABLE IF NOT EXISTS lancamentos (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    descricao TEXT NOT NULL,
+    valor REAL NOT NULL,
+    data TEXT NOT NULL,
+    tipo TEXT NOT NULL,
+    categoria TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_lancamentos_data ON lancamentos (data, id);
+CREATE INDEX IF NOT EXISTS idx_lancamentos_categoria ON lancamentos (categoria, tipo, data);
+CREATE INDEX IF NOT EXISTS idx_lancamentos_tipo ON lancamentos (tipo, data);
+"""
+
+_COLUNAS = "id, descricao, valor, data, tipo, categoria"
+
+
+def _para_lancamento(linha):
+    """Converte uma linha da tabela em dicionário de lançamento"""
+    id_lancamento, descricao, valor, data, tipo, categoria = linha
+    return {
+        'id': id_lancamento,
+        'descricao': descricao,
+        'valor': valor,
+        'data': datetime.fromisoformat(data),
+        'tipo': tipo,
+        'categoria': categoria
+    }
+
+
+class ArmazenamentoSQLite:
+    """Lançamentos numa tabela SQLite indexada"""
+
+    def __init__(self, arquivo_dados: str):
+        self._conexao = sqlite3.connect(arquivo_dados)
+        self._conexao.executescript(_ESQUEMA)
+
+    def fechar(self):
+        """Fecha a conexão com o banco"""
+        self._conexao.close()
+
+    # ----- Operações -----
+
+    def resetar(self):
+        """Apaga todos os lançamentos (os IDs continuam crescentes)"""
+        with self._conexao:
+            self._conexao.execute("DELETE FROM lancamentos")
+
+    def existe(self, id_lancamento) -> bool:
+        """Consulta pela chave primária"""
+        cursor = self._conexao.execute("SELECT 1 FROM lancamentos WHERE id = ?", (id_lancamento,))
+        return cursor.fetchone() is not None
+
+    def inserir(self, dados):
+        """Grava um novo lançamento (dados já validados) e retorna uma cópia com o ID"""
+        with self._conexao:
+            cursor = self._conexao.execute(
+                "INSERT INTO lancamentos (descricao, valor, data, tipo, categoria) VALUES (?, ?, ?, ?, ?)",
+                (dados['descricao'], dados['valor'], dados['data'].isoformat(), dados['tipo'], dados['categoria'])
+            )
+        return {'id': cursor.lastrowid, **dados}
+
+    def inserir_lote(self, lista_dados):
+        """
+        Grava vários lançamentos (dados já validados) numa única transação, com
+        IDs num bloco consecutivo após o maior já usado. Retorna o range dos IDs.
+        """
+        with self._conexao:
+            linha = self._conexao.execute(
+                "SELECT seq FROM sqlite_sequence WHERE name = 'lancamentos'").fetchone()
+            primeiro = (linha[0] if linha else 0) + 1
+            ids = range(primeiro, primeiro + len(lista_dados))
+            self._conexao.executemany(
+                "INSERT INTO lancamentos (id, descricao, valor, data, tipo, categoria) VALUES (?, ?, ?, ?, ?, ?)",
+                ((id_lancamento, dados['descricao'], dados['valor'], dados['data'].isoformat(),
+                  dados['tipo'], dados['categoria']) for id_lancamento, dados in zip(ids, lista_dados))
+            )
+        return ids
+
+    def atualizar(self, id_lancamento, dados):
+        """Substitui os dados de um lançamento existente"""
+        with self._conexao:
+            self._conexao.execute(
+                "UPDATE lancamentos SET descricao = ?, valor = ?, data = ?, tipo = ?, categoria = ? WHERE id = ?",
+                (dados['descricao'], dados['valor'], dados['data'].isoformat(),
+                 dados['tipo'], dados['categoria'], id_lancamento)
+            )
+
+    def remover(self, id_lancamento):
+        """Remove um lançamento existente"""
+        with self._conexao:
+            self._conexao.execute("DELETE FROM lancamentos WHERE id = ?", (id_lancamento,))
+
+    def filtrar(self, consulta, apos=None, limite=None, deslocamento=0):
+        """
+        Gera os lançamentos que atendem à consulta normalizada, do mais recente ao
+        mais antigo (empates em ordem de ID). Filtros, cursor e paginação viram SQL;
+        as linhas são lidas do banco à medida que o gerador é consumido.
+        """
+        condicoes, parametros = [], []
+        for campo, operador in (('tipo', '='), ('categoria', '='), ('valor', '='),
+                                ('valor_min', '>='), ('valor_max', '<=')):
+            if consulta[campo] is not None:
+                condicoes.append(f"{campo.split('_')[0]} {operador} ?")
+                parametros.append(consulta[campo])
+        if consulta['inferior'] is not None:
+            condicoes.append("data >= ?")
+            parametros.append(consulta['inferior'].isoformat())
+        if consulta['superior'] is not None:
+            condicoes.append("data < ?")
+            parametros.append(consulta['superior'].isoformat())
+        if apos is not None:
+            condicoes.append("(data < ? OR (data = ? AND id > ?))")
+            parametros += [apos[0].isoformat(), apos[0].isoformat(), apos[1]]
+
+        sql = f"SELECT {_COLUNAS} FROM lancamentos"
+        if condicoes:
+            sql += " WHERE " + " AND ".join(condicoes)
+        sql += " ORDER BY data DESC, id ASC"
+        if limite is not None or deslocamento:
+            sql += " LIMIT ? OFFSET ?"
+            parametros += [-1 if limite is None else limite, deslocamento]
+
+        for linha in self._conexao.execute(sql, parametros):
+            yield _para_lancamento(linha)
+
+    def totais_do_mes(self, ano, mes):
+        """Retorna (receitas, despesas) do mês, somadas pelo SQLite"""
+        inicio = datetime(ano, mes, 1)
+        fim = datetime(ano + mes // 12, mes % 12 + 1, 1)
+        receitas, despesas = self._conexao.execute(
+            "SELECT COALESCE(SUM(CASE WHEN tipo = 'receita' THEN valor END), 0.0),"
+            "       COALESCE(SUM(CASE WHEN tipo = 'despesa' THEN valor END), 0.0)"
+            " FROM lancamentos WHERE data >= ? AND data < ?",
+            (inicio.isoformat(), fim.isoformat())
+        ).fetchone()
+        return receitas, despesas
+
+    def despesas_da_categoria(self, categoria, ano=None, mes=None):
+        """
+        Total das despesas da categoria (só do mês, se ano e mes forem informados),
+        somado pelo SQLite com o índice (categoria, tipo, data)
+        """
+        sql = "SELECT COALESCE(SUM(valor), 0) FROM lancamentos WHERE categoria = ? AND tipo = 'despesa'"
+        parametros = [categoria]
+        if ano is not None:
+            sql += " AND data >= ? AND data < ?"
+            parametros += [datetime(ano, mes, 1).isoformat(),
+                           datetime(ano + mes // 12, mes % 12 + 1, 1).isoformat()]
+        (total,) = self._conexao.execute(sql, parametros).fetchone()
+        return total
+
+    def saldo_ate(self, data):
+        """Receitas menos despesas anteriores a `data`, somadas pelo SQLite (índice de data)"""
+        (saldo,) = self._conexao.execute(
+            "SELECT COALESCE(SUM(CASE tipo WHEN 'receita' THEN valor WHEN 'despesa' THEN -valor END), 0.0)"
+            " FROM lancamentos WHERE data < ?",
+            (data.isoformat(),)
+        ).fetchone()
+        return saldo
+
+    def verificar_consistencia(self):
+        """Os índices são mantidos pelo SQLite: verifica a integridade do banco"""
+        (resultado,) = self._conexao.execute("PRAGMA integrity_check").fetchone()
+        return [] if resultado == 'ok' else [resultado]
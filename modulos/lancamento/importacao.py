@@ -0,0 +1,80 @@
+"""
+Leitura de lançamentos para importação em lote
+INF1301 - Programação Modular
+
+Leitores em streaming (uma linha por vez, sem carregar o arquivo inteiro)
+para usar com importarLancamentos:
+
+    importarLancamentos(lerLancamentosCSV("extrato.csv"))
+    importarLancamentos(lerLancamentosJSONL("extrato.jsonl"))
+
+Cada linha vira um dicionário com descricao, valor, data, tipo e categoria.
+O valor é convertido para float e a data (ISO 8601, ex.: 2025-06-01 ou
+2025-06-01T10:30:00; um fuso, se houver, é descartado) para datetime. Valores que não podem ser convertidos
+são mantidos como estão, para que importarLancamentos rejeite a linha em
+vez de interromper a importação. As posições em "rejeitados" correspondem
+às linhas do JSONL e às linhas de dados do CSV (a primeira após o cabeçalho
+é a 1).
+"""
+
+import csv
+import json
+from datetime import datetime
+from typing import Dict, Iterator
+
+_CAMPOS = ('descricao', 'valor', 'data', 'tipo', 'categoria')
+
+# Gerado no lugar de uma linha em branco do JSONL: importarLancamentos a
+# ignora, mas ela ocupa uma posição, como no arquivo
+LINHA_EM_BRANCO = object()
+
+
+def _converter(registro) -> Dict[str, object]:
+    """Converte valor e data de uma linha lida do arquivo"""
+    if not isinstance(registro, dict):
+        return registro
+    dados = {campo: registro[campo] for campo in _CAMPOS if campo in registro}
+
+    valor = dados.get('valor')
+    if isinstance(valor, str):
+        try:
+            dados['valor'] = float(valor)
+        except ValueError:
+            pass
+
+    data = dados.get('data')
+    if isinstance(data, str):
+        try:
+            # Sem fuso, como as datas dos demais lançamentos
+            dados['data'] = datetime.fromisoformat(data.strip()).replace(tzinfo=None)
+        except ValueError:
+            pass
+    return dados
+
+
+def lerLancamentosCSV(caminho: str, delimitador: str = ',') -> Iterator[Dict[str, object]]:
+    """
+    Lê um CSV com cabeçalho (colunas descricao, valor, data, tipo, categoria;
+    as demais são ignoradas), gerando um lançamento por linha. Um BOM no
+    início do arquivo (comum em extratos exportados) é descartado.
+    """
+    with open(caminho, 'r', encoding='utf-8-sig', newline='') as arquivo:
+        for registro in csv.DictReader(arquivo, delimiter=delimitador):
+            yield _converter(registro)
+
+
+def lerLancamentosJSONL(caminho: str) -> Iterator[Dict[str, object]]:
+    """
+    Lê um arquivo JSON Lines (um objeto por linha), gerando um lançamento por
+    linha. Linhas em branco geram LINHA_EM_BRANCO (ignorada na importação);
+    uma linha que não é JSON válido gera None (rejeitada na importação).
+    """
+    with open(caminho, 'r', encoding='utf-8-sig') as arquivo:
+        for linha in arquivo:
+            if not linha.strip():
+                yield LINHA_EM_BRANCO
+                continue
+            try:
+                yield _converter(json.loads(linha))
+            except json.JSONDecodeError:
+                yield None
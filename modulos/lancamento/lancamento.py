@@ -7,80 +7,128 @@ Este módulo permite ao usuário:
 - Cadastrar, editar, listar e remover lançamentos financeiros,
     organizando seu fluxo de caixa. Os lançamentos podem ser de receita ou despesa.
 - Cálculo do saldo mensal
+
+Os dados ficam num armazenamento plugável, escolhido em config.armazenamento_lancamentos:
+- "memoria": dicionário indexado em memória, persistido em JSON + journal (armazenamento.py)
+- "colunar": colunas compactas em memória (array), mesmo JSON + journal (armazenamento_colunar.py)
+- "sqlite": tabela SQLite indexada, com filtros e somas feitos em SQL (armazenamento_sqlite.py)
 """
 
-import json
+import math
 import os
-from datetime import datetime
-from typing import List, Dict
+from datetime import datetime, timedelta
+from itertools import chain
+from typing import Dict, Optional
 import atexit
-from config import categorias, tipos, arquivo_final_dados
+from config import categorias, tipos, arquivo_final_dados, armazenamento_lancamentos
+from .armazenamento import ArmazenamentoMemoria
+from .armazenamento_colunar import ArmazenamentoColunar
+from .armazenamento_sqlite import ArmazenamentoSQLite
+from .importacao import LINHA_EM_BRANCO
 
 
 BASE_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 _arquivo_dados = os.path.join(BASE_DIR, arquivo_final_dados)
 
-# Dados encapsulados - lista de lançamentos em memória
+# Armazenamentos disponíveis: nome -> (classe, extensão do arquivo de dados)
+_ARMAZENAMENTOS = {
+    'memoria': (ArmazenamentoMemoria, '.json'),
+    'colunar': (ArmazenamentoColunar, '.json'),
+    'sqlite': (ArmazenamentoSQLite, '.sqlite3'),
+}
 
-_lancamentos: List[Dict[str, object]] = []
-_proximo_id: int = 1
+# Lançamentos gravados por vez em importarLancamentos (limita a memória do lote)
+_TAMANHO_LOTE = 10_000
 
-def _carregar_dados():
-    """Carrega os dados do arquivo JSON para a memória"""
-    global _lancamentos, _proximo_id
-    
-    if os.path.exists(_arquivo_dados):
-        try:
-            with open(_arquivo_dados, 'r', encoding='utf-8') as arquivo:
-                dados = json.load(arquivo)
-                _lancamentos = dados.get('lancamentos', [])
-                _proximo_id = dados.get('proximo_id', 1)
-                
-                # Converte strings de data de volta para datetime
-                for lancamento in _lancamentos:
-                    if isinstance(lancamento['data'], str):
-                        lancamento['data'] = datetime.fromisoformat(lancamento['data'])
-        except (json.JSONDecodeError, KeyError, ValueError):
-            # Se houver erro no arquivo, reinicia com dados vazios
-            _lancamentos = []
-            _proximo_id = 1
-
-
-def _salvar_dados():
-    """Salva os dados da memória para o arquivo JSON"""
-    dados_para_salvar = {
-        'lancamentos': [],
-        'proximo_id': _proximo_id
-    }
-    
-    # Converte datetime para string para serialização JSON
-    for lancamento in _lancamentos:
-        lancamento_copy = lancamento.copy()
-        if isinstance(lancamento_copy['data'], datetime):
-            lancamento_copy['data'] = lancamento_copy['data'].isoformat()
-        dados_para_salvar['lancamentos'].append(lancamento_copy)
-    
-    try:
-        with open(_arquivo_dados, 'w', encoding='utf-8') as arquivo:
-            json.dump(dados_para_salvar, arquivo, indent=2, ensure_ascii=False)
-    except IOError:
-        # Em caso de erro ao salvar, continua com dados em memória
-        pass
+# Dados encapsulados - armazenamento em uso
+_tipo_armazenamento = armazenamento_lancamentos
+_armazenamento = None
+
+# Contador de alterações (incrementado a cada mudança nos dados) e
+# snapshot compartilhado (versao, lançamentos) usado pelos relatórios
+_versao = 0
+_snapshot = (None, ())
+
+# Alterações pontuais feitas desde _versao_base, uma por versão:
+# (id, lançamento atual ou None se removido). Limitadas a _LIMITE_ALTERACOES
+_LIMITE_ALTERACOES = 10_000
+_alteracoes = []
+_versao_base = 0
+
+
+def _registrar_alteracao(id_lancamento=None, lancamento=None):
+    """
+    Invalida o snapshot compartilhado. Sem `id_lancamento` a alteração não é
+    pontual (reset, troca de arquivo ou importação) e o histórico recomeça.
+    """
+    global _versao, _versao_base
+    _versao += 1
+    if id_lancamento is None or len(_alteracoes) >= _LIMITE_ALTERACOES:
+        _alteracoes.clear()
+        _versao_base = _versao
+    else:
+        _alteracoes.append((id_lancamento, lancamento))
+
+
+def _obter_armazenamento():
+    """
+    Retorna o armazenamento configurado, abrindo-o (e lendo o arquivo de
+    dados) no primeiro acesso.
+    """
+    global _armazenamento
+    if _armazenamento is None:
+        classe, extensao = _ARMAZENAMENTOS[_tipo_armazenamento]
+        _armazenamento = classe(os.path.splitext(_arquivo_dados)[0] + extensao)
+    return _armazenamento
+
+
+def _descartar_armazenamento():
+    """Fecha o armazenamento atual; o próximo acesso reabre com a configuração vigente"""
+    global _armazenamento
+    _fechar_armazenamento()
+    _armazenamento = None
+    _registrar_alteracao()
+
+
+def _fechar_armazenamento():
+    """Fecha o armazenamento, se ele chegou a ser aberto (executado ao encerrar)"""
+    if _armazenamento is not None:
+        _armazenamento.fechar()
+
+
+def aquecerLancamentos() -> None:
+    """
+    Abre o armazenamento e carrega os lançamentos imediatamente, em vez de
+    esperar pelo primeiro acesso (para servidores que preferem pagar esse
+    custo na inicialização).
+    """
+    _obter_armazenamento()
 
 def setArquivoPersistencia(caminho: str) -> None:
     """
     Altera o caminho do arquivo de persistência (para testes).
+    O novo arquivo é lido no próximo acesso aos lançamentos.
     """
     global _arquivo_dados
     _arquivo_dados = caminho
-    _carregar_dados()
+    _descartar_armazenamento()
+
+def setArmazenamento(tipo: str) -> None:
+    """
+    Troca o armazenamento em uso ("memoria", "colunar" ou "sqlite"), mantendo o caminho atual.
+    """
+    global _tipo_armazenamento
+    if tipo not in _ARMAZENAMENTOS:
+        raise ValueError(f"Armazenamento desconhecido: {tipo}")
+    _tipo_armazenamento = tipo
+    _descartar_armazenamento()
 
 def resetarDados() -> None:
     """
-    Limpa todas as notificações em memória (para testes).
+    Limpa todos os lançamentos (para testes).
     """
-    global _lancamentos
-    _lancamentos = []
+    _obter_armazenamento().resetar()
+    _registrar_alteracao()
 
 def _validar_dados_lancamento(dados):
     """Valida os dados de um lançamento"""
@@ -98,7 +146,7 @@ def _validar_dados_lancamento(dados):
         return False
     
     # Valida valor
-    if not isinstance(dados['valor'], (int, float)) or dados['valor'] <= 0:
+    if not isinstance(dados['valor'], (int, float)) or not 0 < dados['valor'] < math.inf:
         return False
     
     # Valida data
@@ -116,6 +164,17 @@ def _validar_dados_lancamento(dados):
     return True
 
 
+def _normalizar_dados(dados):
+    """Extrai os campos de um lançamento já validado, no formato armazenado"""
+    return {
+        'descricao': dados['descricao'].strip(),
+        'valor': float(dados['valor']),
+        'data': dados['data'],
+        'tipo': dados['tipo'],
+        'categoria': dados['categoria']
+    }
+
+
 def _validar_data(mes, ano):
     """Valida se mês e ano são válidos"""
     if not isinstance(mes, int) or not isinstance(ano, int):
@@ -130,20 +189,11 @@ def _validar_data(mes, ano):
     return True
 
 
-def _encontrar_lancamento_por_id(id_lancamento):
-    """Encontra um lançamento pelo ID"""
-    for lancamento in _lancamentos:
-        if lancamento['id'] == id_lancamento:
-            return lancamento
-    return None
-
 # Persistência entre execuções
 
-# Inicializa os dados ao importar o módulo
-_carregar_dados()
-
-# Salva os dados ao final da execução
-atexit.register(_salvar_dados)
+# Os dados são carregados no primeiro acesso (ver _obter_armazenamento).
+# Fecha o armazenamento ao final da execução (os dados já estão gravados)
+atexit.register(_fechar_armazenamento)
 
 def criarLancamento(dados):
     """
@@ -157,23 +207,12 @@ def criarLancamento(dados):
         Em caso de sucesso: {"Status": 201, "Content": {"id": int, "dados": dict}}
         Em caso de erro: {"Status": 400, "Content": "Dados inválidos ou incompletos."}
     """
-    global _proximo_id
-        
     if not _validar_dados_lancamento(dados):
         return {"Status": 400, "Content": "Dados inválidos ou incompletos."}
     
     # Cria o novo lançamento
-    novo_lancamento = {
-        'id': _proximo_id,
-        'descricao': dados['descricao'].strip(),
-        'valor': float(dados['valor']),
-        'data': dados['data'],
-        'tipo': dados['tipo'],
-        'categoria': dados['categoria']
-    }
-    
-    _lancamentos.append(novo_lancamento)
-    _proximo_id += 1
+    novo_lancamento = _obter_armazenamento().inserir(_normalizar_dados(dados))
+    _registrar_alteracao(novo_lancamento['id'], novo_lancamento)
     
     return {
         "Status": 201,
@@ -188,6 +227,54 @@ def criarLancamento(dados):
     }
 
 
+def importarLancamentos(lancamentos, tamanho_lote=_TAMANHO_LOTE):
+    """
+    Importa vários lançamentos de uma vez (por exemplo, de lerLancamentosCSV ou
+    lerLancamentosJSONL). O iterável é consumido em lotes: cada lote é validado,
+    recebe IDs num bloco consecutivo e é gravado com uma única atualização dos
+    índices, agregados e journal. Linhas inválidas são ignoradas e informadas.
+
+    Parâmetros:
+        lancamentos: Iterável de dicionários no formato de criarLancamento
+        tamanho_lote: Quantidade de lançamentos gravados por vez
+
+    Retorna:
+        {"Status": 201 se algum lançamento foi importado, 400 caso contrário,
+         "Content": {"importados": int, "ids": [primeiro, último] ou None,
+                     "rejeitados": [posição de cada linha rejeitada, a partir de 1]}}
+    """
+    importados, rejeitados = [], []
+    lote = []
+
+    def gravar():
+        if lote:
+            importados.append(_obter_armazenamento().inserir_lote(lote))
+            lote.clear()
+
+    for posicao, dados in enumerate(lancamentos, 1):
+        if dados is LINHA_EM_BRANCO:
+            continue
+        if not _validar_dados_lancamento(dados):
+            rejeitados.append(posicao)
+            continue
+        lote.append(_normalizar_dados(dados))
+        if len(lote) >= tamanho_lote:
+            gravar()
+    gravar()
+
+    quantidade = sum(len(ids) for ids in importados)
+    if quantidade:
+        _registrar_alteracao()
+    return {
+        "Status": 201 if quantidade else 400,
+        "Content": {
+            "importados": quantidade,
+            "ids": [importados[0][0], importados[-1][-1]] if quantidade else None,
+            "rejeitados": rejeitados
+        }
+    }
+
+
 def editarLancamento(id_lancamento, novos_dados):
     """
     Edita um lançamento financeiro existente
@@ -204,19 +291,16 @@ def editarLancamento(id_lancamento, novos_dados):
     if not isinstance(id_lancamento, int):
         return {"Status": 400, "Content": "Dados inválidos."}
     
-    lancamento = _encontrar_lancamento_por_id(id_lancamento)
-    if not lancamento:
+    if not _obter_armazenamento().existe(id_lancamento):
         return {"Status": 404, "Content": "Lançamento não encontrado."}
     
     if not _validar_dados_lancamento(novos_dados):
         return {"Status": 400, "Content": "Dados inválidos."}
     
     # Atualiza os dados do lançamento
-    lancamento['descricao'] = novos_dados['descricao'].strip()
-    lancamento['valor'] = float(novos_dados['valor'])
-    lancamento['data'] = novos_dados['data']
-    lancamento['tipo'] = novos_dados['tipo']
-    lancamento['categoria'] = novos_dados['categoria']
+    lancamento = _normalizar_dados(novos_dados)
+    _obter_armazenamento().atualizar(id_lancamento, lancamento)
+    _registrar_alteracao(id_lancamento, {**lancamento, 'id': id_lancamento})
     
     return {"Status": 200, "Content": "Lançamento atualizado com sucesso."}
 
@@ -235,67 +319,181 @@ def removerLancamento(id_lancamento):
     if not isinstance(id_lancamento, int):
         return {"Status": 404, "Content": "Lançamento não encontrado."}
     
-    lancamento = _encontrar_lancamento_por_id(id_lancamento)
-    if not lancamento:
+    if not _obter_armazenamento().existe(id_lancamento):
         return {"Status": 404, "Content": "Lançamento não encontrado."}
     
-    _lancamentos.remove(lancamento)
+    _obter_armazenamento().remover(id_lancamento)
+    _registrar_alteracao(id_lancamento)
     
     return {"Status": 200, "Content": "Lançamento removido com sucesso."}
 
 
 from config import filtros_validos
+
+
+def _inicio_do_dia(data):
+    """Zera o horário de uma data"""
+    return data.replace(hour=0, minute=0, second=0, microsecond=0)
+
+
+def _normalizar_filtros(filtros):
+    """
+    Converte os filtros numa consulta para o armazenamento:
+    tipo, categoria, valor, valor_min, valor_max e a faixa de datas [inferior, superior).
+    Os filtros de data (data, data_inicio, data_fim) são dias inteiros e inclusivos.
+    Retorna None se algum filtro tiver tipo incorreto (nenhum lançamento casa).
+    """
+    consulta = {chave: filtros.get(chave) for chave in
+                ('valor', 'valor_min', 'valor_max', 'tipo', 'categoria')}
+    data = filtros.get('data')
+    data_inicio = filtros.get('data_inicio')
+    data_fim = filtros.get('data_fim')
+
+    for filtro in (consulta['valor'], consulta['valor_min'], consulta['valor_max']):
+        if filtro is not None and not isinstance(filtro, (int, float)):
+            return None
+    for filtro in (data, data_inicio, data_fim):
+        if filtro is not None and not isinstance(filtro, datetime):
+            return None
+    for filtro in (consulta['tipo'], consulta['categoria']):
+        if filtro is not None and not isinstance(filtro, str):
+            return None
+
+    inferiores = [_inicio_do_dia(d) for d in (data, data_inicio) if d is not None]
+    superiores = [_inicio_do_dia(d) + timedelta(days=1) for d in (data, data_fim) if d is not None]
+    consulta['inferior'] = max(inferiores) if inferiores else None
+    consulta['superior'] = min(superiores) if superiores else None
+    return consulta
+
+
+def _filtrar(filtros, apos=None, limite=None, deslocamento=0):
+    """Gera os lançamentos que atendem aos filtros, em ordem de data decrescente"""
+    consulta = _normalizar_filtros(filtros)
+    if consulta is None:
+        return iter(())
+    return _obter_armazenamento().filtrar(consulta, apos, limite, deslocamento)
+
+
 def listarLancamentos(filtros=None):
+    """
+    Lista os lançamentos que atendem aos filtros, do mais recente ao mais antigo
+
+    Parâmetros:
+        filtros: Dicionário opcional com valor, data, tipo e/ou categoria, além das
+                 faixas data_inicio/data_fim (dias inclusivos) e valor_min/valor_max
+
+    Retorna:
+        Em caso de sucesso: {"Status": 200, "Content": [lançamentos]}
+        Em caso de filtro desconhecido: {"Status": 400, "Content": "Filtro inválido: <chave>"}
+        Em caso de nenhum resultado: {"Status": 404, "Content": "Nenhum lançamento encontrado."}
+    """
     if filtros is None:
         filtros = {}
     for chave in filtros:
         if chave not in filtros_validos:
             return {"Status": 400, "Content": f"Filtro inválido: {chave}"}
 
-    lancamentos_filtrados = []
+    lancamentos_filtrados = list(_filtrar(filtros))
 
-    for lancamento in _lancamentos:
-        incluir = True
+    if not lancamentos_filtrados:
+        return {"Status": 404, "Content": "Nenhum lançamento encontrado."}
 
-        if 'valor' in filtros and filtros['valor'] is not None:
-            if not isinstance(filtros['valor'], (int, float)):
-                continue
-            if lancamento['valor'] != filtros['valor']:
-                incluir = False
+    return {"Status": 200, "Content": lancamentos_filtrados}
 
-        if 'data' in filtros and filtros['data'] is not None:
-            if not isinstance(filtros['data'], datetime):
-                continue
-            if lancamento['data'].date() != filtros['data'].date():
-                incluir = False
 
-        if 'tipo' in filtros and filtros['tipo'] is not None:
-            if not isinstance(filtros['tipo'], str):
-                continue
-            if lancamento['tipo'] != filtros['tipo']:
-                incluir = False
 
-        if 'categoria' in filtros and filtros['categoria'] is not None:
-            if not isinstance(filtros['categoria'], str):
-                continue
-            if lancamento['categoria'] != filtros['categoria']:
-                incluir = False
+def iterarLancamentos(filtros=None):
+    """
+    Versão preguiçosa de listarLancamentos: os lançamentos são gerados um a um,
+    do mais recente ao mais antigo, sem montar a lista completa.
+    Os lançamentos não devem ser alterados enquanto o iterador é consumido.
 
-        if incluir:
-            lancamentos_filtrados.append(lancamento.copy())
+    Parâmetros:
+        filtros: Mesmos filtros aceitos por listarLancamentos
 
-    if not lancamentos_filtrados:
+    Retorna:
+        Em caso de sucesso: {"Status": 200, "Content": iterador de lançamentos}
+        Em caso de filtro desconhecido: {"Status": 400, "Content": "Filtro inválido: <chave>"}
+        Em caso de nenhum resultado: {"Status": 404, "Content": "Nenhum lançamento encontrado."}
+    """
+    if filtros is None:
+        filtros = {}
+    for chave in filtros:
+        if chave not in filtros_validos:
+            return {"Status": 400, "Content": f"Filtro inválido: {chave}"}
+
+    lancamentos = _filtrar(filtros)
+    primeiro = next(lancamentos, None)
+    if primeiro is None:
         return {"Status": 404, "Content": "Nenhum lançamento encontrado."}
 
-    lancamentos_filtrados.sort(key=lambda x: x['data'], reverse=True)
+    return {"Status": 200, "Content": chain([primeiro], lancamentos)}
+
+
+def _codificar_cursor(lancamento):
+    """Gera o cursor opaco que aponta para um lançamento"""
+    return f"{lancamento['data'].isoformat()}|{lancamento['id']}"
 
-    return {"Status": 200, "Content": lancamentos_filtrados}
+
+def _decodificar_cursor(cursor):
+    """Converte o cursor em (data, id); retorna None se for inválido"""
+    try:
+        data, id_lancamento = cursor.split('|')
+        return datetime.fromisoformat(data), int(id_lancamento)
+    except (AttributeError, ValueError):
+        return None
 
 
+def paginarLancamentos(filtros=None, limite=20, offset=0, cursor=None):
+    """
+    Retorna uma página da listagem de lançamentos (mesma ordem de listarLancamentos)
+
+    Parâmetros:
+        filtros: Mesmos filtros aceitos por listarLancamentos
+        limite: Quantidade máxima de lançamentos na página (int > 0)
+        offset: Quantidade de lançamentos a pular (int >= 0)
+        cursor: "proximo_cursor" devolvido pela página anterior (opcional)
+
+    Retorna:
+        Em caso de sucesso: {"Status": 200, "Content": {"lancamentos": [lançamentos],
+                                                        "proximo_cursor": str ou None}}
+        Em caso de filtro, paginação ou cursor inválidos: {"Status": 400, "Content": mensagem}
+        Em caso de página vazia: {"Status": 404, "Content": "Nenhum lançamento encontrado."}
+    """
+    if filtros is None:
+        filtros = {}
+    for chave in filtros:
+        if chave not in filtros_validos:
+            return {"Status": 400, "Content": f"Filtro inválido: {chave}"}
+
+    if (not isinstance(limite, int) or limite <= 0
+            or not isinstance(offset, int) or offset < 0):
+        return {"Status": 400, "Content": "Paginação inválida."}
+
+    apos = None
+    if cursor is not None:
+        apos = _decodificar_cursor(cursor)
+        if apos is None:
+            return {"Status": 400, "Content": "Cursor inválido."}
+
+    # Busca um item a mais apenas para saber se existe próxima página
+    pagina = list(_filtrar(filtros, apos, limite + 1, offset))
+
+    if not pagina:
+        return {"Status": 404, "Content": "Nenhum lançamento encontrado."}
+
+    proximo_cursor = None
+    if len(pagina) > limite:
+        pagina.pop()
+        proximo_cursor = _codificar_cursor(pagina[-1])
+
+    return {"Status": 200, "Content": {"lancamentos": pagina, "proximo_cursor": proximo_cursor}}
+
 
 def calcularSaldoMensal(mes, ano):
     """
     Calcula o saldo mensal com base nos lançamentos do mês/ano especificado
+    (consulta O(1) nos totais mensais do armazenamento em memória; soma indexada no SQLite)
     
     Parâmetros:
         mes: Mês (1-12)
@@ -308,31 +506,127 @@ def calcularSaldoMensal(mes, ano):
     if not _validar_data(mes, ano):
         return {"Status": 400, "Content": "Data inválida"}
     
-    saldo = 0.0
+    return {"Status": 200, "Content": _saldo_do_mes(mes, ano)}
+
+
+def _saldo_do_mes(mes, ano):
+    """Monta o conteúdo de resposta do saldo de um mês a partir dos agregados"""
+    receitas, despesas = _obter_armazenamento().totais_do_mes(ano, mes)
+    saldo = receitas - despesas
+    return {
+        "saldo": round(saldo, 2),
+        "mes": mes,
+        "ano": ano
+    }
+
+
+def calcularSaldosMensais(mes_inicio, ano_inicio, mes_fim, ano_fim):
+    """
+    Calcula o saldo de cada mês de um intervalo (inclusivo) numa única chamada
     
-    for lancamento in _lancamentos:
-        if lancamento['data'].month == mes and lancamento['data'].year == ano:
-            if lancamento['tipo'] == 'receita':
-                saldo += lancamento['valor']
-            elif lancamento['tipo'] == 'despesa':
-                saldo -= lancamento['valor']
+    Parâmetros:
+        mes_inicio, ano_inicio: Primeiro mês do intervalo
+        mes_fim, ano_fim: Último mês do intervalo
     
+    Retorna:
+        Em caso de sucesso: {"Status": 200, "Content": [{"saldo": float, "mes": int, "ano": int}, ...]}
+        Em caso de data ou intervalo inválido: {"Status": 400, "Content": "Data inválida"}
+    """
+    if not _validar_data(mes_inicio, ano_inicio) or not _validar_data(mes_fim, ano_fim):
+        return {"Status": 400, "Content": "Data inválida"}
+
+    inicio = ano_inicio * 12 + mes_inicio - 1
+    fim = ano_fim * 12 + mes_fim - 1
+    if inicio > fim:
+        return {"Status": 400, "Content": "Data inválida"}
+
     return {
         "Status": 200,
-        "Content": {
-            "saldo": round(saldo, 2),
-            "mes": mes,
-            "ano": ano
-        }
+        "Content": [_saldo_do_mes(indice % 12 + 1, indice // 12) for indice in range(inicio, fim + 1)]
     }
 
 
-def somarDespesasPorCategoria(categoria: str) -> float:
+def calcularSaldoAte(data):
+    """
+    Calcula o saldo acumulado (receitas - despesas) de todos os lançamentos
+    anteriores à data informada. Consulta por busca binária nas somas de
+    prefixo do armazenamento em memória; soma indexada no SQLite.
+
+    Parâmetros:
+        data: datetime (exclusivo)
+
+    Retorna:
+        Em caso de sucesso: {"Status": 200, "Content": {"saldo": float, "data": datetime}}
+        Em caso de data inválida: {"Status": 400, "Content": "Data inválida"}
+    """
+    if not isinstance(data, datetime):
+        return {"Status": 400, "Content": "Data inválida"}
+
+    return {"Status": 200, "Content": {"saldo": round(_obter_armazenamento().saldo_ate(data), 2), "data": data}}
+
+
+def somarDespesasPorCategoria(categoria: str, mes: Optional[int] = None, ano: Optional[int] = None) -> float:
     """
-    Retorna a soma de todas as despesas da categoria informada.
+    Retorna a soma de todas as despesas da categoria informada ou, se mes e
+    ano forem informados, só das despesas daquele mês (totais correntes
+    mantidos pelo armazenamento a cada criação/edição/remoção).
+    """
+    if mes is None or ano is None:
+        return _obter_armazenamento().despesas_da_categoria(categoria)
+    return _obter_armazenamento().despesas_da_categoria(categoria, ano, mes)
+
+
+def verificarConsistencia() -> Dict[str, object]:
+    """
+    Compara os índices e agregados mantidos incrementalmente com um
+    recálculo completo a partir dos lançamentos (para testes).
+
+    Retorna:
+        Se tudo confere: {"Status": 200, "Content": "Índices consistentes."}
+        Caso contrário: {"Status": 500, "Content": [descrição de cada divergência]}
+    """
+    divergencias = _obter_armazenamento().verificar_consistencia()
+    if divergencias:
+        return {"Status": 500, "Content": divergencias}
+    return {"Status": 200, "Content": "Índices consistentes."}
+
+
+def obterVersaoDados() -> int:
+    """
+    Retorna o contador de alterações dos lançamentos. Ele muda a cada
+    criação/edição/remoção, reset ou troca de arquivo/armazenamento, e pode
+    ser usado como chave de cache por outros módulos.
+    """
+    return _versao
+
+
+def obterAlteracoesDesde(versao):
+    """
+    Retorna, em ordem, as alterações pontuais feitas depois de `versao` (de
+    obterVersaoDados): uma tupla (id, lançamento atual ou None se removido)
+    por criação, edição ou remoção. Permite atualizar um cache sem reler
+    todos os lançamentos.
+
+    Retorna None se essas alterações não estão disponíveis (houve reset,
+    troca de arquivo/armazenamento, importação ou alterações demais desde
+    `versao`); nesse caso o chamador deve usar obterSnapshotLancamentos.
+    """
+    if versao is None or not _versao_base <= versao <= _versao:
+        return None
+    return _alteracoes[versao - _versao_base:]
+
+
+def obterSnapshotLancamentos():
+    """
+    Retorna uma tupla com todos os lançamentos atuais (inclusive alterações
+    ainda não compactadas no arquivo), do mais recente ao mais antigo.
+
+    O snapshot é montado uma vez por versão dos dados e compartilhado entre
+    as chamadas: os dicionários retornados não devem ser alterados.
     """
-    return sum(
-        lanc["valor"]
-        for lanc in _lancamentos
-        if lanc["categoria"] == categoria and lanc["tipo"] == "despesa"
-    )
\ No newline at end of file
+    global _snapshot
+    versao, lancamentos = _snapshot
+    if versao != _versao:
+        lancamentos = tuple(_filtrar({}))
+        _snapshot = (_versao, lancamentos)
+    return lancamentos
@@ -1,17 +1,29 @@
 from .notificacao import (
     listarNotificacoes,
     enviarNotificacao,
+    enfileirarNotificacao,
+    aguardarEnvio,
+    configurarEnvio,
+    obterEstatisticasEnvio,
     salvarNotificacao,
     filtrarNotificacoesPorPeriodo,
     setArquivoPersistencia,
-    resetarNotificacoes
+    resetarNotificacoes,
+    aquecerNotificacoes,
+    configurarRetencao
 )
 
 __all__ = [
     "listarNotificacoes",
     "enviarNotificacao",
+    "enfileirarNotificacao",
+    "aguardarEnvio",
+    "configurarEnvio",
+    "obterEstatisticasEnvio",
     "salvarNotificacao",
     "filtrarNotificacoesPorPeriodo",
     "setArquivoPersistencia",
-    "resetarNotificacoes"
+    "resetarNotificacoes",
+    "aquecerNotificacoes",
+    "configurarRetencao"
     ]
\ No newline at end of file
@@ -0,0 +1,128 @@
+"""
+Arquivamento das notificações antigas
+INF1301 - Programação Modular
+
+As notificações que saem da política de retenção (quantidade máxima e
+idade máxima, ver config) são movidas de notificacoes.json para arquivos
+mensais comprimidos, num diretório ao lado dele:
+
+    notificacoes_arquivo/AAAA-MM.<instante da rotação>-<id>.jsonl.gz   (uma notificação JSON por linha)
+
+Cada rotação grava um arquivo novo por mês (num .tmp renomeado no lugar),
+então arquivar não reescreve o que já foi arquivado e uma queda durante a
+gravação não afeta as rotações anteriores nem as seguintes. Uma queda entre
+arquivar e regravar notificacoes.json arquiva as mesmas notificações de
+novo; as consultas descartam essas cópias. As consultas por período abrem
+só os meses que se sobrepõem ao período.
+"""
+
+import gzip
+import json
+import os
+import uuid
+import zlib
+from collections import Counter
+from datetime import datetime, timedelta
+from typing import Dict, Iterable, List, Optional
+
+_EXTENSAO = ".jsonl.gz"
+
+
+def data_da_notificacao(notificacao: Dict[str, str]) -> Optional[datetime]:
+    """
+    Converte a data ISO da notificação (sem fuso, como em datetime.now()); None se mal formatada.
+    """
+    try:
+        data = datetime.fromisoformat(notificacao["data"])
+    except (KeyError, TypeError, ValueError):
+        return None
+    return data if data.tzinfo is None else data.replace(tzinfo=None)
+
+
+def _mes(data: datetime) -> str:
+    return f"{data.year:04d}-{data.month:02d}"
+
+
+def _meses_arquivados(diretorio: str) -> List[str]:
+    """Nomes dos arquivos mensais do diretório, em ordem (o mês são os 7 primeiros caracteres)"""
+    if not os.path.isdir(diretorio):
+        return []
+    return sorted(nome for nome in os.listdir(diretorio) if nome.endswith(_EXTENSAO))
+
+
+def arquivar(diretorio: str, notificacoes: Iterable[Dict[str, str]]) -> None:
+    """
+    Grava as notificações (em ordem de data) num arquivo novo para cada mês.
+    Levanta OSError se não conseguir gravar (nesse caso nada deve ser descartado).
+    """
+    por_mes: Dict[str, List[str]] = {}
+    for notificacao in notificacoes:
+        linha = json.dumps(notificacao, ensure_ascii=False, separators=(',', ':'))
+        por_mes.setdefault(_mes(data_da_notificacao(notificacao)), []).append(linha)
+
+    os.makedirs(diretorio, exist_ok=True)
+    # Nomes em ordem de gravação: notificações com a mesma data saem na ordem em que foram arquivadas
+    rotacao = f"{datetime.now():%Y%m%d%H%M%S%f}-{uuid.uuid4().hex[:8]}"
+    for mes, linhas in por_mes.items():
+        caminho = os.path.join(diretorio, f"{mes}.{rotacao}{_EXTENSAO}")
+        with gzip.open(caminho + ".tmp", "wt", encoding="utf-8") as arquivo:
+            arquivo.write("\n".join(linhas) + "\n")
+        os.replace(caminho + ".tmp", caminho)
+
+
+def fim_do_ultimo_mes(diretorio: str) -> Optional[datetime]:
+    """
+    Último instante do mês mais recente com arquivo (limite superior das datas
+    arquivadas, obtido só pelos nomes dos arquivos); None se não há arquivos.
+    """
+    meses = _meses_arquivados(diretorio)
+    if not meses:
+        return None
+    try:
+        ano, mes = (int(parte) for parte in meses[-1][:7].split("-"))
+    except ValueError:
+        return None
+    return datetime(ano + mes // 12, mes % 12 + 1, 1) - timedelta(microseconds=1)
+
+
+def _ler(caminho: str) -> List[Dict[str, str]]:
+    """Lê um arquivo mensal; um final truncado (queda durante a gravação) é ignorado"""
+    notificacoes = []
+    try:
+        with gzip.open(caminho, "rt", encoding="utf-8") as arquivo:
+            for linha in arquivo:
+                try:
+                    notificacoes.append(json.loads(linha))
+                except json.JSONDecodeError:
+                    break
+    except (EOFError, OSError, zlib.error):
+        pass
+    return notificacoes
+
+
+def consultar(diretorio: str, inicio: datetime, fim: datetime) -> List[Dict[str, str]]:
+    """
+    Notificações arquivadas com data em [inicio, fim], em ordem de data.
+
+    Uma notificação (data e conteúdo, como na recuperação da caixa de saída)
+    aparece tantas vezes quanto no arquivo em que mais aparece: as cópias
+    gravadas de novo por uma rotação interrompida não se repetem.
+    """
+    primeiro, ultimo = _mes(inicio), _mes(fim)
+    encontradas = []
+    vistas: Counter = Counter()  # maior nº de ocorrências num mesmo arquivo
+    for nome in _meses_arquivados(diretorio):
+        if not primeiro <= nome[:7] <= ultimo:
+            continue
+        no_arquivo: Counter = Counter()
+        for notificacao in _ler(os.path.join(diretorio, nome)):
+            data = data_da_notificacao(notificacao)
+            if data is None or not inicio <= data <= fim:
+                continue
+            chave = (notificacao.get("data"), notificacao.get("conteudo"))
+            no_arquivo[chave] += 1
+            if no_arquivo[chave] > vistas[chave]:
+                encontradas.append((data, notificacao))
+        vistas |= no_arquivo
+    encontradas.sort(key=lambda par: par[0])
+    return [notificacao for _, notificacao in encontradas]
@@ -0,0 +1,162 @@
+"""
+Caixa de saída (outbox) das notificações
+INF1301 - Programação Modular
+
+Arquivo JSONL, ao lado de notificacoes.json, onde cada envio é registrado
+antes de ir para o Telegram e marcado depois:
+
+    {"op": "pendente", "id": ..., "chat_id": ..., "conteudo": ...}
+    {"op": "entregue", "id": ..., "notificacao": {"data": ..., "conteudo": ...}}
+    {"op": "falha", "id": ..., "erro": ...}
+
+Acrescentar uma linha é O(1), então as entregas ficam gravadas sem
+reescrever notificacoes.json; cada linha passa por os.fsync antes de o
+envio seguir, para sobreviver também a uma queda do sistema. Ao carregar,
+as entregas registradas voltam para o histórico e os envios ainda
+pendentes (queda antes da entrega) são reenviados. A compactação, feita
+quando notificacoes.json é gravado, reescreve a caixa apenas com os envios
+pendentes.
+"""
+
+import json
+import os
+import threading
+
+# Tamanho da caixa (em linhas) a partir do qual vale gravar o histórico e compactá-la
+_LIMITE_CAIXA = 10_000
+
+
+def _registro_valido(registro) -> bool:
+    """Indica se uma linha lida da caixa tem o formato de um dos três registros"""
+    if not isinstance(registro, dict) or not isinstance(registro.get('id'), str):
+        return False
+    if registro.get('op') == 'pendente':
+        return isinstance(registro.get('chat_id'), int) and isinstance(registro.get('conteudo'), str)
+    if registro.get('op') == 'entregue':
+        notificacao = registro.get('notificacao')
+        return (isinstance(notificacao, dict) and isinstance(notificacao.get('data'), str)
+                and isinstance(notificacao.get('conteudo'), str))
+    return registro.get('op') == 'falha'
+
+
+class CaixaDeSaida:
+    """Envios registrados em JSONL antes da entrega e marcados como entregues ou com falha"""
+
+    def __init__(self, arquivo: str):
+        self._arquivo = arquivo
+        self._saida = None
+        self._trava = threading.Lock()
+        self._pendentes = {}
+        self.entradas = 0
+
+    def _acrescentar(self, registro):
+        try:
+            if self._saida is None:
+                self._saida = open(self._arquivo, 'a', encoding='utf-8')
+            self._saida.write(json.dumps(registro, ensure_ascii=False, separators=(',', ':')) + '\n')
+            self._saida.flush()
+            os.fsync(self._saida.fileno())
+            self.entradas += 1
+        except IOError:
+            # Em caso de erro ao gravar, o envio continua só em memória
+            pass
+
+    def _reescrever(self, registros):
+        """Substitui o arquivo (de forma atômica) pelos registros informados"""
+        self.fechar()
+        arquivo_temporario = self._arquivo + '.tmp'
+        try:
+            if not registros:
+                # Caixa vazia: não deixa um arquivo vazio ao lado das notificações
+                if os.path.exists(self._arquivo):
+                    os.remove(self._arquivo)
+                self.entradas = 0
+                return
+            with open(arquivo_temporario, 'w', encoding='utf-8') as arquivo:
+                for registro in registros:
+                    arquivo.write(json.dumps(registro, ensure_ascii=False, separators=(',', ':')) + '\n')
+                arquivo.flush()
+                os.fsync(arquivo.fileno())
+            os.replace(arquivo_temporario, self._arquivo)
+            self.entradas = len(registros)
+        except IOError:
+            pass
+
+    def carregar(self):
+        """
+        Lê a caixa de saída. Retorna (notificações entregues, envios pendentes),
+        em ordem de registro. Uma linha incompleta (queda durante a escrita) ou
+        mal formada é descartada, junto com as seguintes.
+        """
+        with self._trava:
+            self._pendentes = {}
+            self.entradas = 0
+            entregues = []
+            if not os.path.exists(self._arquivo):
+                return entregues, []
+
+            registros, completa = [], True
+            with open(self._arquivo, 'r', encoding='utf-8') as arquivo:
+                for linha in arquivo:
+                    try:
+                        registro = json.loads(linha)
+                    except json.JSONDecodeError:
+                        registro = None
+                    if not _registro_valido(registro):
+                        completa = False
+                        break
+                    registros.append(registro)
+
+            for registro in registros:
+                if registro['op'] == 'pendente':
+                    self._pendentes[registro['id']] = registro
+                else:
+                    self._pendentes.pop(registro['id'], None)
+                    if registro['op'] == 'entregue':
+                        entregues.append(registro['notificacao'])
+            self.entradas = len(registros)
+
+            if not completa:
+                # Descarta a linha inválida antes de voltar a acrescentar registros
+                self._reescrever(registros)
+            return entregues, list(self._pendentes.values())
+
+    def registrar(self, id_envio, chat_id, conteudo):
+        """Grava um envio antes de entregá-lo ao despachante"""
+        registro = {'op': 'pendente', 'id': id_envio, 'chat_id': chat_id, 'conteudo': conteudo}
+        with self._trava:
+            self._pendentes[id_envio] = registro
+            self._acrescentar(registro)
+
+    def entregue(self, id_envio, notificacao):
+        """Marca o envio como entregue, guardando a notificação do histórico"""
+        with self._trava:
+            self._pendentes.pop(id_envio, None)
+            self._acrescentar({'op': 'entregue', 'id': id_envio, 'notificacao': notificacao})
+
+    def falhou(self, id_envio, erro):
+        """Marca o envio como definitivamente falho (não será reenviado)"""
+        with self._trava:
+            self._pendentes.pop(id_envio, None)
+            self._acrescentar({'op': 'falha', 'id': id_envio, 'erro': str(erro)})
+
+    def cheia(self):
+        """Indica se a caixa cresceu o bastante para ser compactada"""
+        return self.entradas >= _LIMITE_CAIXA
+
+    def compactar(self):
+        """Reescreve a caixa só com os envios pendentes (o histórico já foi gravado)"""
+        with self._trava:
+            self._reescrever(list(self._pendentes.values()))
+
+    def resetar(self):
+        """Esvazia a caixa de saída (para testes)"""
+        with self._trava:
+            self._pendentes = {}
+            self._reescrever([])
+
+    def fechar(self):
+        """Fecha o arquivo aberto (os registros já estão gravados)"""
+        if self._saida is not None:
+            self._saida.close()
+            self._saida = None
@@ -0,0 +1,377 @@
+"""
+Entrega de mensagens pelo Telegram
+INF1301 - Programação Modular
+
+Camada de transporte usada por modulos.notificacao:
+- Uma requests.Session compartilhada, com pool de conexões (as mensagens
+  reaproveitam a conexão TCP/TLS em vez de abrir uma nova a cada envio)
+- Timeouts de conexão e leitura configuráveis (config.timeout_telegram)
+- URL base da API configurável (config.url_api_telegram), o que permite
+  testar contra um servidor HTTP local
+- Um despachante em segundo plano (thread alimentada por uma fila) que:
+    - agrupa as mensagens de um mesmo chat que chegam dentro de uma janela
+      de tempo em uma única mensagem
+    - respeita um limite de taxa (balde de fichas: `rajada` envios seguidos,
+      repostos a `taxa` por segundo)
+    - repete falhas transitórias (rede, HTTP 429 e 5xx) com espera
+      exponencial, respeitando o Retry-After da API
+    - mantém contadores de fila, entregas, falhas, repetições e latência
+    - ao encerrar, espera no máximo config.espera_encerramento_telegram
+      segundos; o que não saiu continua pendente na caixa de saída
+
+requests e dotenv só são importados quando a primeira mensagem é enviada.
+"""
+
+import logging
+import os
+import threading
+import time
+from concurrent.futures import Future
+
+from config import (url_api_telegram, timeout_telegram, conexoes_telegram, janela_telegram,
+                    taxa_telegram, rajada_telegram, tentativas_telegram, espera_telegram,
+                    espera_encerramento_telegram)
+
+_log = logging.getLogger(__name__)
+
+# Tamanho máximo de uma mensagem do Telegram (mensagens agrupadas são divididas)
+_TAMANHO_MAXIMO = 4096
+
+_url_base = url_api_telegram
+_timeout = timeout_telegram
+
+# Token do bot, lido do .env no primeiro envio
+_TELEGRAM_TOKEN = None
+
+# Sessão HTTP e despachante (criados no primeiro envio)
+_sessao = None
+_despachante = None
+_parametros = {"janela": janela_telegram, "taxa": taxa_telegram, "rajada": rajada_telegram,
+               "tentativas": tentativas_telegram, "espera": espera_telegram}
+_trava = threading.Lock()
+
+
+def _token_telegram() -> str:
+    """
+    Carrega o .env (uma única vez) e retorna o token do bot do Telegram.
+    """
+    global _TELEGRAM_TOKEN
+    if _TELEGRAM_TOKEN is None:
+        from dotenv import load_dotenv
+        load_dotenv()
+        _TELEGRAM_TOKEN = os.getenv("TELEGRAM_TOKEN")
+    return _TELEGRAM_TOKEN
+
+
+def _obter_sessao():
+    """Sessão HTTP com pool de conexões (criada no primeiro uso)"""
+    global _sessao
+    with _trava:
+        if _sessao is None:
+            import requests
+            from requests.adapters import HTTPAdapter
+            sessao = requests.Session()
+            adaptador = HTTPAdapter(pool_connections=1, pool_maxsize=conexoes_telegram)
+            sessao.mount("http://", adaptador)
+            sessao.mount("https://", adaptador)
+            _sessao = sessao
+    return _sessao
+
+
+def enviar_mensagem(chat_id, texto):
+    """
+    Envia uma mensagem pelo método sendMessage da API, bloqueando até a resposta.
+    Levanta as exceções de requests (HTTPError para respostas 4xx/5xx).
+    """
+    resposta = _obter_sessao().post(f"{_url_base}/bot{_token_telegram()}/sendMessage",
+                                    json={"chat_id": chat_id, "text": texto}, timeout=_timeout)
+    resposta.raise_for_status()
+    return resposta
+
+
+class EnvioInterrompido(Exception):
+    """O encerramento desistiu da mensagem antes de entregá-la"""
+
+
+def falha_transitoria(erro):
+    """Indica se vale a pena repetir o envio que falhou com `erro`"""
+    if isinstance(erro, EnvioInterrompido):
+        return True
+    import requests
+    if isinstance(erro, (requests.exceptions.ConnectionError, requests.exceptions.Timeout)):
+        return True
+    if isinstance(erro, requests.exceptions.HTTPError) and erro.response is not None:
+        return erro.response.status_code == 429 or erro.response.status_code >= 500
+    return False
+
+
+def _espera_sugerida(erro):
+    """Segundos pedidos pela API no cabeçalho Retry-After (0 se ausente)"""
+    resposta = getattr(erro, "response", None)
+    try:
+        return float(resposta.headers.get("Retry-After", 0))
+    except (AttributeError, ValueError):
+        return 0.0
+
+
+class _BaldeDeFichas:
+    """Limite de taxa: até `capacidade` envios seguidos, fichas repostas a `taxa` por segundo"""
+
+    def __init__(self, taxa, capacidade):
+        self.taxa = taxa
+        self.capacidade = capacidade
+        self._fichas = float(capacidade)
+        self._instante = time.monotonic()
+
+    def retirar(self):
+        """Retira uma ficha e retorna quantos segundos esperar antes de usá-la"""
+        agora = time.monotonic()
+        self._fichas = min(self.capacidade, self._fichas + (agora - self._instante) * self.taxa)
+        self._instante = agora
+        self._fichas -= 1
+        return 0.0 if self._fichas >= 0 else -self._fichas / self.taxa
+
+
+class Despachante:
+    """
+    Fila de mensagens por chat, esvaziada por uma thread de envio.
+
+    `transmitir(chat_id, texto)` faz o envio propriamente dito e levanta uma
+    exceção em caso de falha. Cada mensagem submetida recebe um Future, que
+    termina com None quando o lote que a contém é entregue, ou com a exceção
+    do último envio que falhou.
+    """
+
+    def __init__(self, transmitir, janela, taxa, rajada, tentativas, espera):
+        self._transmitir = transmitir
+        self.janela = janela
+        self.tentativas = tentativas
+        self.espera = espera
+        self._balde = _BaldeDeFichas(taxa, rajada)
+
+        # chat_id -> [prazo, [(texto, futuro, instante, ao_concluir)]]
+        self._pendentes = {}
+        self._condicao = threading.Condition()
+        self._thread = None
+        self._encerrando = False
+        self._interrompido = threading.Event()
+
+        self._contadores = {"mensagens_entregues": 0, "mensagens_com_falha": 0,
+                            "requisicoes": 0, "repeticoes": 0}
+        self._fila = 0
+        self._latencia_total = 0.0
+        self._latencia_maxima = 0.0
+
+    def configurar(self, janela=None, taxa=None, rajada=None, tentativas=None, espera=None):
+        with self._condicao:
+            if janela is not None:
+                self.janela = janela
+                for pendente in self._pendentes.values():  # antecipa prazos que a nova janela encurta
+                    pendente[0] = min(pendente[0], pendente[1][0][2] + janela)
+            if taxa is not None:
+                self._balde.taxa = taxa
+            if rajada is not None:
+                self._balde.capacidade = rajada
+            if tentativas is not None:
+                self.tentativas = tentativas
+            if espera is not None:
+                self.espera = espera
+            self._condicao.notify()
+
+    def submeter(self, chat_id, texto, imediato=False, ao_concluir=None):
+        """
+        Enfileira uma mensagem. Ela espera a janela do chat (para ser agrupada
+        com as próximas) ou, se `imediato`, leva o lote do chat na hora.
+        `ao_concluir(erro)` é chamado na thread de envio antes de o Future
+        terminar, com erro=None se a mensagem foi entregue.
+        """
+        futuro = Future()
+        with self._condicao:
+            agora = time.monotonic()
+            pendente = self._pendentes.get(chat_id)
+            if pendente is None:
+                pendente = self._pendentes[chat_id] = [agora + self.janela, []]
+            if imediato:
+                pendente[0] = agora
+            pendente[1].append((texto, futuro, agora, ao_concluir))
+            self._fila += 1
+            if self._thread is None:
+                self._encerrando = False
+                self._interrompido.clear()
+                self._thread = threading.Thread(target=self._executar, name="envio-telegram", daemon=True)
+                self._thread.start()
+            self._condicao.notify()
+        return futuro
+
+    def estatisticas(self):
+        """Contadores do despachante (latência = da submissão ao fim do envio)"""
+        with self._condicao:
+            concluidas = self._contadores["mensagens_entregues"] + self._contadores["mensagens_com_falha"]
+            return {
+                "fila": self._fila,
+                "chats_pendentes": len(self._pendentes),
+                **self._contadores,
+                "latencia_media_ms": round(self._latencia_total / concluidas * 1000, 3) if concluidas else 0.0,
+                "latencia_maxima_ms": round(self._latencia_maxima * 1000, 3),
+            }
+
+    def encerrar(self, timeout=None):
+        """
+        Envia o que está na fila sem esperar as janelas e encerra a thread.
+        Com `timeout`, desiste depois de `timeout` segundos: o envio em
+        andamento não é mais repetido e as mensagens ainda na fila terminam
+        com EnvioInterrompido, sem chamar ao_concluir.
+        """
+        with self._condicao:
+            thread = self._thread
+            self._encerrando = True
+            self._condicao.notify()
+        if thread is None:
+            return
+        thread.join(timeout)
+        if not thread.is_alive():
+            return
+        with self._condicao:
+            abandonadas = [mensagem for _, mensagens in self._pendentes.values() for mensagem in mensagens]
+            self._pendentes = {}
+            self._fila -= len(abandonadas)
+            self._interrompido.set()
+        for _, futuro, _, _ in abandonadas:
+            futuro.set_exception(EnvioInterrompido("Envio interrompido no encerramento"))
+
+    # ----- Thread de envio -----
+
+    def _proximo_lote(self):
+        """Retira o lote do chat cujo prazo venceu primeiro; None se nenhum venceu"""
+        if not self._pendentes:
+            return None
+        chat_id = min(self._pendentes, key=lambda chat: self._pendentes[chat][0])
+        if not self._encerrando and self._pendentes[chat_id][0] > time.monotonic():
+            return None
+        mensagens = self._pendentes.pop(chat_id)[1]
+        self._fila -= len(mensagens)
+        return chat_id, mensagens
+
+    def _executar(self):
+        while True:
+            with self._condicao:
+                lote = self._proximo_lote()
+                while lote is None:
+                    if not self._pendentes and self._encerrando:
+                        self._thread = None
+                        return
+                    espera = None
+                    if self._pendentes:
+                        espera = max(0.0, min(p[0] for p in self._pendentes.values()) - time.monotonic())
+                    self._condicao.wait(espera)
+                    lote = self._proximo_lote()
+            try:
+                self._entregar(*lote)
+            except Exception:
+                # Uma falha inesperada não pode matar a thread: as próximas mensagens continuam saindo
+                _log.exception("Erro ao entregar o lote do chat %s", lote[0])
+
+    def _partes(self, mensagens):
+        """Divide as mensagens de um lote em partes que cabem numa mensagem do Telegram"""
+        parte, tamanho = [], -1
+        for mensagem in mensagens:
+            acrescimo = len(mensagem[0]) + 1  # texto + separador
+            if parte and tamanho + acrescimo > _TAMANHO_MAXIMO:
+                yield parte
+                parte, tamanho = [], -1
+            parte.append(mensagem)
+            tamanho += acrescimo
+        if parte:
+            yield parte
+
+    def _entregar(self, chat_id, mensagens):
+        for parte in self._partes(mensagens):
+            erro = None
+            try:
+                self._transmitir_com_repeticao(chat_id, "\n".join(mensagem[0] for mensagem in parte))
+            except Exception as falha:
+                erro = falha
+
+            agora = time.monotonic()
+            with self._condicao:
+                chave = "mensagens_com_falha" if erro else "mensagens_entregues"
+                self._contadores[chave] += len(parte)
+                for _, _, instante, _ in parte:
+                    self._latencia_total += agora - instante
+                    self._latencia_maxima = max(self._latencia_maxima, agora - instante)
+
+            for _, futuro, _, ao_concluir in parte:
+                try:
+                    if ao_concluir is not None:
+                        ao_concluir(erro)
+                except Exception:
+                    _log.exception("Erro em ao_concluir da mensagem para o chat %s", chat_id)
+                finally:
+                    if erro is not None:
+                        futuro.set_exception(erro)
+                    else:
+                        futuro.set_result(None)
+
+    def _transmitir_com_repeticao(self, chat_id, texto):
+        for tentativa in range(self.tentativas):
+            if self._interrompido.wait(self._balde.retirar()):
+                raise EnvioInterrompido("Envio interrompido no encerramento")
+            with self._condicao:
+                self._contadores["requisicoes"] += 1
+            try:
+                return self._transmitir(chat_id, texto)
+            except Exception as erro:
+                if tentativa + 1 >= self.tentativas or not falha_transitoria(erro):
+                    raise
+                with self._condicao:
+                    self._contadores["repeticoes"] += 1
+                if self._interrompido.wait(max(self.espera * 2 ** tentativa, _espera_sugerida(erro))):
+                    raise  # o encerramento desistiu: fica como a falha transitória que era
+
+
+def configurar(url_base=None, timeout=None, **despacho):
+    """
+    Altera a URL base da API, o timeout (segundos ou tupla (conexão, leitura))
+    e/ou os parâmetros do despachante (janela, taxa, rajada, tentativas, espera).
+    """
+    global _url_base, _timeout
+    if url_base is not None:
+        _url_base = url_base.rstrip("/")
+    if timeout is not None:
+        _timeout = timeout
+    despacho = {chave: valor for chave, valor in despacho.items() if valor is not None}
+    with _trava:
+        _parametros.update(despacho)
+        if _despachante is not None:
+            _despachante.configurar(**despacho)
+
+
+def _obter_despachante():
+    global _despachante
+    with _trava:
+        if _despachante is None:
+            _despachante = Despachante(enviar_mensagem, **_parametros)
+    return _despachante
+
+
+def submeter(chat_id, texto, imediato=False, ao_concluir=None):
+    """Enfileira uma mensagem no despachante (ver Despachante.submeter) e retorna seu Future"""
+    return _obter_despachante().submeter(chat_id, texto, imediato, ao_concluir)
+
+
+def estatisticas():
+    """Contadores do despachante (zerados se nada foi enviado ainda)"""
+    return _obter_despachante().estatisticas()
+
+
+def encerrar(timeout=espera_encerramento_telegram):
+    """
+    Envia as mensagens pendentes (esperando no máximo `timeout` segundos),
+    encerra a thread e fecha a sessão (executado ao encerrar).
+    """
+    global _sessao
+    if _despachante is not None:
+        _despachante.encerrar(timeout)
+    if _sessao is not None:
+        _sessao.close()
+        _sessao = None
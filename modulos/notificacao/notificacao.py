@@ -5,86 +5,291 @@ Responsável: Diogo Marassi
 
 Este módulo relatórios permite:
 - Gerenciar e armazenar notificações locais
-- Enviar mensagens via Telegram usando chatId
-- Persistir notificações em arquivo JSON (apenas no encerramento da aplicação)
+- Enviar mensagens via Telegram usando chatId, na hora ou por uma fila em segundo plano
+  que agrupa mensagens por chat, limita a taxa e repete falhas transitórias (envio.py)
+- Persistir notificações em arquivo JSON (no encerramento da aplicação), com os
+  envios registrados antes da entrega numa caixa de saída (caixa_saida.py): as
+  entregas sobrevivem a uma queda e os envios pendentes são reenviados no próximo carregamento
+- Manter pequeno o histórico em memória e em notificacoes.json: as notificações fora da
+  política de retenção (config) vão para arquivos mensais comprimidos (arquivamento.py),
+  que continuam sendo consultados por filtrarNotificacoesPorPeriodo
 """
 
 import json
 import os
-import requests
-from datetime import datetime
-from typing import List, Dict, Union
-from dotenv import load_dotenv
+import shutil
+import threading
+import uuid
+from bisect import bisect_left, bisect_right
+from collections import Counter
+from heapq import merge
+from concurrent.futures import wait
+from datetime import datetime, timedelta
+from typing import List, Dict, Optional, Union
 import atexit
+from config import retencao_notificacoes_quantidade, retencao_notificacoes_dias
+from . import envio
+from .arquivamento import arquivar, consultar, data_da_notificacao, fim_do_ultimo_mes
+from .caixa_saida import CaixaDeSaida
 
 _BASE_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 _ARQUIVO_NOTIFICACOES = os.path.join(_BASE_DIR, "data", "notificacoes.json")
 
 # Dados encapsulados - lista de lançamentos em memória
 
-load_dotenv()
-_TELEGRAM_TOKEN = os.getenv("TELEGRAM_TOKEN")
+# Notificações em memória; None até o primeiro acesso (o arquivo só é lido
+# quando alguma função precisa dele)
+_notificacoes: Optional[List[Dict[str, str]]] = None
 
-_notificacoes: List[Dict[str, str]] = []
+# Índice por data, para as consultas por período: datas já convertidas
+# (datetime sem fuso, em ordem crescente) e as notificações correspondentes,
+# na mesma ordem. Notificações com data mal formatada ficam fora do índice.
+_datas_indice: List[datetime] = []
+_notificacoes_indice: List[Dict[str, str]] = []
+_trava_notificacoes = threading.Lock()
+# Serializa as rotações (a gravação dos arquivos mensais é feita fora de _trava_notificacoes)
+_trava_rotacao = threading.Lock()
+
+# Limite superior das datas já arquivadas (None = nada arquivado). Uma
+# notificação com data antiga pode entrar depois de uma rotação, então o
+# índice em memória não diz até onde vão os arquivos mensais.
+_arquivadas_ate: Optional[datetime] = None
+
+# Caixa de saída ao lado do arquivo de notificações (aberta no primeiro uso)
+_caixa: Optional[CaixaDeSaida] = None
+
+# Política de retenção do histórico (None = sem limite)
+_retencao_quantidade: Optional[int] = retencao_notificacoes_quantidade
+_retencao_dias: Optional[int] = retencao_notificacoes_dias
+
+# Valor padrão de configurarRetencao: mantém o limite atual
+_MANTER = object()
 
 # Funções internas
 
+def _obter_caixa() -> CaixaDeSaida:
+    """
+    Retorna a caixa de saída do arquivo de notificações atual.
+    """
+    global _caixa
+    if _caixa is None:
+        _caixa = CaixaDeSaida(os.path.splitext(_ARQUIVO_NOTIFICACOES)[0] + ".outbox")
+    return _caixa
+
+def _diretorio_arquivo() -> str:
+    """
+    Diretório dos arquivos mensais, ao lado do arquivo de notificações atual.
+    """
+    return os.path.splitext(_ARQUIVO_NOTIFICACOES)[0] + "_arquivo"
+
 def _carregar_notificacoes() -> None:
     """
-    Carrega notificações do JSON para a memória (executado na importação).
+    Carrega notificações do JSON para a memória (executado no primeiro acesso),
+    acrescenta as entregas registradas na caixa de saída depois da última
+    gravação e reenvia os envios que ficaram pendentes.
     """
-    global _notificacoes
+    global _notificacoes, _arquivadas_ate
+    _arquivadas_ate = fim_do_ultimo_mes(_diretorio_arquivo())
     if os.path.exists(_ARQUIVO_NOTIFICACOES):
         with open(_ARQUIVO_NOTIFICACOES, 'r', encoding='utf-8') as f:
-            _notificacoes = json.load(f)
+            notificacoes = json.load(f)
     else:
-        _notificacoes = []
+        notificacoes = []
+
+    entregues, pendentes = _obter_caixa().carregar()
+    if entregues:
+        # Entregas já gravadas no JSON (queda entre gravar o JSON e compactar a caixa) não se repetem
+        gravadas = {(n.get("data"), n.get("conteudo")) for n in notificacoes}
+        notificacoes.extend(n for n in entregues if (n["data"], n["conteudo"]) not in gravadas)
+
+    _reconstruir_indice(notificacoes)
+    _notificacoes = notificacoes
+    # Ninguém aguarda os envios recuperados: o resultado não é guardado em _envios
+    for pendente in pendentes:
+        _submeter(pendente["id"], pendente["chat_id"], pendente["conteudo"], imediato=False)
+
+def _reconstruir_indice(notificacoes: List[Dict[str, str]]) -> None:
+    """
+    Monta o índice por data das notificações carregadas (ordenação estável:
+    notificações da mesma data mantêm a ordem do arquivo).
+    """
+    datadas = [(data, n) for n in notificacoes if (data := data_da_notificacao(n)) is not None]
+    datadas.sort(key=lambda par: par[0])
+    with _trava_notificacoes:
+        _datas_indice[:] = [data for data, _ in datadas]
+        _notificacoes_indice[:] = [n for _, n in datadas]
+
+def _acrescentar_notificacao(nova: Dict[str, str]) -> List[Dict[str, str]]:
+    """
+    Acrescenta a notificação à memória e ao índice por data. Como as novas
+    notificações usam datetime.now(), o caso comum é acrescentar no fim do
+    índice; uma data anterior à última é inserida na posição certa.
+    """
+    notificacoes = _obter_notificacoes()
+    data = data_da_notificacao(nova)
+    with _trava_notificacoes:
+        notificacoes.append(nova)
+        if data is None:
+            return notificacoes
+        if not _datas_indice or _datas_indice[-1] <= data:
+            _datas_indice.append(data)
+            _notificacoes_indice.append(nova)
+        else:
+            posicao = bisect_right(_datas_indice, data)
+            _datas_indice.insert(posicao, data)
+            _notificacoes_indice.insert(posicao, nova)
+        # Folga de 2x sobre a quantidade máxima: a rotação (que regrava o JSON) fica amortizada
+        rotacionar = _retencao_quantidade is not None and len(_datas_indice) >= 2 * _retencao_quantidade
+    if rotacionar:
+        _salvar_notificacoes()
+    return notificacoes
+
+def _rotacionar() -> None:
+    """
+    Move para os arquivos mensais as notificações que saíram da política de
+    retenção: as mais antigas que a idade máxima e, além delas, as mais
+    antigas que excedem a quantidade máxima (sempre um prefixo do índice por data).
+    A gravação dos arquivos é feita fora de _trava_notificacoes, para não
+    atrasar as entregas que acrescentam notificações nesse meio tempo.
+    """
+    global _arquivadas_ate
+    with _trava_rotacao:
+        with _trava_notificacoes:
+            quantidade = 0
+            if _retencao_dias is not None:
+                quantidade = bisect_left(_datas_indice, datetime.now() - timedelta(days=_retencao_dias))
+            if _retencao_quantidade is not None:
+                quantidade = max(quantidade, len(_datas_indice) - _retencao_quantidade)
+            if quantidade <= 0:
+                return
+            antigas = _notificacoes_indice[:quantidade]
+            mais_recente = _datas_indice[quantidade - 1]
+
+        try:
+            arquivar(_diretorio_arquivo(), antigas)
+        except OSError:
+            return  # sem arquivar, nada é descartado do histórico
+
+        arquivadas = {id(n) for n in antigas}
+        with _trava_notificacoes:
+            if _arquivadas_ate is None or _arquivadas_ate < mais_recente:
+                _arquivadas_ate = mais_recente
+            if all(a is b for a, b in zip(_notificacoes_indice, antigas)):
+                del _datas_indice[:quantidade]
+                del _notificacoes_indice[:quantidade]
+            else:
+                # Uma notificação com data antiga entrou no prefixo durante a gravação
+                mantidas = [(d, n) for d, n in zip(_datas_indice, _notificacoes_indice) if id(n) not in arquivadas]
+                _datas_indice[:] = [d for d, _ in mantidas]
+                _notificacoes_indice[:] = [n for _, n in mantidas]
+            _notificacoes[:] = [n for n in _notificacoes if id(n) not in arquivadas]
+
+def _obter_notificacoes() -> List[Dict[str, str]]:
+    """
+    Retorna a lista de notificações em memória, carregando o arquivo se necessário.
+    """
+    if _notificacoes is None:
+        _carregar_notificacoes()
+    return _notificacoes
 
 def _salvar_notificacoes() -> None:
     """
-    Salva notificações da memória no arquivo JSON (executado ao encerrar).
+    Salva notificações da memória no arquivo JSON (executado ao encerrar),
+    depois de arquivar as que saíram da política de retenção.
+    Se as notificações nunca foram carregadas, não há o que gravar.
     """
+    if _notificacoes is None:
+        return
+    _rotacionar()
+    with _trava_notificacoes:
+        notificacoes = list(_notificacoes)
     with open(_ARQUIVO_NOTIFICACOES, 'w', encoding='utf-8') as f:
-        json.dump(_notificacoes, f, ensure_ascii=False, indent=4, default=str)
+        json.dump(notificacoes, f, ensure_ascii=False, indent=4, default=str)
+    # As entregas já estão no JSON: a caixa de saída fica só com os pendentes
+    _obter_caixa().compactar()
 
 # Persistência entre execuções 
 
-# Carrega ao importar
-_carregar_notificacoes()
+# Carrega no primeiro acesso (ver _obter_notificacoes)
+
+# Envios em segundo plano ainda não consultados: ID -> Future
+_envios = {}
+
+def _encerrar() -> None:
+    """
+    Espera os envios em andamento (que ainda podem acrescentar notificações;
+    no máximo config.espera_encerramento_telegram segundos, o que não sair
+    fica pendente na caixa de saída) e grava as notificações (executado ao encerrar).
+    """
+    envio.encerrar()
+    _salvar_notificacoes()
 
 # Persistencia no encerramento
-atexit.register(_salvar_notificacoes)
+atexit.register(_encerrar)
 
 # Funções auxiliares
 
 def setArquivoPersistencia(caminho: str) -> None:
     """
     Altera o caminho do arquivo de persistência (para testes).
+    O novo arquivo é lido no próximo acesso às notificações.
     """
-    global _ARQUIVO_NOTIFICACOES
+    global _ARQUIVO_NOTIFICACOES, _notificacoes, _caixa
     _ARQUIVO_NOTIFICACOES = caminho
-    _carregar_notificacoes()
+    _notificacoes = None
+    if _caixa is not None:
+        _caixa.fechar()
+    _caixa = None
 
 def resetarNotificacoes() -> None:
     """
-    Limpa todas as notificações em memória (para testes).
+    Limpa todas as notificações em memória, a caixa de saída e os arquivos mensais (para testes).
     """
-    global _notificacoes
+    global _notificacoes, _arquivadas_ate
     _notificacoes = []
+    _arquivadas_ate = None
+    _reconstruir_indice(_notificacoes)
+    _obter_caixa().resetar()
+    shutil.rmtree(_diretorio_arquivo(), ignore_errors=True)
+
+def configurarRetencao(quantidade=_MANTER, dias=_MANTER) -> None:
+    """
+    Altera a política de retenção do histórico (os padrões vêm de config).
+    A rotação acontece ao gravar notificacoes.json. Um limite omitido é
+    mantido; None o desativa.
+
+    Args:
+        quantidade (int): máximo de notificações mantidas em memória / no JSON
+        dias (int): idade máxima, em dias, das notificações mantidas
+    """
+    global _retencao_quantidade, _retencao_dias
+    if quantidade is not _MANTER:
+        _retencao_quantidade = quantidade
+    if dias is not _MANTER:
+        _retencao_dias = dias
+
+def aquecerNotificacoes() -> None:
+    """
+    Carrega as notificações imediatamente, em vez de esperar pelo primeiro
+    acesso (para servidores que preferem pagar esse custo na inicialização).
+    """
+    _obter_notificacoes()
 
 
 # Funções de acesso (públicas)
 
 def listarNotificacoes() -> Dict[str, Union[int, str, List[Dict[str, str]]]]:
     """
-    Retorna todas as notificações armazenadas.
+    Retorna as notificações mantidas em memória (as arquivadas pela política
+    de retenção são consultadas com filtrarNotificacoesPorPeriodo, sem que
+    listar precise descomprimir os arquivos mensais).
 
     Returns:
         dict: {"Status": 200, "Content": lista} ou {"Status": 404, "Content": 'Erro ao acessar notificações'}
     """
-    #print(_notificacoes)
-    if _notificacoes:
-        return {"Status": 200, "Content": _notificacoes}
+    notificacoes = _obter_notificacoes()
+    if notificacoes:
+        return {"Status": 200, "Content": notificacoes}
     else:
         return {"Status": 404, "Content": "Erro ao acessar notificações"}
 
@@ -102,18 +307,14 @@ def salvarNotificacao(conteudo: str) -> Dict[str, Union[int, str, List[Dict[str,
     if not conteudo or not isinstance(conteudo, str) or conteudo.strip() == "":
         return {"Status": 404, "Content": "Usuário não encontrado"}
     
-    nova = {
-        "data": datetime.now().isoformat(timespec='seconds'),
-        "conteudo": conteudo.strip()
-    }
+    notificacoes = _acrescentar_notificacao(_nova_notificacao(conteudo))
 
-    _notificacoes.append(nova)
-
-    return {"Status": 200, "Content": _notificacoes}
+    return {"Status": 200, "Content": notificacoes}
 
 def filtrarNotificacoesPorPeriodo(data_inicio: str, data_fim: str) -> Dict[str, Union[int, str, List[Dict[str, str]]]]:
     """
     Filtra notificações armazenadas entre duas datas (inclusive), considerando apenas dia/mês/ano.
+    Inclui as notificações já movidas para os arquivos mensais.
 
     Args:
         data_inicio (str): Data inicial no formato DD/MM/AAAA
@@ -131,47 +332,184 @@ def filtrarNotificacoesPorPeriodo(data_inicio: str, data_fim: str) -> Dict[str,
     if inicio > fim:
         return {"Status": 400, "Content": "Data inicial maior que data final."}
 
-    notificacoes_filtradas = []
-    for n in _notificacoes:
-        try:
-            data_notificacao = datetime.fromisoformat(n["data"]).date()
-            if inicio <= data_notificacao <= fim:
-                notificacoes_filtradas.append(n)
-        except Exception:
-            continue  # ignora notificações mal formatadas
+    # Duas buscas binárias no índice por data: do início do dia inicial ao fim do dia final
+    inicio = datetime.combine(inicio, datetime.min.time())
+    fim = datetime.combine(fim, datetime.max.time())
+    _obter_notificacoes()
+    with _trava_notificacoes:
+        primeira = bisect_left(_datas_indice, inicio)
+        ultima = bisect_right(_datas_indice, fim)
+        notificacoes_filtradas = _notificacoes_indice[primeira:ultima]
+        # Só abre os arquivos mensais se o período começa antes da mais recente arquivada
+        consultar_arquivo = _arquivadas_ate is not None and inicio <= _arquivadas_ate
+
+    if consultar_arquivo:
+        arquivadas = consultar(_diretorio_arquivo(), inicio, fim)
+        # Uma queda entre arquivar e regravar o JSON deixa as mesmas notificações
+        # nos dois lugares: as cópias arquivadas das que estão em memória são descartadas
+        em_memoria = Counter((n.get("data"), n.get("conteudo")) for n in notificacoes_filtradas)
+        unicas = []
+        for notificacao in arquivadas:
+            chave = (notificacao.get("data"), notificacao.get("conteudo"))
+            if em_memoria[chave] > 0:
+                em_memoria[chave] -= 1
+            else:
+                unicas.append(notificacao)
+        arquivadas = unicas
+        if arquivadas:
+            notificacoes_filtradas = list(merge(arquivadas, notificacoes_filtradas,
+                                                key=lambda n: data_da_notificacao(n)))
 
     if notificacoes_filtradas:
         return {"Status": 200, "Content": notificacoes_filtradas}
     else:
         return {"Status": 404, "Content": "Nenhuma notificação no período."}
     
-def enviarNotificacao(chatId: int, conteudo: str) -> Dict[str, Union[int, str]]:
+def _nova_notificacao(conteudo: str) -> Dict[str, str]:
+    return {
+        "data": datetime.now().isoformat(timespec='seconds'),
+        "conteudo": conteudo.strip()
+    }
+
+def _submeter(id_envio: str, chatId: int, conteudo: str, imediato: bool):
+    """
+    Entrega ao despachante um envio já registrado na caixa de saída. Quando
+    ele é entregue, a notificação vai para a caixa e para a memória; falhas
+    definitivas são marcadas na caixa, falhas transitórias (após as
+    repetições) continuam pendentes para o próximo carregamento.
+    """
+    caixa = _obter_caixa()
+
+    def ao_concluir(erro):
+        if erro is None:
+            nova = _nova_notificacao(conteudo)
+            caixa.entregue(id_envio, nova)
+            _acrescentar_notificacao(nova)
+            if caixa.cheia():
+                _salvar_notificacoes()
+        elif not envio.falha_transitoria(erro):
+            caixa.falhou(id_envio, erro)
+
+    futuro = envio.submeter(chatId, conteudo, imediato, ao_concluir)
+    return futuro
+
+def _resposta_do_envio(futuro) -> Dict[str, Union[int, str]]:
+    """
+    Converte o resultado de um envio do despachante na resposta da API do módulo.
+    """
+    import requests
+
+    erro = futuro.exception()
+    if erro is None:
+        return {"Status": 200, "Content": "Mensagem enviada com sucesso"}
+    if (isinstance(erro, requests.exceptions.HTTPError) and erro.response is not None
+            and erro.response.status_code in (400, 403, 404)):
+        return {"Status": 404, "Content": "Chat não encontrado"}
+    return {"Status": 500, "Content": f"Erro ao enviar mensagem: {str(erro)}"}
+
+def _envio_valido(chatId: int, conteudo: str) -> bool:
+    return (isinstance(chatId, int) and chatId > 0
+            and isinstance(conteudo, str) and conteudo.strip() != "")
+
+def _registrar_envio(chatId: int, conteudo: str, imediato: bool):
+    """
+    Registra o envio na caixa de saída e o entrega ao despachante.
+    Retorna (ID do envio, Future).
+    """
+    # Carrega antes de registrar o envio: a recuperação da caixa de saída só
+    # deve reenviar o que ficou pendente de execuções anteriores
+    _obter_notificacoes()
+
+    id_envio = uuid.uuid4().hex
+    _obter_caixa().registrar(id_envio, chatId, conteudo)
+    return id_envio, _submeter(id_envio, chatId, conteudo, imediato)
+
+def enviarNotificacao(chatId: int, conteudo: str, assincrono: bool = False) -> Dict[str, Union[int, str]]:
     """
     Envia uma notificação para o Telegram via API e armazena localmente.
 
     Args:
         chatId (int): ID do usuário no Telegram
         conteudo (str): Texto da mensagem
+        assincrono (bool): Se True, coloca a mensagem na fila do despachante e
+            retorna imediatamente; mensagens do mesmo chat que chegam dentro da
+            janela configurada são enviadas juntas. O resultado é obtido com aguardarEnvio
 
     Returns:
-        dict: {"Status": 200, "Content": "Mensagem enviada com sucesso"} ou erro
+        dict: {"Status": 200, "Content": "Mensagem enviada com sucesso"} ou erro;
+        com assincrono=True, {"Status": 202, "Content": ID do envio}
     """
-    global _notificacoes
-    if not isinstance(chatId, int) or chatId <= 0:
+    if not _envio_valido(chatId, conteudo):
         return {"Status": 404, "Content": "Chat não encontrado"}
 
-    if not conteudo or not isinstance(conteudo, str) or conteudo.strip() == "":
-        return {"Status": 404, "Content": "Chat não encontrado"}
+    id_envio, futuro = _registrar_envio(chatId, conteudo, imediato=not assincrono)
 
-    url = f"https://api.telegram.org/bot{_TELEGRAM_TOKEN}/sendMessage"
-    payload = {"chat_id": chatId, "text": conteudo}
+    if assincrono:
+        _envios[id_envio] = futuro
+        return {"Status": 202, "Content": id_envio}
 
-    try:
-        response = requests.post(url, json=payload)
-        response.raise_for_status()
-        salvarNotificacao(conteudo)  # apenas em memória
-        return {"Status": 200, "Content": "Mensagem enviada com sucesso"}
-    except requests.exceptions.HTTPError:
+    wait([futuro])
+    return _resposta_do_envio(futuro)
+
+def enfileirarNotificacao(chatId: int, conteudo: str) -> Dict[str, Union[int, str]]:
+    """
+    Coloca a notificação na fila do despachante sem guardar o resultado (para
+    alertas que ninguém vai aguardar). Como em enviarNotificacao(assincrono=True),
+    ela é registrada na caixa de saída e vai para o histórico quando entregue.
+
+    Returns:
+        dict: {"Status": 202, "Content": "Notificação enfileirada."} ou {"Status": 404, ...}
+    """
+    if not _envio_valido(chatId, conteudo):
         return {"Status": 404, "Content": "Chat não encontrado"}
-    except Exception as e:
-        return {"Status": 500, "Content": f"Erro ao enviar mensagem: {str(e)}"}
+
+    _registrar_envio(chatId, conteudo, imediato=False)
+    return {"Status": 202, "Content": "Notificação enfileirada."}
+
+def aguardarEnvio(id_envio: str, timeout: Optional[float] = None) -> Dict[str, Union[int, str]]:
+    """
+    Espera (até `timeout` segundos) um envio feito com assincrono=True.
+    O resultado é entregue uma única vez.
+
+    Returns:
+        dict: a resposta do envio (mesmas de enviarNotificacao),
+        {"Status": 202, "Content": "Envio em andamento."} após o timeout ou
+        {"Status": 404, "Content": "Envio não encontrado."}
+    """
+    futuro = _envios.get(id_envio)
+    if futuro is None:
+        return {"Status": 404, "Content": "Envio não encontrado."}
+    if not wait([futuro], timeout=timeout).done:
+        return {"Status": 202, "Content": "Envio em andamento."}
+    del _envios[id_envio]
+    return _resposta_do_envio(futuro)
+
+def configurarEnvio(url_base: Optional[str] = None, timeout=None, janela: Optional[float] = None,
+                    taxa: Optional[float] = None, rajada: Optional[int] = None,
+                    tentativas: Optional[int] = None, espera: Optional[float] = None) -> None:
+    """
+    Altera a configuração do envio (os padrões vêm de config):
+
+    Args:
+        url_base (str): URL base da API do Telegram
+        timeout: timeout das requisições (segundos, ou tupla (conexão, leitura))
+        janela (float): segundos em que mensagens do mesmo chat são agrupadas
+        taxa (float): mensagens por segundo permitidas
+        rajada (int): mensagens seguidas permitidas antes de aplicar a taxa
+        tentativas (int): tentativas por mensagem em falhas transitórias
+        espera (float): espera antes da primeira repetição (dobra a cada tentativa)
+    """
+    envio.configurar(url_base, timeout, janela=janela, taxa=taxa, rajada=rajada,
+                     tentativas=tentativas, espera=espera)
+
+def obterEstatisticasEnvio() -> Dict[str, Union[int, Dict[str, float]]]:
+    """
+    Retorna os contadores do despachante: mensagens na fila, chats com
+    mensagens aguardando a janela, mensagens entregues e com falha,
+    requisições feitas, repetições e latência média/máxima em ms
+    (da submissão ao fim do envio).
+
+    Returns:
+        dict: {"Status": 200, "Content": contadores}
+    """
+    return {"Status": 200, "Content": envio.estatisticas()}
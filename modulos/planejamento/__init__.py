@@ -8,7 +8,10 @@ from .planejamento import (
     obterLimiteDaCategoria,
     criarLancamentoComPlanejamento,
     setArquivoPersistencia,
-    resetarPlanejamento
+    resetarPlanejamento,
+    aquecerPlanejamento,
+    obterAcompanhamentoOrcamento,
+    configurarPeriodoPlanejamento
 )
 
 __all__ = [
@@ -21,5 +24,8 @@ __all__ = [
     "obterLimiteDaCategoria",
     "criarLancamentoComPlanejamento",
     'setArquivoPersistencia',
-    'resetarPlanejamento'
+    'resetarPlanejamento',
+    'aquecerPlanejamento',
+    'obterAcompanhamentoOrcamento',
+    'configurarPeriodoPlanejamento'
 ]
\ No newline at end of file
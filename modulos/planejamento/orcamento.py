@@ -0,0 +1,81 @@
+"""
+Acompanhamento do orçamento por categoria
+INF1301 - Programação Modular
+
+Usado por criarLancamentoComPlanejamento para decidir, a cada despesa, se
+a categoria acabou de ultrapassar o limite planejado:
+- O nome da categoria (ex.: "Alimentação") é convertido uma única vez na
+  chave do planejamento (ex.: "alimentacao"); as categorias de config já
+  vêm calculadas
+- Para cada categoria e período (o mês da despesa, ver
+  config.periodo_planejamento_meses) é guardado o gasto e o limite da última
+  verificação e se ela já estava acima do limite, de modo que a notificação
+  sai uma única vez por período, na despesa que cruza o limite (e de novo só
+  depois de a categoria voltar para baixo dele)
+
+O estado é descartado quando os lançamentos mudam por outro caminho
+(edição, remoção, reset, troca de arquivo) ou quando o planejamento muda:
+nesses casos a categoria é reavaliada a partir do gasto anterior à despesa.
+"""
+
+import unicodedata
+from typing import Dict, List, Optional, Tuple
+
+from config import categorias
+
+
+def _normalizar(categoria: str) -> str:
+    """Minúsculas e sem acento, como as chaves da divisão do planejamento"""
+    return unicodedata.normalize("NFKD", categoria.lower()).encode("ASCII", "ignore").decode("ASCII")
+
+
+# categoria -> chave do planejamento (as de config calculadas na importação)
+_chaves: Dict[str, str] = {categoria: _normalizar(categoria) for categoria in categorias}
+
+
+def chave_da_categoria(categoria: str) -> str:
+    """Chave do planejamento correspondente à categoria (calculada uma vez por nome)"""
+    chave = _chaves.get(categoria)
+    if chave is None:
+        chave = _chaves[categoria] = _normalizar(categoria)
+    return chave
+
+
+class AcompanhamentoOrcamento:
+    """Gasto x limite por categoria e período, com o cruzamento do limite detectado uma única vez"""
+
+    def __init__(self):
+        # (categoria, (ano, mes)) -> [gasto, limite, acima do limite]
+        self._estado: Dict[Tuple[str, Tuple[int, int]], List[object]] = {}
+        self._versao: Optional[int] = None
+
+    def reiniciar(self) -> None:
+        """Descarta o estado (planejamento alterado ou recarregado)"""
+        self._estado = {}
+        self._versao = None
+
+    def registrar_despesa(self, categoria: str, periodo: Tuple[int, int], valor: float, gasto: float,
+                          limite: float, versao_anterior: int, versao_atual: int) -> bool:
+        """
+        Registra uma despesa já gravada. `periodo` é o (ano, mes) da despesa e
+        `gasto` o total da categoria no período depois dela; as versões são as
+        dos lançamentos antes e depois da gravação.
+        Retorna True se esta despesa fez a categoria ultrapassar o limite.
+        """
+        if versao_anterior != self._versao:
+            # Lançamentos alterados por fora desde a última despesa
+            self._estado = {}
+        self._versao = versao_atual
+
+        estado = self._estado.get((categoria, periodo))
+        acima_antes = (gasto - valor > limite) if estado is None else estado[2]
+        acima = gasto > limite
+        self._estado[(categoria, periodo)] = [gasto, limite, acima]
+        return acima and not acima_antes
+
+    def estado(self) -> List[Dict[str, object]]:
+        """Gasto, limite e situação de cada categoria e período verificados, em ordem de período"""
+        return [{"categoria": categoria, "mes": mes, "ano": ano,
+                 "gasto": gasto, "limite": limite, "ultrapassado": acima}
+                for (categoria, (ano, mes)), (gasto, limite, acima)
+                in sorted(self._estado.items(), key=lambda item: item[0][1])]
@@ -12,12 +12,16 @@ Este módulo permite:
 import os
 import json
 from modulos.lancamento import listarLancamentos
-from typing import Dict
+from typing import Dict, Optional
 import atexit
-from modulos.lancamento import criarLancamento, somarDespesasPorCategoria
-from modulos.notificacao import enviarNotificacao
+from modulos.lancamento import criarLancamento, somarDespesasPorCategoria, obterVersaoDados
+from modulos.notificacao import enfileirarNotificacao
+from config import periodo_planejamento_meses
+from .orcamento import AcompanhamentoOrcamento, chave_da_categoria
 
-_CHAT_ID_VALIDO = int(os.getenv("TELEGRAM_CHAT_ID", "0"))  # Pode ser mockado
+# Chat dos alertas; None até o primeiro alerta, quando é lido de
+# TELEGRAM_CHAT_ID depois de carregar o .env (ver _chat_id_alertas)
+_CHAT_ID_VALIDO: Optional[int] = None  # Pode ser mockado
 
 # Dados encapsulados
 _percentuais_padrao: Dict[str, float] = { 
@@ -30,7 +34,15 @@ _percentuais_padrao: Dict[str, float] = {
     "guardar": 0.15
 }
 
-_dados_planejamento: Dict[str, object] = {}
+# Planejamento em memória; None até o primeiro acesso (o arquivo só é lido
+# quando alguma função precisa dele)
+_dados_planejamento: Optional[Dict[str, object]] = None
+
+# Gasto x limite por categoria, para notificar só a despesa que cruza o limite
+_orcamento = AcompanhamentoOrcamento()
+
+# Meses (o da despesa e os anteriores) comparados ao limite da categoria
+_meses_periodo = periodo_planejamento_meses
 
 _BASE_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 _ARQUIVO_PLANEJAMENTO = os.path.join(_BASE_DIR, "data", "planejamento.json")
@@ -38,6 +50,8 @@ _ARQUIVO_PLANEJAMENTO = os.path.join(_BASE_DIR, "data", "planejamento.json")
 
 def _carregar_dados():
     global _dados_planejamento
+    _dados_planejamento = {}
+    _orcamento.reiniciar()
     if os.path.exists(_ARQUIVO_PLANEJAMENTO):
         try:
             with open(_ARQUIVO_PLANEJAMENTO, "r", encoding="utf-8") as f:
@@ -46,7 +60,18 @@ def _carregar_dados():
             _dados_planejamento = {}
 
 
+def _obter_dados():
+    """
+    Retorna o planejamento em memória, carregando o arquivo no primeiro acesso.
+    """
+    if _dados_planejamento is None:
+        _carregar_dados()
+    return _dados_planejamento
+
+
 def _salvar_dados():
+    if _dados_planejamento is None:
+        return  # nunca carregado nem alterado: nada a gravar
     try:
         with open(_ARQUIVO_PLANEJAMENTO, "w", encoding="utf-8") as f:
             json.dump(_dados_planejamento, f, indent=4, ensure_ascii=False)
@@ -56,40 +81,86 @@ def _salvar_dados():
 def setArquivoPersistencia(caminho: str) -> None:
     """
     Altera o caminho do arquivo de persistência (para testes).
+    O novo arquivo é lido no próximo acesso ao planejamento.
     """
-    global _ARQUIVO_PLANEJAMENTO
+    global _ARQUIVO_PLANEJAMENTO, _dados_planejamento
     _ARQUIVO_PLANEJAMENTO = caminho
-    _carregar_dados()
+    _dados_planejamento = None
+    _orcamento.reiniciar()
 
 def resetarPlanejamento() -> None:
     """
-    Limpa todas as notificações em memória (para testes).
+    Limpa o planejamento em memória (para testes).
     """
     global _dados_planejamento
-    _dados_planejamento = []
+    _dados_planejamento = {}
+    _orcamento.reiniciar()
+
+def configurarPeriodoPlanejamento(meses: int):
+    """
+    Altera o número de meses (o mês da despesa e os anteriores) cujas despesas
+    são comparadas ao limite da categoria, multiplicado por esse número.
+    """
+    global _meses_periodo
+    if not isinstance(meses, int) or meses < 1:
+        return {"Error": 400, "Content": "Período inválido"}
+    _meses_periodo = meses
+    _orcamento.reiniciar()
+    return {"Success": 200, "Content": meses}
+
+def _gasto_no_periodo(categoria: str, data) -> float:
+    """Despesas da categoria nos meses do período que termina no mês de `data` (agregados mensais)"""
+    fim = data.year * 12 + data.month - 1
+    return sum(somarDespesasPorCategoria(categoria, indice % 12 + 1, indice // 12)
+               for indice in range(fim - _meses_periodo + 1, fim + 1))
+
+def aquecerPlanejamento() -> None:
+    """
+    Carrega o planejamento imediatamente, em vez de esperar pelo primeiro
+    acesso (para servidores que preferem pagar esse custo na inicialização).
+    """
+    _obter_dados()
 
 
-_carregar_dados()
+# Carregado no primeiro acesso (ver _obter_dados); gravado ao encerrar
 atexit.register(_salvar_dados)
 
+def _chat_id_alertas() -> int:
+    """
+    Carrega o .env (só no primeiro alerta, como o token em modulos.notificacao)
+    e retorna o chat que recebe os alertas de orçamento.
+    """
+    global _CHAT_ID_VALIDO
+    if _CHAT_ID_VALIDO is None:
+        from dotenv import load_dotenv
+        load_dotenv()
+        _CHAT_ID_VALIDO = int(os.getenv("TELEGRAM_CHAT_ID", "0"))
+    return _CHAT_ID_VALIDO
+
 def criarLancamentoComPlanejamento(dados: dict):
     """
-    Cria lançamento e verifica se ultrapassa limite planejado da categoria.
-    Notifica se necessário.
+    Cria lançamento e verifica se ultrapassa limite planejado da categoria
+    no período da despesa (o seu mês, ou os últimos meses conforme
+    configurarPeriodoPlanejamento). Notifica uma única vez por período, na
+    despesa que faz a categoria ultrapassar o limite (o envio é feito em
+    segundo plano, sem atrasar o lançamento).
     """
+    versao_anterior = obterVersaoDados()
     response = criarLancamento(dados)
 
     if response["Status"] != 201:
         return response
 
     if dados["tipo"] == "despesa":
-        categoria = dados["categoria"]
-        gasto_total = somarDespesasPorCategoria(categoria)
-        limite = obterLimiteDaCategoria(categoria)
-
-        print(f"Categoria: {categoria}, Gasto Total: {gasto_total}, Limite: {limite}")
-        if gasto_total > limite:
-            enviarNotificacao(_CHAT_ID_VALIDO, "Atenção! Você ultrapassou o limite planejado para a categoria: " + categoria)
+        categoria, data = response["Content"]["categoria"], response["Content"]["data"]
+        ultrapassou = _orcamento.registrar_despesa(categoria, (data.year, data.month),
+                                                   response["Content"]["valor"],
+                                                   _gasto_no_periodo(categoria, data),
+                                                   obterLimiteDaCategoria(categoria) * _meses_periodo,
+                                                   versao_anterior, obterVersaoDados())
+        if ultrapassou:
+            enfileirarNotificacao(_chat_id_alertas(),
+                                  "Atenção! Você ultrapassou o limite planejado para a categoria: " + categoria)
 
     return response
 
@@ -111,6 +182,7 @@ def calculaDivisaoGastos(salarioBaseUsuario):
         "salario": round(salarioBaseUsuario, 2),
         "divisao": divisao
     }
+    _orcamento.reiniciar()
 
     return {"Success": 200, "Content": _dados_planejamento}
 
@@ -138,6 +210,7 @@ def editarDivisaoGastos(novaDivisaoGastos):
         return {"Error": 400, "Content": "Nova divisão de gastos inválida"}
 
     _dados_planejamento = novaDivisaoGastos
+    _orcamento.reiniciar()
 
     return {"Success": 200, "Content": _dados_planejamento}
 
@@ -146,10 +219,11 @@ def obterDivisaoSalva():
     """
     Retorna a divisão salva atualmente em memória.
     """
-    if not _dados_planejamento:
+    dados = _obter_dados()
+    if not dados:
         return {"Error": 404, "Content": "Divisão não encontrada"}
 
-    return {"Success": 200, "Content": _dados_planejamento}
+    return {"Success": 200, "Content": dados}
 
 
 def obterSalarioMaisRecente():
@@ -182,16 +256,19 @@ def calculaDivisaoDoUltimoSalario():
     salario = salario_response["Content"]
     return calculaDivisaoGastos(salario)
 
-import unicodedata
-
 def obterLimiteDaCategoria(categoria: str) -> float:
     """
     Retorna o valor limite (planejado) para a categoria.
-    A categoria é normalizada para minúsculas e sem acento.
+    A categoria é convertida na chave do planejamento (minúsculas e sem acento).
     Se não existir planejamento, retorna infinito.
     """
-    categoria_normalizada = unicodedata.normalize("NFKD", categoria.lower()) \
-                                        .encode("ASCII", "ignore") \
-                                        .decode("ASCII")
-    
-    return _dados_planejamento.get("divisao", {}).get(categoria_normalizada, float("inf"))
\ No newline at end of file
+    return _obter_dados().get("divisao", {}).get(chave_da_categoria(categoria), float("inf"))
+
+
+def obterAcompanhamentoOrcamento():
+    """
+    Retorna gasto, limite e se o limite foi ultrapassado, por categoria e
+    período (mês da despesa), conforme a última despesa registrada por
+    criarLancamentoComPlanejamento.
+    """
+    return {"Success": 200, "Content": _orcamento.estado()}
\ No newline at end of file
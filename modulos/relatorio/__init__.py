@@ -2,11 +2,21 @@
 from .relatorio import (
     gerar_relatorio_financeiro,
     gerar_comparativo,
+    gerar_comparativo_anos,
     gerar_grafico_pizza_despesas,
+    exportar_pdf,
+    aguardar_pdf,
+    aguardar_grafico,
+    definir_diretorio_pdf,
 )
 
 __all__ = [
     'gerar_relatorio_financeiro',
     'gerar_comparativo',
+    'gerar_comparativo_anos',
     'gerar_grafico_pizza_despesas',
+    'exportar_pdf',
+    'aguardar_pdf',
+    'aguardar_grafico',
+    'definir_diretorio_pdf',
 ]
\ No newline at end of file
@@ -6,42 +6,126 @@ Responsável: Louis Pottier
 Este módulo permite:
 - Fazer o resumo das finanças de um período
 - Ccomparar essas finanças entre dois anos
+- Exportar os resumos em PDF, na hora ou em segundo plano (pool de processos)
+- Gerar o gráfico de despesas na tela ou em PNG/SVG sem interface (backend Agg),
+  com cache pelos totais das categorias
 """
 
+import atexit
+import hashlib
+import io
+import os
+import threading
+import uuid
+from collections import OrderedDict
+from concurrent.futures import Future
 from datetime import datetime
-import matplotlib.pyplot as plt #Para a geracao de diagrama circular
-from config import arquivo_final_dados, categorias, tipos
+from config import categorias, tipos, diretorio_pdf, processos_pdf
+from modulos.lancamento import obterSnapshotLancamentos, obterVersaoDados, obterAlteracoesDesde, calcularSaldoAte
 
-import json
-from datetime import datetime
-import os
-from fpdf import FPDF
+# numpy, matplotlib e fpdf são importados só nas funções que os usam:
+# importar o módulo (e o menu principal) não paga o custo dessas bibliotecas
+
+_CODIGO_TIPO = {tipo: codigo for codigo, tipo in enumerate(tipos)}
+_CODIGO_CATEGORIA = {categoria: codigo for codigo, categoria in enumerate(categorias)}
 
 BASE_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
-_ARQUIVO = os.path.join(BASE_DIR, arquivo_final_dados)
+_diretorio_pdf = os.path.join(BASE_DIR, diretorio_pdf)
+
+# Exportação em segundo plano: pool criado no primeiro uso e trabalhos por ID.
+# Ao terminar, um trabalho passa para _concluidos, que guarda apenas os
+# _LIMITE_TRABALHOS_CONCLUIDOS mais recentes ainda não aguardados
+_pool_exportacao = None
+_LIMITE_TRABALHOS_CONCLUIDOS = 128
+_trabalhos = {}
+_concluidos = OrderedDict()
+_trava_trabalhos = threading.Lock()
+
+# Gráficos já renderizados: hash (formato + totais por categoria) -> bytes.
+# Protegido por trava: os gráficos em segundo plano são guardados pela thread do pool
+_LIMITE_CACHE_GRAFICOS = 128
+_FORMATOS_GRAFICO = ("png", "svg")
+_cache_graficos = OrderedDict()
+_trava_cache_graficos = threading.Lock()
+
+# Cache (versao dos lançamentos, colunas), atualizado quando
+# modulos.lancamento registra uma alteração
+_cache_colunas = (None, None)
+
+
+def _montar_colunas(datas, valores, codigos_tipo, codigos_categoria, ids):
+    """
+    Monta as colunas usadas nos relatórios, ordenadas por data:
+    data (datetime64[us]), ano, valor (arredondado a 2 casas), grupo
+    (tipo * nº de categorias + categoria, para um único np.bincount) e id.
+    """
+    import numpy as np
+
+    ordem = np.argsort(datas, kind="stable")
+    datas = datas[ordem]
+    return {
+        "data": datas,
+        "ano": datas.astype("datetime64[Y]").astype(np.intp) + 1970,
+        "valor": np.round(valores[ordem], 2),
+        "grupo": codigos_tipo[ordem].astype(np.intp) * len(categorias) + codigos_categoria[ordem],
+        "id": ids[ordem],
+    }
+
+
+def _colunas_dos_lancamentos(lancamentos):
+    """Colunas (ver _montar_colunas) dos lançamentos válidos"""
+    import numpy as np
+
+    lancamentos = [l for l in lancamentos if _validar_lancamento(l)]
+    return _montar_colunas(
+        np.array([l["data"] for l in lancamentos], dtype="datetime64[us]"),
+        np.array([l["valor"] for l in lancamentos], dtype=np.float64),
+        np.array([_CODIGO_TIPO[l["tipo"]] for l in lancamentos], dtype=np.intp),
+        np.array([_CODIGO_CATEGORIA[l["categoria"]] for l in lancamentos], dtype=np.intp),
+        np.array([l["id"] for l in lancamentos], dtype=np.int64),
+    )
+
 
-def _carregar_lancamentos():
-    if os.path.exists(_ARQUIVO):
-        with open(_ARQUIVO, 'r', encoding='utf-8') as f:
-            lancamentos = json.load(f)["lancamentos"]
-        # Converte datas de string para datetime
-        for l in lancamentos:
-            if isinstance(l["data"], str):
-                l["data"] = datetime.fromisoformat(l["data"])
-        return lancamentos
-    return []
+def _aplicar_alteracoes(colunas, alteracoes):
+    """
+    Aplica às colunas as alterações pontuais de obterAlteracoesDesde: as linhas
+    dos IDs alterados saem e a versão atual de cada um entra na posição da sua
+    data (np.searchsorted), sem reler os demais lançamentos.
+    """
+    import numpy as np
+
+    atuais = dict(alteracoes)  # última versão de cada ID
+    alterados = np.fromiter(atuais, dtype=np.int64, count=len(atuais))
+    manter = ~np.isin(colunas["id"], alterados)
+    novas = _colunas_dos_lancamentos(l for l in atuais.values() if l is not None)
+    posicoes = np.searchsorted(colunas["data"][manter], novas["data"], side="right")
+    return {nome: np.insert(coluna[manter], posicoes, novas[nome]) for nome, coluna in colunas.items()}
+
+
+def _carregar_colunas():
+    """
+    Colunas NumPy dos lançamentos válidos de modulos.lancamento (inclui
+    alterações em memória). Depois de criações, edições e remoções só as
+    linhas alteradas são refeitas; o snapshot inteiro é relido apenas
+    quando essas alterações não estão disponíveis (reset, importação...).
+    """
+    global _cache_colunas
+
+    versao, colunas = _cache_colunas
+    versao_atual = obterVersaoDados()
+    if versao != versao_atual:
+        alteracoes = obterAlteracoesDesde(versao)
+        if alteracoes is None:
+            colunas = _colunas_dos_lancamentos(obterSnapshotLancamentos())
+        else:
+            colunas = _aplicar_alteracoes(colunas, alteracoes)
+        _cache_colunas = (versao_atual, colunas)
+    return colunas
 
 
 def _calcular_saldo_antes(data_inicio):
-    saldo = 0.0
-    lancamentos = _carregar_lancamentos()
-    for l in lancamentos:
-        if _validar_lancamento(l) and l["data"] < data_inicio:
-            if l["tipo"] == "receita":
-                saldo += l["valor"]
-            elif l["tipo"] == "despesa":
-                saldo -= l["valor"]
-    return saldo
+    """Saldo acumulado antes do período (somas de prefixo de modulos.lancamento)"""
+    return calcularSaldoAte(data_inicio)["Content"]["saldo"]
 
 
 def _validar_lancamento(lancamento):
@@ -53,26 +137,156 @@ def _validar_lancamento(lancamento):
     )
 
 
-def _agrupar_por_categoria(lancamentos_periodo, tipo):
-    categorias = {}
-    total = 0.0
-    for l in lancamentos_periodo:
-        if l["tipo"] == tipo:
-            cat = l["categoria"]
-            categorias[cat] = categorias.get(cat, 0.0) + round(l["valor"], 2)
-            total += round(l["valor"], 2)
-    return categorias, total
+def _totais_por_tipo(somas, quantidades):
+    """
+    Converte vetores (tipo * nº de categorias + categoria) de somas e quantidades
+    em {tipo: ({categoria: soma}, total)}, só com as categorias que têm lançamentos.
+    """
+    import numpy as np
+
+    resultado = {}
+    for codigo_tipo, tipo in enumerate(tipos):
+        faixa = slice(codigo_tipo * len(categorias), (codigo_tipo + 1) * len(categorias))
+        por_categoria = {
+            categorias[codigo]: round(float(somas[faixa][codigo]), 2)
+            for codigo in np.flatnonzero(quantidades[faixa])
+        }
+        resultado[tipo] = (por_categoria, float(somas[faixa].sum()))
+    return resultado
+
 
+def _agrupar_por_categoria(colunas, inicio, fim):
+    """Soma por tipo e categoria das linhas [inicio, fim) com um único np.bincount"""
+    import numpy as np
 
-def gerar_grafico_pizza_despesas(relatorio):
+    grupos = colunas["grupo"][inicio:fim]
+    quantidade_grupos = len(tipos) * len(categorias)
+    somas = np.bincount(grupos, weights=colunas["valor"][inicio:fim], minlength=quantidade_grupos)
+    quantidades = np.bincount(grupos, minlength=quantidade_grupos)
+    return _totais_por_tipo(somas, quantidades)
+
+
+def _agrupar_por_ano(colunas, anos):
+    """
+    Soma por ano, tipo e categoria de todos os anos pedidos numa única passada
+    (um np.bincount sobre ano * grupos + grupo na faixa [menor ano, maior ano]).
+    Retorna {ano: (quantidade de lançamentos, {tipo: ({categoria: soma}, total)})}.
+    """
+    import numpy as np
+
+    primeiro, ultimo = min(anos), max(anos)
+    inicio = np.searchsorted(colunas["data"], np.datetime64(datetime(primeiro, 1, 1), "us"), side="left")
+    fim = np.searchsorted(colunas["data"], np.datetime64(datetime(ultimo + 1, 1, 1), "us"), side="left")
+
+    quantidade_grupos = len(tipos) * len(categorias)
+    tamanho = (ultimo - primeiro + 1) * quantidade_grupos
+    chaves = (colunas["ano"][inicio:fim] - primeiro) * quantidade_grupos + colunas["grupo"][inicio:fim]
+    somas = np.bincount(chaves, weights=colunas["valor"][inicio:fim], minlength=tamanho)
+    quantidades = np.bincount(chaves, minlength=tamanho)
+    somas = somas.reshape(-1, quantidade_grupos)
+    quantidades = quantidades.reshape(-1, quantidade_grupos)
+
+    return {
+        ano: (int(quantidades[ano - primeiro].sum()),
+              _totais_por_tipo(somas[ano - primeiro], quantidades[ano - primeiro]))
+        for ano in anos
+    }
+
+
+def _renderizar_grafico_pizza(categorias_, valores, formato):
+    """
+    Renderiza o gráfico de pizza em bytes (PNG ou SVG) com o backend Agg,
+    sem usar o estado global do pyplot nem precisar de tela.
+    """
+    from matplotlib.figure import Figure
+
+    figura = Figure(figsize=(8, 6))
+    eixo = figura.subplots()
+    eixo.pie(valores, labels=categorias_, autopct='%1.1f%%', startangle=140)
+    eixo.set_title("Distribuição de Despesas por Categoria")
+    eixo.axis('equal')  # para deixar o círculo "perfeito"
+    figura.tight_layout()
+    saida = io.BytesIO()
+    figura.savefig(saida, format=formato)
+    return saida.getvalue()
+
+
+def _chave_grafico(categorias_, valores, formato):
+    """Hash dos totais por categoria (e do formato), usado como chave do cache"""
+    conteudo = repr((formato, sorted(zip(categorias_, valores))))
+    return hashlib.sha256(conteudo.encode("utf-8")).hexdigest()
+
+
+def _obter_grafico(chave):
+    """Bytes do gráfico em cache (marcado como o mais recente) ou None"""
+    with _trava_cache_graficos:
+        imagem = _cache_graficos.get(chave)
+        if imagem is not None:
+            _cache_graficos.move_to_end(chave)
+        return imagem
+
+
+def _guardar_grafico(chave, imagem):
+    with _trava_cache_graficos:
+        _cache_graficos[chave] = imagem
+        _cache_graficos.move_to_end(chave)
+        while len(_cache_graficos) > _LIMITE_CACHE_GRAFICOS:
+            _cache_graficos.popitem(last=False)
+
+
+def gerar_grafico_pizza_despesas(relatorio, formato=None, assincrono=False):
+    """
+    Gera o gráfico de pizza das despesas de um relatório.
+
+    Sem `formato`, abre a janela do matplotlib (plt.show), como antes.
+    Com formato "png" ou "svg", renderiza sem interface e retorna os bytes;
+    gráficos com os mesmos totais por categoria vêm do cache, sem matplotlib.
+    Com `assincrono`, a renderização vai para o pool de processos.
+
+    Retorna (apenas com `formato`):
+        {"Status": 200, "Content": bytes}
+        {"Status": 202, "Content": id do trabalho} se assincrono (ver aguardar_grafico)
+        {"Status": 400, "Content": "Formato inválido."}
+        {"Status": 404, "Content": "Nenhuma despesa para exibir."}
+    """
     despesas = relatorio["Content"]["despesas"]
     categorias = [k for k in despesas if k != "total"]
     valores = [despesas[k] for k in categorias]
 
+    if formato is not None:
+        if formato not in _FORMATOS_GRAFICO:
+            return {"Status": 400, "Content": "Formato inválido."}
+        if not categorias:
+            return {"Status": 404, "Content": "Nenhuma despesa para exibir."}
+
+        chave = _chave_grafico(categorias, valores, formato)
+        imagem = _obter_grafico(chave)
+        if imagem is not None:
+            if not assincrono:
+                return {"Status": 200, "Content": imagem}
+            trabalho = Future()
+            trabalho.set_result(imagem)
+            return {"Status": 202, "Content": _registrar_trabalho(trabalho)}
+
+        if assincrono:
+            def guardar_ao_terminar(trabalho):
+                if not trabalho.cancelled() and trabalho.exception() is None:
+                    _guardar_grafico(chave, trabalho.result())
+
+            trabalho = _pool().submit(_renderizar_grafico_pizza, categorias, valores, formato)
+            trabalho.add_done_callback(guardar_ao_terminar)
+            return {"Status": 202, "Content": _registrar_trabalho(trabalho)}
+
+        imagem = _renderizar_grafico_pizza(categorias, valores, formato)
+        _guardar_grafico(chave, imagem)
+        return {"Status": 200, "Content": imagem}
+
     if not categorias:
         print("Nenhuma despesa para exibir.")
         return
 
+    import matplotlib.pyplot as plt  # Para a geracao de diagrama circular
+
     plt.figure(figsize=(8, 6))
     plt.pie(valores, labels=categorias, autopct='%1.1f%%', startangle=140)
     plt.title("Distribuição de Despesas por Categoria")
@@ -82,6 +296,9 @@ def gerar_grafico_pizza_despesas(relatorio):
 
 
 def _converter_PDF(resumo, nome_arquivo):
+    from fpdf import FPDF
+
+    os.makedirs(os.path.dirname(nome_arquivo) or ".", exist_ok=True)
     pdf = FPDF()
     pdf.add_page()
 
@@ -95,10 +312,118 @@ def _converter_PDF(resumo, nome_arquivo):
     # Salva o PDF
     pdf.output(nome_arquivo)
     print(f"PDF salvo como '{nome_arquivo}'")
+    return nome_arquivo
 
 
+def _pool():
+    """Pool de processos da exportação em segundo plano (criado no primeiro uso)"""
+    global _pool_exportacao
+    if _pool_exportacao is None:
+        from concurrent.futures import ProcessPoolExecutor
+        _pool_exportacao = ProcessPoolExecutor(max_workers=processos_pdf)
+    return _pool_exportacao
 
-def gerar_relatorio_financeiro(periodo, PDF=False):
+
+def _registrar_trabalho(trabalho):
+    """Guarda o Future de um trabalho em segundo plano e retorna seu ID"""
+    id_trabalho = uuid.uuid4().hex
+    with _trava_trabalhos:
+        _trabalhos[id_trabalho] = trabalho
+    trabalho.add_done_callback(lambda _: _concluir_trabalho(id_trabalho))
+    return id_trabalho
+
+
+def _concluir_trabalho(id_trabalho):
+    """
+    Move um trabalho que terminou para _concluidos, descartando os mais
+    antigos além do limite: trabalhos que ninguém aguarda não se acumulam.
+    """
+    with _trava_trabalhos:
+        trabalho = _trabalhos.pop(id_trabalho, None)
+        if trabalho is not None:
+            _concluidos[id_trabalho] = trabalho
+            while len(_concluidos) > _LIMITE_TRABALHOS_CONCLUIDOS:
+                _concluidos.popitem(last=False)
+
+
+def _aguardar_trabalho(id_trabalho, timeout):
+    """Espera um trabalho e o descarta quando termina (resultado entregue uma vez)"""
+    with _trava_trabalhos:
+        trabalho = _trabalhos.get(id_trabalho, _concluidos.get(id_trabalho))
+    if trabalho is None:
+        return {"Status": 404, "Content": "Trabalho não encontrado."}
+    try:
+        resultado = trabalho.result(timeout=timeout)
+    except TimeoutError:
+        return {"Status": 202, "Content": "Trabalho em andamento."}
+    except Exception as erro:
+        resposta = {"Status": 500, "Content": str(erro)}
+    else:
+        resposta = {"Status": 200, "Content": resultado}
+    with _trava_trabalhos:
+        _trabalhos.pop(id_trabalho, None)
+        _concluidos.pop(id_trabalho, None)
+    return resposta
+
+
+def _encerrar_pool():
+    """Espera os trabalhos pendentes e encerra o pool (executado ao encerrar)"""
+    global _pool_exportacao
+    if _pool_exportacao is not None:
+        _pool_exportacao.shutdown(wait=True)
+        _pool_exportacao = None
+
+
+atexit.register(_encerrar_pool)
+
+
+def definir_diretorio_pdf(caminho):
+    """Altera o diretório de saída dos PDFs"""
+    global _diretorio_pdf
+    _diretorio_pdf = caminho
+
+
+def exportar_pdf(relatorio, nome_arquivo):
+    """
+    Envia o resumo de um relatório (ou comparativo) para ser renderizado em PDF
+    por um pool de processos, sem bloquear quem chamou.
+
+    Parâmetros:
+        relatorio: Content de gerar_relatorio_financeiro / gerar_comparativo (usa a chave "resumo")
+        nome_arquivo: nome do PDF dentro do diretório de saída
+
+    Retorna:
+        ID do trabalho, usado em aguardar_pdf
+    """
+    trabalho = _pool().submit(_converter_PDF, relatorio["resumo"], os.path.join(_diretorio_pdf, nome_arquivo))
+    return _registrar_trabalho(trabalho)
+
+
+def aguardar_pdf(id_trabalho, timeout=None):
+    """
+    Espera (até `timeout` segundos) o PDF de um trabalho de exportar_pdf.
+
+    Retorna:
+        PDF gravado: {"Status": 200, "Content": caminho do arquivo}
+        Ainda em andamento após o timeout: {"Status": 202, "Content": "Trabalho em andamento."}
+        Trabalho desconhecido, já aguardado ou entre os concluídos descartados
+        (só os _LIMITE_TRABALHOS_CONCLUIDOS mais recentes ficam guardados):
+            {"Status": 404, "Content": "Trabalho não encontrado."}
+        Falha na renderização: {"Status": 500, "Content": mensagem do erro}
+    """
+    return _aguardar_trabalho(id_trabalho, timeout)
+
+
+def aguardar_grafico(id_trabalho, timeout=None):
+    """
+    Espera (até `timeout` segundos) um gráfico pedido com assincrono=True.
+    Mesmas respostas de aguardar_pdf, com os bytes da imagem no Content.
+    """
+    return _aguardar_trabalho(id_trabalho, timeout)
+
+
+
+def gerar_relatorio_financeiro(periodo, PDF=False, assincrono=False):
         
     """
     Generates a financial report summarizing income and expenses over a specified time period.
@@ -116,6 +441,13 @@ def gerar_relatorio_financeiro(periodo, PDF=False):
             - data_inicio (datetime): The start date of the period.
             - data_final (datetime): The end date of the period.
 
+    PDF : bool, optional
+        If True, exports the summary as a PDF to the configured output directory.
+
+    assincrono : bool, optional
+        If True (with PDF), the PDF is rendered by a background process pool and
+        the report gets a "pdf" key with the job id (see `aguardar_pdf`).
+
     Returns
     -------
     dict
@@ -148,7 +480,9 @@ def gerar_relatorio_financeiro(periodo, PDF=False):
     - This function does not perform database insertion; it only reads and summarizes data.
     """
     
-    lancamentos = _carregar_lancamentos()
+    import numpy as np
+
+    colunas = _carregar_colunas()
     
 
     data_inicio = periodo.get("data_inicio")
@@ -159,18 +493,18 @@ def gerar_relatorio_financeiro(periodo, PDF=False):
         return {"Status": 400, "Content": "Período inválido."}
     
 
-    lancamentos_periodo = [
-        l for l in lancamentos
-        if _validar_lancamento(l) and data_inicio <= l["data"] < data_fim
-    ]
+    # As colunas estão ordenadas por data: o período [inicio, fim) é uma fatia
+    inicio = np.searchsorted(colunas["data"], np.datetime64(data_inicio, "us"), side="left")
+    fim = np.searchsorted(colunas["data"], np.datetime64(data_fim, "us"), side="left")
 
     # Erro 404: se nao tiver lancamento neste periodo
-    if not lancamentos_periodo:
+    if fim <= inicio:
         return {"Status": 404, "Content": "Nenhum lançamento encontrado"}
 
     saldo_inicial = _calcular_saldo_antes(data_inicio)
-    receitas_por_cat, soma_receitas_periodo = _agrupar_por_categoria(lancamentos_periodo, "receita")
-    despesas_por_cat, soma_despesas_periodo = _agrupar_por_categoria(lancamentos_periodo, "despesa")
+    somas = _agrupar_por_categoria(colunas, inicio, fim)
+    receitas_por_cat, soma_receitas_periodo = somas["receita"]
+    despesas_por_cat, soma_despesas_periodo = somas["despesa"]
     saldo_final = saldo_inicial + soma_receitas_periodo - soma_despesas_periodo
     variacao = saldo_final - saldo_inicial
 
@@ -196,13 +530,59 @@ def gerar_relatorio_financeiro(periodo, PDF=False):
         "resumo": resumo
     }
 
-    if PDF:
-        _converter_PDF(resumo, "./tests/pdf_files/relatorio.pdf")
+    if PDF and assincrono:
+        nome = f"relatorio_{relatorio['periodo']['inicio']}_{relatorio['periodo']['fim']}.pdf"
+        relatorio["pdf"] = exportar_pdf(relatorio, nome)
+    elif PDF:
+        _converter_PDF(resumo, os.path.join(_diretorio_pdf, "relatorio.pdf"))
     
 
     return {"Status": 200, "Content": relatorio}
 
 
+def gerar_comparativo_anos(anos):
+    """
+    Resume vários anos completos de uma vez (por exemplo, uma tabela de
+    tendência de 10 anos), agrupando o ledger por ano e categoria numa
+    única passada sobre as colunas em cache.
+
+    Parâmetros:
+        anos: lista de anos (int)
+
+    Retorna:
+        Em caso de sucesso: {"Status": 200, "Content": {ano: {
+            "lancamentos": int,
+            "saldoInicial": float,
+            "receitas": {"total": float, <categoria>: float, ...},
+            "despesas": {"total": float, <categoria>: float, ...},
+            "saldoFinal": float,
+            "variacao": float
+        }}}, com os anos em ordem crescente
+        Em caso de anos inválidos: {"Status": 400, "Content": "Ano inválido"}
+    """
+    if (not anos or not all(isinstance(ano, int) and not isinstance(ano, bool) for ano in anos)
+            or min(anos) < 1 or max(anos) >= 9999):
+        return {"Status": 400, "Content": "Ano inválido"}
+
+    anos = sorted(set(anos))
+    resumo = {}
+    for ano, (quantidade, somas) in _agrupar_por_ano(_carregar_colunas(), anos).items():
+        receitas_por_cat, soma_receitas = somas["receita"]
+        despesas_por_cat, soma_despesas = somas["despesa"]
+        saldo_inicial = _calcular_saldo_antes(datetime(ano, 1, 1))
+        saldo_final = saldo_inicial + soma_receitas - soma_despesas
+        resumo[ano] = {
+            "lancamentos": quantidade,
+            "saldoInicial": round(saldo_inicial, 2),
+            "receitas": {"total": round(soma_receitas, 2), **receitas_por_cat},
+            "despesas": {"total": round(soma_despesas, 2), **despesas_por_cat},
+            "saldoFinal": round(saldo_final, 2),
+            "variacao": round(saldo_final - saldo_inicial, 2),
+        }
+
+    return {"Status": 200, "Content": resumo}
+
+
 def _categoria_maior_dif_despesa(relatorioano1, relatorioano2):
     # Unir todas as categorias presentes em receitas e despesas dos dois anos
     categorias = (
@@ -281,7 +661,7 @@ def _categoria_maior_dif_despesa(relatorioano1, relatorioano2):
     return lista_dif_por_cat, [categoria_maior_gasto, categoria_maior_ganho]
 
 
-def gerar_comparativo(ano1, ano2, PDF=False):
+def gerar_comparativo(ano1, ano2, PDF=False, assincrono=False):
 
     """
     Compares financial data between two full years.
@@ -299,6 +679,11 @@ def gerar_comparativo(ano1, ano2, PDF=False):
         The second year to analyze.
     console : bool, optional
         If True, prints the comparison to the console. Default is False.
+    PDF : bool, optional
+        If True, exports the summary as a PDF to the configured output directory.
+    assincrono : bool, optional
+        If True (with PDF), the PDF is rendered in the background and the
+        comparison gets a "pdf" key with the job id (see `aguardar_pdf`).
 
     Returns
     -------
@@ -346,24 +731,16 @@ def gerar_comparativo(ano1, ano2, PDF=False):
     if ((ano1 < 0) or (ano2 < 0)):
         return {"Status": 400, "Content": "Ano inválido"}
 
-    periodo_ano1 = {
-        "data_inicio": datetime(ano1, 1, 1),
-        "data_final": datetime(ano1+1, 1, 1)
-    }
-    periodo_ano2 = {
-        "data_inicio": datetime(ano2, 1, 1),
-        "data_final": datetime(ano2+1, 1, 1)
-    }
-    res1 = gerar_relatorio_financeiro(periodo_ano1)
-    res2 = gerar_relatorio_financeiro(periodo_ano2)
+    # Os dois anos saem de uma única passada do motor de comparação
+    res = gerar_comparativo_anos([ano1, ano2])
 
-    if (res1["Status"] == 400) or (res2["Status"] == 400):
+    if res["Status"] == 400:
         return {"Status": 400, "Content": "Período inválido."}
-    if (res1["Status"] == 404) or (res2["Status"] == 404):
+    if res["Content"][ano1]["lancamentos"] == 0 or res["Content"][ano2]["lancamentos"] == 0:
         return {"Status": 404, "Content": "Nenhum lançamento encontrado"}
     
-    relatorioano1 = res1["Content"]
-    relatorioano2 = res2["Content"]
+    relatorioano1 = res["Content"][ano1]
+    relatorioano2 = res["Content"][ano2]
 
     print("\nRelatorio ano 1: ", relatorioano1, "\n")
     print("\nRelatorio ano 2: ", relatorioano2, "\n")
@@ -430,10 +807,6 @@ def gerar_comparativo(ano1, ano2, PDF=False):
         resumo += "-- Nenhuma categoria teve redução de despesas. --\n"
 
 
-    if PDF:
-        _converter_PDF(resumo, "./tests/pdf_files/comparativos.pdf")
-
-
     comparativo = {
         "ano1": { "receitas": relatorioano1["receitas"],  "despesas": relatorioano1["despesas"], "saldoFinal": relatorioano1["saldoFinal"]},
         "ano2": { "receitas": relatorioano2["receitas"],  "despesas": relatorioano2["despesas"], "saldoFinal": relatorioano2["saldoFinal"]},
@@ -441,6 +814,12 @@ def gerar_comparativo(ano1, ano2, PDF=False):
         "categorias_variacoes_extremas": [cat_mais_gasto, cat_mais_ganho],
         "resumo": resumo,
     }
+
+    if PDF and assincrono:
+        comparativo["pdf"] = exportar_pdf(comparativo, f"comparativo_{ano1}_{ano2}.pdf")
+    elif PDF:
+        _converter_PDF(resumo, os.path.join(_diretorio_pdf, "comparativos.pdf"))
+
     print("Finalizou legal")   
     print(comparativo)
     return { "Status": 200, "Content": comparativo}
\ No newline at end of file
@@ -0,0 +1,103 @@
+"""
+INF1301 - Programação Modular
+
+Benchmark do envio de notificações.
+
+Sobe um servidor HTTP local que imita o sendMessage do Telegram (com um
+atraso fixo por requisição, simulando a latência da rede) e compara o
+tempo que quem chama fica bloqueado em três formas de envio:
+
+  - requests.post sem sessão (implementação anterior: conexão nova por mensagem)
+  - enviarNotificacao síncrono (sessão com pool de conexões)
+  - enviarNotificacao(assincrono=True) (despachante em segundo plano); também
+    é medido o tempo até a fila esvaziar e quantas requisições foram feitas,
+    já que mensagens do mesmo chat dentro da janela viram uma só
+
+O limite de taxa do despachante é desligado aqui para medir só o transporte.
+
+O servidor local não usa TLS, então o ganho do pool de conexões aparece
+subestimado: contra a API real cada conexão nova também paga o handshake TLS.
+
+Uso (a partir da raiz do projeto):
+    python -m tests.benchmarks.bench_envio [mensagens] [atraso_ms]
+"""
+
+import json
+import os
+import sys
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import requests
+
+from modulos.notificacao import (aguardarEnvio, configurarEnvio, enviarNotificacao,
+                                 obterEstatisticasEnvio, resetarNotificacoes, setArquivoPersistencia)
+
+_CHAT_ID = 123456
+
+
+def _servidor(atraso):
+    class Stub(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+        disable_nagle_algorithm = True  # resposta sem esperar o ACK atrasado do cliente
+
+        def do_POST(self):
+            self.rfile.read(int(self.headers["Content-Length"]))
+            time.sleep(atraso)
+            resposta = json.dumps({"ok": True}).encode()
+            self.send_response(200)
+            self.send_header("Content-Length", str(len(resposta)))
+            self.end_headers()
+            self.wfile.write(resposta)
+
+        def log_message(self, *args):
+            pass
+
+    servidor = ThreadingHTTPServer(("127.0.0.1", 0), Stub)
+    threading.Thread(target=servidor.serve_forever, args=(0.05,), daemon=True).start()
+    return servidor
+
+
+def executar(mensagens=200, atraso_ms=2):
+    servidor = _servidor(atraso_ms / 1000)
+    url = f"http://127.0.0.1:{servidor.server_port}"
+    configurarEnvio(url_base=url, timeout=5, janela=0.05, taxa=1e9, rajada=10**9)
+
+    inicio = time.perf_counter()
+    for i in range(mensagens):
+        requests.post(f"{url}/botTOKEN/sendMessage", json={"chat_id": _CHAT_ID, "text": f"Mensagem {i}"},
+                      timeout=5).raise_for_status()
+    t_sem_sessao = time.perf_counter() - inicio
+
+    resetarNotificacoes()
+    inicio = time.perf_counter()
+    for i in range(mensagens):
+        assert enviarNotificacao(_CHAT_ID, f"Mensagem {i}")["Status"] == 200
+    t_sessao = time.perf_counter() - inicio
+
+    resetarNotificacoes()
+    requisicoes = obterEstatisticasEnvio()["Content"]["requisicoes"]
+    inicio = time.perf_counter()
+    ids = [enviarNotificacao(_CHAT_ID, f"Mensagem {i}", assincrono=True)["Content"] for i in range(mensagens)]
+    t_fila = time.perf_counter() - inicio
+    for id_envio in ids:
+        assert aguardarEnvio(id_envio)["Status"] == 200
+    t_fila_total = time.perf_counter() - inicio
+    requisicoes = obterEstatisticasEnvio()["Content"]["requisicoes"] - requisicoes
+
+    servidor.shutdown()
+    print(f"{mensagens} mensagens, servidor local com {atraso_ms} ms de atraso por requisição")
+    print(f"{'forma de envio':<28} {'bloqueado (ms)':>15} {'por mensagem (ms)':>18}")
+    for nome, tempo in (("requests.post sem sessão", t_sem_sessao), ("sessão (síncrono)", t_sessao),
+                        ("fila (assíncrono)", t_fila)):
+        print(f"{nome:<28} {tempo * 1000:>15.1f} {tempo * 1000 / mensagens:>18.3f}")
+    print(f"fila esvaziada em {t_fila_total * 1000:.1f} ms, com {requisicoes} requisição(ões) "
+          f"(janela de agrupamento de 50 ms)")
+
+
+if __name__ == "__main__":
+    # Nunca lê nem grava o arquivo de produção
+    setArquivoPersistencia(os.path.join(tempfile.mkdtemp(), "notificacoes.json"))
+    executar(*[int(a) for a in sys.argv[1:3]])
@@ -0,0 +1,73 @@
+"""
+INF1301 - Programação Modular
+
+Benchmark do tempo de importação dos módulos (python -X importtime).
+
+Importa os quatro módulos num processo novo e soma o tempo acumulado das
+importações de primeiro nível (descontando as que o interpretador já faz
+ao iniciar). Para comparação, repete a medida importando também as
+bibliotecas pesadas (matplotlib.pyplot, fpdf, numpy, requests, dotenv),
+como acontecia antes de elas passarem a ser importadas só quando um
+gráfico, PDF, relatório ou mensagem é gerado.
+
+Uso (a partir da raiz do projeto):
+    python -m tests.benchmarks.bench_importacao [repeticoes]
+"""
+
+import os
+import subprocess
+import sys
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+MODULOS = ["modulos.lancamento", "modulos.relatorio", "modulos.notificacao", "modulos.planejamento"]
+BIBLIOTECAS_PESADAS = ["matplotlib.pyplot", "fpdf", "numpy", "requests", "dotenv"]
+
+
+def _importacoes(codigo):
+    """Executa `codigo` num processo novo com -X importtime e retorna o log (stderr)"""
+    resultado = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", codigo],
+        cwd=BASE_DIR, capture_output=True, text=True, check=True
+    )
+    return resultado.stderr
+
+
+def _tempos_de_primeiro_nivel(log):
+    tempos = {}
+    for linha in log.splitlines():
+        if not linha.startswith("import time:") or "cumulative" in linha:
+            continue
+        _, acumulado, nome = linha[len("import time:"):].split("|")
+        if not nome.startswith("  "):   # só importações de primeiro nível
+            tempos[nome.strip()] = int(acumulado) / 1000
+    return tempos
+
+
+def medir_importacao(modulos):
+    """
+    Importa `modulos` num processo novo com -X importtime.
+    Retorna (tempo total em ms, {módulo de primeiro nível: ms acumulados}).
+    """
+    inicializacao = _tempos_de_primeiro_nivel(_importacoes("pass"))
+    tempos = {
+        nome: tempo for nome, tempo in _tempos_de_primeiro_nivel(_importacoes("import " + ", ".join(modulos))).items()
+        if nome not in inicializacao
+    }
+    return sum(tempos.values()), tempos
+
+
+def executar(repeticoes=5):
+    cenarios = (("atual", MODULOS), ("com bibliotecas pesadas", BIBLIOTECAS_PESADAS + MODULOS))
+    print(f"Importação de {', '.join(MODULOS)} (mediana de {repeticoes} processos)")
+    for nome, modulos in cenarios:
+        medidas = sorted(medir_importacao(modulos) for _ in range(repeticoes))
+        total, tempos = medidas[len(medidas) // 2]
+        maiores = sorted(tempos.items(), key=lambda item: item[1], reverse=True)[:5]
+        print(f"\n{nome}: {total:.0f} ms")
+        for modulo, tempo in maiores:
+            print(f"  {modulo:<30} {tempo:>8.1f} ms")
+
+
+if __name__ == "__main__":
+    executar(*[int(a) for a in sys.argv[1:2]])
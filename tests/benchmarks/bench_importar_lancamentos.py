@@ -0,0 +1,93 @@
+"""
+INF1301 - Programação Modular
+
+Benchmark da importação em lote de lançamentos.
+
+Gera um extrato (um ano de lançamentos em ordem cronológica, como vem de um
+banco) e compara, em cada armazenamento, a importação com um criarLancamento
+por linha (uma escrita no journal/transação e uma resposta por chamada) com
+importarLancamentos (validação em lote, IDs num bloco, índices e journal
+atualizados uma vez por lote). Também mede a leitura em streaming de um CSV
+e de um JSONL com o mesmo extrato.
+
+Os arquivos ficam num diretório temporário.
+
+Uso (a partir da raiz do projeto):
+    python -m tests.benchmarks.bench_importar_lancamentos [quantidade]
+"""
+
+import csv
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+from modulos.lancamento import (criarLancamento, importarLancamentos, lerLancamentosCSV, lerLancamentosJSONL,
+                                resetarDados, setArmazenamento, setArquivoPersistencia, verificarConsistencia)
+
+_CATEGORIAS = ["Moradia", "Alimentação", "Transporte", "Saúde", "Lazer", "Outros"]
+
+
+def _gerar_extrato(quantidade):
+    random.seed(1301)
+    inicio = datetime(2024, 1, 1)
+    passo = timedelta(days=365) / quantidade
+    return [{"descricao": f"Compra {i}", "valor": round(random.uniform(5, 500), 2), "data": inicio + passo * i,
+             "tipo": "despesa", "categoria": random.choice(_CATEGORIAS)} for i in range(quantidade)]
+
+
+def _gravar_arquivos(extrato, diretorio):
+    caminho_csv = os.path.join(diretorio, "extrato.csv")
+    caminho_jsonl = os.path.join(diretorio, "extrato.jsonl")
+    with open(caminho_csv, "w", encoding="utf-8", newline="") as arquivo:
+        escritor = csv.DictWriter(arquivo, fieldnames=list(extrato[0]))
+        escritor.writeheader()
+        escritor.writerows({**l, "data": l["data"].isoformat()} for l in extrato)
+    with open(caminho_jsonl, "w", encoding="utf-8") as arquivo:
+        for l in extrato:
+            arquivo.write(json.dumps({**l, "data": l["data"].isoformat()}, ensure_ascii=False) + "\n")
+    return caminho_csv, caminho_jsonl
+
+
+def _cronometrar(funcao):
+    inicio = time.perf_counter()
+    funcao()
+    return time.perf_counter() - inicio
+
+
+def executar(quantidade=50_000, diretorio=None):
+    diretorio = diretorio or tempfile.mkdtemp()
+    extrato = _gerar_extrato(quantidade)
+    caminho_csv, caminho_jsonl = _gravar_arquivos(extrato, diretorio)
+
+    print(f"Importação de {quantidade} lançamentos")
+    print(f"{'armazenamento':<14} {'um a um (ms)':>13} {'em lote (ms)':>13} {'ganho':>7}")
+    for tipo in ("memoria", "colunar", "sqlite"):
+        tempos = []
+        for forma in ("um_a_um", "lote"):
+            setArquivoPersistencia(os.path.join(diretorio, f"{tipo}_{forma}.json"))
+            setArmazenamento(tipo)
+            resetarDados()
+            if forma == "um_a_um":
+                tempos.append(_cronometrar(lambda: [criarLancamento(l) for l in extrato]))
+            else:
+                tempos.append(_cronometrar(lambda: importarLancamentos(extrato)))
+            assert verificarConsistencia()["Status"] == 200
+        print(f"{tipo:<14} {tempos[0] * 1000:>13.0f} {tempos[1] * 1000:>13.0f} {tempos[0] / tempos[1]:>6.1f}x")
+
+    setArquivoPersistencia(os.path.join(diretorio, "arquivos.json"))
+    setArmazenamento("memoria")
+    for nome, leitor, caminho in (("CSV", lerLancamentosCSV, caminho_csv), ("JSONL", lerLancamentosJSONL, caminho_jsonl)):
+        resetarDados()
+        resposta = {}
+        tempo = _cronometrar(lambda: resposta.update(importarLancamentos(leitor(caminho))))
+        assert resposta["Content"]["importados"] == quantidade
+        print(f"arquivo {nome:<6} (leitura + importação): {tempo * 1000:.0f} ms")
+
+
+if __name__ == "__main__":
+    # Nunca lê nem grava o arquivo de produção
+    executar(*[int(a) for a in sys.argv[1:2]])
@@ -0,0 +1,100 @@
+"""
+INF1301 - Programação Modular
+
+Benchmark das operações de edição e remoção de lançamentos por ID.
+
+Compara a implementação atual (índice id -> lançamento, consulta O(1))
+com a busca linear usada anteriormente (percorre a lista e ainda faz
+um segundo passo em list.remove). A versão linear é quadrática em
+operações em lote, por isso é medida numa amostra e extrapolada.
+
+Uso (a partir da raiz do projeto):
+    python -m tests.benchmarks.bench_indice_id [quantidade] [amostra]
+"""
+
+import os
+import random
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+from config import categorias, tipos
+from modulos.lancamento import (
+    criarLancamento,
+    editarLancamento,
+    removerLancamento,
+    resetarDados,
+    setArquivoPersistencia,
+)
+
+
+def _gerar_dados(i):
+    return {
+        "descricao": f"Lançamento {i}",
+        "valor": round(random.uniform(10, 5000), 2),
+        "data": datetime(random.randint(2020, 2025), random.randint(1, 12), random.randint(1, 28)),
+        "tipo": random.choice(tipos),
+        "categoria": random.choice(categorias),
+    }
+
+
+# Implementação anterior (busca linear) - usada apenas como referência
+
+def _encontrar_linear(lancamentos, id_lancamento):
+    for lancamento in lancamentos:
+        if lancamento['id'] == id_lancamento:
+            return lancamento
+    return None
+
+
+def _editar_linear(lancamentos, id_lancamento, novos_dados):
+    lancamento = _encontrar_linear(lancamentos, id_lancamento)
+    lancamento.update(novos_dados)
+
+
+def _remover_linear(lancamentos, id_lancamento):
+    lancamento = _encontrar_linear(lancamentos, id_lancamento)
+    lancamentos.remove(lancamento)
+
+
+def _medir(funcao, argumentos):
+    inicio = time.perf_counter()
+    for args in argumentos:
+        funcao(*args)
+    return time.perf_counter() - inicio
+
+
+def executar(quantidade=100_000, amostra=500):
+    random.seed(1301)
+    dados = [_gerar_dados(i) for i in range(quantidade)]
+    novos = [_gerar_dados(i) for i in range(quantidade)]
+
+    # --- Implementação atual (índice por ID) ---
+    resetarDados()
+    ids = [criarLancamento(d)["Content"]["id"] for d in dados]
+    ordem_edicao = random.sample(ids, len(ids))
+    ordem_remocao = random.sample(ids, len(ids))
+
+    t_editar = _medir(editarLancamento, zip(ordem_edicao, novos))
+    t_remover = _medir(removerLancamento, ((i,) for i in ordem_remocao))
+
+    # --- Implementação anterior (busca linear), medida numa amostra ---
+    lista = [dict(d, id=i) for i, d in zip(ids, dados)]
+    amostra = min(amostra, quantidade)
+    t_editar_linear = _medir(_editar_linear, ((lista, i, n) for i, n in zip(ordem_edicao[:amostra], novos)))
+    t_remover_linear = _medir(_remover_linear, ((lista, i) for i in ordem_remocao[:amostra]))
+    fator = quantidade / amostra
+
+    print(f"{quantidade} lançamentos (busca linear medida em {amostra} operações e extrapolada)")
+    print(f"{'operação':<10} {'índice (s)':>12} {'linear (s)':>12} {'ganho':>10}")
+    for nome, novo, antigo in (("editar", t_editar, t_editar_linear * fator),
+                               ("remover", t_remover, t_remover_linear * fator)):
+        print(f"{nome:<10} {novo:>12.3f} {antigo:>12.3f} {antigo / novo:>9.0f}x")
+
+
+if __name__ == "__main__":
+    # Nunca grava no arquivo de produção
+    setArquivoPersistencia(os.path.join(tempfile.mkdtemp(), "lancamentos.json"))
+    argumentos = [int(a) for a in sys.argv[1:3]]
+    executar(*argumentos)
@@ -0,0 +1,78 @@
+"""
+INF1301 - Programação Modular
+
+Benchmark do consumo de memória dos armazenamentos em memória.
+
+Compara o layout atual (um dicionário por lançamento + índices em sets e
+lista ordenada) com o armazenamento colunar (arrays compactos). Os
+lançamentos são gerados como viriam do JSON (strings novas a cada linha)
+e medidos com tracemalloc depois de carregados no armazenamento; o
+resultado é extrapolado para MB por milhão de linhas. O pico inclui os
+dicionários temporários da carga.
+
+Uso (a partir da raiz do projeto):
+    python -m tests.benchmarks.bench_memoria_lancamentos [quantidade]
+"""
+
+import gc
+import os
+import random
+import sys
+import tempfile
+import tracemalloc
+from datetime import datetime
+
+from config import categorias, tipos
+from modulos.lancamento.armazenamento import ArmazenamentoMemoria
+from modulos.lancamento.armazenamento_colunar import ArmazenamentoColunar
+
+_DESCRICOES = ["Supermercado", "Aluguel", "Salário", "Farmácia", "Uber", "Cinema",
+               "Mensalidade", "Conta de luz", "Restaurante", "Transferência"]
+
+
+def _gerar_lancamentos(quantidade):
+    """Lançamentos id -> dicionário, com strings novas como as do json.load"""
+    random.seed(1301)
+    lancamentos = {}
+    for i in range(1, quantidade + 1):
+        lancamentos[i] = {
+            "id": i,
+            "descricao": "".join(random.choice(_DESCRICOES)),
+            "valor": round(random.uniform(10, 5000), 2),
+            "data": datetime(random.randint(2020, 2025), random.randint(1, 12), random.randint(1, 28)),
+            "tipo": "".join(random.choice(tipos)),
+            "categoria": "".join(random.choice(categorias)),
+        }
+    return lancamentos
+
+
+def _medir(classe, quantidade, diretorio):
+    """Retorna (bytes retidos, bytes no pico) do armazenamento carregado"""
+    armazenamento = classe(os.path.join(diretorio, classe.__name__ + ".json"))
+    gc.collect()
+    tracemalloc.start()
+    inicial = tracemalloc.get_traced_memory()[0]
+
+    armazenamento._montar(_gerar_lancamentos(quantidade))
+    gc.collect()
+    atual, pico = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return atual - inicial, pico - inicial
+
+
+def executar(quantidade=200_000):
+    diretorio = tempfile.mkdtemp()
+    escala = 1_000_000 / quantidade / 2 ** 20
+
+    print(f"{quantidade} lançamentos (valores em MB por milhão de linhas)")
+    print(f"{'layout':<12} {'retido':>10} {'pico':>10} {'bytes/linha':>12}")
+    resultados = {}
+    for nome, classe in (("dicionários", ArmazenamentoMemoria), ("colunar", ArmazenamentoColunar)):
+        retido, pico = _medir(classe, quantidade, diretorio)
+        resultados[nome] = retido
+        print(f"{nome:<12} {retido * escala:>10.1f} {pico * escala:>10.1f} {retido / quantidade:>12.0f}")
+    print(f"redução: {resultados['dicionários'] / resultados['colunar']:.1f}x")
+
+
+if __name__ == "__main__":
+    executar(*[int(a) for a in sys.argv[1:2]])
@@ -0,0 +1,84 @@
+"""
+INF1301 - Programação Modular
+
+Benchmark da consulta de notificações por período.
+
+Gera um histórico de notificações (uma a cada poucos minutos, em ordem
+cronológica, como salvarNotificacao produz), grava num arquivo temporário
+e compara filtrarNotificacoesPorPeriodo (duas buscas binárias no índice
+por data e uma fatia) com a implementação anterior, que convertia a data
+ISO de cada notificação a cada consulta e percorria a lista inteira.
+
+Uso (a partir da raiz do projeto):
+    python -m tests.benchmarks.bench_notificacoes [quantidade]
+"""
+
+import json
+import os
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+from modulos.notificacao import aquecerNotificacoes, filtrarNotificacoesPorPeriodo, setArquivoPersistencia
+
+_PERIODO = ("01/03/2025", "07/03/2025")
+
+
+def _gerar_historico(quantidade):
+    inicio = datetime(2024, 1, 1)
+    return [{"data": (inicio + timedelta(minutes=3 * i)).isoformat(timespec="seconds"),
+             "conteudo": f"Atenção! Limite ultrapassado ({i})"} for i in range(quantidade)]
+
+
+# Implementação anterior (varredura com conversão a cada consulta) - usada apenas como referência
+
+def _filtrar_por_varredura(notificacoes, data_inicio, data_fim):
+    inicio = datetime.strptime(data_inicio, "%d/%m/%Y").date()
+    fim = datetime.strptime(data_fim, "%d/%m/%Y").date()
+    filtradas = []
+    for n in notificacoes:
+        try:
+            data_notificacao = datetime.fromisoformat(n["data"]).date()
+            if inicio <= data_notificacao <= fim:
+                filtradas.append(n)
+        except Exception:
+            continue
+    return filtradas
+
+
+def _melhor_tempo(funcao, repeticoes):
+    melhor = float("inf")
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        funcao()
+        melhor = min(melhor, time.perf_counter() - inicio)
+    return melhor
+
+
+def executar(quantidade=500_000, diretorio=None):
+    notificacoes = _gerar_historico(quantidade)
+    arquivo = os.path.join(diretorio or tempfile.mkdtemp(), "notificacoes.json")
+    with open(arquivo, "w", encoding="utf-8") as f:
+        json.dump(notificacoes, f)
+    setArquivoPersistencia(arquivo)
+
+    inicio = time.perf_counter()
+    aquecerNotificacoes()
+    t_carga = time.perf_counter() - inicio
+
+    resposta = filtrarNotificacoesPorPeriodo(*_PERIODO)
+    assert resposta["Content"] == _filtrar_por_varredura(notificacoes, *_PERIODO)
+
+    t_indice = _melhor_tempo(lambda: filtrarNotificacoesPorPeriodo(*_PERIODO), 20)
+    t_varredura = _melhor_tempo(lambda: _filtrar_por_varredura(notificacoes, *_PERIODO), 3)
+
+    print(f"{quantidade} notificações, consulta de uma semana ({len(resposta['Content'])} resultados)")
+    print(f"carga + índice: {t_carga * 1000:.0f} ms")
+    print(f"{'índice (ms)':>12} {'varredura (ms)':>15} {'ganho':>8}")
+    print(f"{t_indice * 1000:>12.3f} {t_varredura * 1000:>15.1f} {t_varredura / t_indice:>7.0f}x")
+
+
+if __name__ == "__main__":
+    # Nunca lê nem grava o arquivo de produção
+    executar(*[int(a) for a in sys.argv[1:2]])
@@ -0,0 +1,90 @@
+"""
+INF1301 - Programação Modular
+
+Benchmark do relatório financeiro de um período.
+
+Compara o cálculo vetorizado atual (fatia por busca binária nas colunas
+ordenadas por data e np.bincount) com a implementação anterior, que
+percorria a lista de lançamentos três vezes (filtro do período,
+agrupamento por tipo e saldo anterior). As colunas são geradas
+diretamente, sem passar pelo armazenamento, e injetadas no cache do
+módulo de relatórios; o saldo anterior vem das somas de prefixo de
+modulos.lancamento (aqui sobre um ledger vazio).
+
+Uso (a partir da raiz do projeto):
+    python -m tests.benchmarks.bench_relatorio [quantidade]
+"""
+
+import os
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+import numpy as np
+
+from config import categorias, tipos
+from modulos.lancamento import obterVersaoDados, setArquivoPersistencia
+from modulos.relatorio import gerar_relatorio_financeiro
+from modulos.relatorio import relatorio as modulo_relatorio
+
+_PERIODO = {"data_inicio": datetime(2024, 1, 1), "data_final": datetime(2025, 1, 1)}
+
+
+def _gerar_colunas(quantidade):
+    gerador = np.random.default_rng(1301)
+    inicio = np.datetime64("2020-01-01", "us").astype(np.int64)
+    fim = np.datetime64("2026-01-01", "us").astype(np.int64)
+    return {
+        "data": gerador.integers(inicio, fim, quantidade).astype("datetime64[us]"),
+        "valor": np.round(gerador.uniform(10, 5000, quantidade), 2),
+        "tipo": gerador.integers(0, len(tipos), quantidade),
+        "categoria": gerador.integers(0, len(categorias), quantidade),
+    }
+
+
+# Implementação anterior (laços em Python) - usada apenas como referência
+
+def _relatorio_por_laco(lancamentos, periodo):
+    data_inicio, data_fim = periodo["data_inicio"], periodo["data_final"]
+    lancamentos_periodo = [l for l in lancamentos if data_inicio <= l["data"] < data_fim]
+    saldo = 0.0
+    for l in lancamentos:
+        if l["data"] < data_inicio:
+            saldo += l["valor"] if l["tipo"] == "receita" else -l["valor"]
+    somas = {}
+    for tipo in tipos:
+        for l in lancamentos_periodo:
+            if l["tipo"] == tipo:
+                somas[(tipo, l["categoria"])] = somas.get((tipo, l["categoria"]), 0.0) + round(l["valor"], 2)
+    return saldo, somas
+
+
+def executar(quantidade=2_000_000):
+    colunas = _gerar_colunas(quantidade)
+    lancamentos = [
+        {"data": data, "valor": valor, "tipo": tipos[tipo], "categoria": categorias[categoria]}
+        for data, valor, tipo, categoria in zip(colunas["data"].tolist(), colunas["valor"].tolist(),
+                                                colunas["tipo"].tolist(), colunas["categoria"].tolist())
+    ]
+    modulo_relatorio._cache_colunas = (obterVersaoDados(), modulo_relatorio._montar_colunas(
+        colunas["data"], colunas["valor"], colunas["tipo"], colunas["categoria"], np.arange(quantidade)))
+
+    inicio = time.perf_counter()
+    resposta = gerar_relatorio_financeiro(_PERIODO)
+    t_vetorizado = time.perf_counter() - inicio
+    assert resposta["Status"] == 200
+
+    inicio = time.perf_counter()
+    _relatorio_por_laco(lancamentos, _PERIODO)
+    t_laco = time.perf_counter() - inicio
+
+    print(f"{quantidade} lançamentos, relatório de um ano")
+    print(f"{'vetorizado (ms)':>16} {'laços (ms)':>12} {'ganho':>8}")
+    print(f"{t_vetorizado * 1000:>16.1f} {t_laco * 1000:>12.1f} {t_laco / t_vetorizado:>7.0f}x")
+
+
+if __name__ == "__main__":
+    # Nunca lê nem grava o arquivo de produção
+    setArquivoPersistencia(os.path.join(tempfile.mkdtemp(), "lancamentos.json"))
+    executar(*[int(a) for a in sys.argv[1:2]])
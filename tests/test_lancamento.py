@@ -4,21 +4,33 @@ import os
 from datetime import datetime
 
 from modulos.lancamento import *
+from modulos.lancamento import armazenamento as modulo_armazenamento
+from modulos.lancamento import lancamento as modulo_lancamento
 from modulos.planejamento import criarLancamentoComPlanejamento
 
 BASE_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 ARQUIVO_TESTE = os.path.join(BASE_DIR, "tests", "data", "lancamentos.json")
 
-# Fixture para preparar ambiente limpo
-@pytest.fixture(autouse=True)
-def ambiente_limpo():
-    setArquivoPersistencia(ARQUIVO_TESTE)
+# Fixture para preparar ambiente limpo (cada teste roda em todos os armazenamentos)
+@pytest.fixture(autouse=True, params=["memoria", "colunar", "sqlite"])
+def ambiente_limpo(request, tmp_path):
+    if request.param == "memoria":
+        setArquivoPersistencia(ARQUIVO_TESTE)
+    else:
+        setArquivoPersistencia(str(tmp_path / "lancamentos.json"))
+    setArmazenamento(request.param)
     resetarDados()
     if os.path.exists(ARQUIVO_TESTE):
         os.remove(ARQUIVO_TESTE)
-    yield
+    yield request.param
+    setArmazenamento("memoria")
     if os.path.exists(ARQUIVO_TESTE):
         os.remove(ARQUIVO_TESTE)
+
+@pytest.fixture
+def armazenamento_com_journal(ambiente_limpo):
+    if ambiente_limpo == "sqlite":
+        pytest.skip("Teste específico dos armazenamentos com journal")
         
 # ---------- FIXTURE: Lançamento válido ----------
 @pytest.fixture
@@ -91,6 +103,12 @@ def test_remover_lancamento_valido(dados_validos):
 def test_remover_lancamento_nao_existente():
     assert removerLancamento(99999)["Status"] == 404
 
+def test_remover_lancamento_duas_vezes(dados_validos):
+    id_lanc = criarLancamento(dados_validos)["Content"]["id"]
+    assert removerLancamento(id_lanc)["Status"] == 200
+    assert removerLancamento(id_lanc)["Status"] == 404
+    assert editarLancamento(id_lanc, dados_validos)["Status"] == 404
+
 def test_remover_lancamento_com_id_invalido():
     assert removerLancamento("abc")["Status"] == 404
     assert removerLancamento(None)["Status"] == 404
@@ -121,6 +139,8 @@ def test_listar_lancamentos_com_chave_invalida(filtros):
 @pytest.mark.parametrize("filtros", [
     {"valor": "cem"},
     {"data": "hoje"},
+    {"data_inicio": "2025-01-01"},
+    {"valor_max": "mil"},
     {"tipo": 123},
     {"categoria": 999}
 ])
@@ -141,6 +161,111 @@ def test_listar_lancamentos_com_filtro_valido(lancamento_listavel, filtros):
     assert isinstance(response["Content"], list)
     assert any(l["descricao"] == "Supermercado" for l in response["Content"])
 
+@pytest.fixture
+def varios_lancamentos():
+    categorias_usadas = ["Alimentação", "Moradia", "Lazer"]
+    for i in range(60):
+        criarLancamento({
+            "descricao": f"L{i}",
+            "valor": float(10 * (i % 7) + 10),
+            "data": datetime(2025, 1 + i % 3, 1 + i % 5, i % 4),
+            "tipo": "despesa" if i % 4 else "receita",
+            "categoria": categorias_usadas[i % 3]
+        })
+
+def _listar_por_varredura(filtros):
+    """Referência: varredura completa com ordenação estável por data decrescente"""
+    todos = [l for l in listarLancamentos()["Content"]]
+    todos.sort(key=lambda l: l["id"])
+    comparacoes = {
+        "data": lambda l, v: l["data"].date() == v.date(),
+        "data_inicio": lambda l, v: l["data"].date() >= v.date(),
+        "data_fim": lambda l, v: l["data"].date() <= v.date(),
+        "valor_min": lambda l, v: l["valor"] >= v,
+        "valor_max": lambda l, v: l["valor"] <= v,
+    }
+    resultado = [
+        l for l in todos
+        if all(comparacoes.get(k, lambda l, v: l[k] == v)(l, v) for k, v in filtros.items())
+    ]
+    resultado.sort(key=lambda l: l["data"], reverse=True)
+    return resultado
+
+@pytest.mark.parametrize("filtros", [
+    {},
+    {"tipo": "despesa"},
+    {"categoria": "Lazer"},
+    {"tipo": "receita", "categoria": "Moradia"},
+    {"data": datetime(2025, 2, 3)},
+    {"data": datetime(2025, 2, 3, 15), "tipo": "despesa"},
+    {"valor": 30.0, "categoria": "Alimentação"},
+    {"valor": 30.0, "data": datetime(2025, 1, 1), "tipo": "despesa", "categoria": "Alimentação"},
+    {"data_inicio": datetime(2025, 2, 1), "data_fim": datetime(2025, 2, 28)},
+    {"data_inicio": datetime(2025, 1, 3, 12), "data_fim": datetime(2025, 2, 2, 1), "tipo": "despesa"},
+    {"data_inicio": datetime(2025, 3, 1), "valor_min": 40},
+    {"valor_min": 20, "valor_max": 50, "categoria": "Lazer"},
+    {"data": datetime(2025, 2, 3), "data_inicio": datetime(2025, 2, 1), "data_fim": datetime(2025, 2, 28)},
+    {"data_inicio": datetime(2025, 3, 1), "data_fim": datetime(2025, 2, 1)},
+])
+def test_listar_lancamentos_equivale_a_varredura(varios_lancamentos, filtros):
+    response = listarLancamentos(filtros)
+    esperado = _listar_por_varredura(filtros)
+    if esperado:
+        assert response["Status"] == 200
+        assert [l["id"] for l in response["Content"]] == [l["id"] for l in esperado]
+    else:
+        assert response["Status"] == 404
+
+def test_listar_lancamentos_apos_editar_e_remover(varios_lancamentos):
+    alvo = listarLancamentos({"categoria": "Lazer"})["Content"][0]
+    editarLancamento(alvo["id"], {**alvo, "categoria": "Moradia", "data": datetime(2024, 1, 1)})
+    assert all(l["id"] != alvo["id"] for l in listarLancamentos({"categoria": "Lazer"})["Content"])
+    assert listarLancamentos({"data": datetime(2024, 1, 1)})["Content"][0]["id"] == alvo["id"]
+    removerLancamento(alvo["id"])
+    assert listarLancamentos({"data": datetime(2024, 1, 1)})["Status"] == 404
+
+# ---------- TESTES: iteração e paginação ----------
+@pytest.mark.parametrize("filtros", [{}, {"tipo": "despesa"}, {"data_inicio": datetime(2025, 2, 1)}])
+def test_iterar_lancamentos_equivale_a_listar(varios_lancamentos, filtros):
+    response = iterarLancamentos(filtros)
+    assert response["Status"] == 200
+    assert list(response["Content"]) == listarLancamentos(filtros)["Content"]
+
+def test_iterar_lancamentos_sem_resultados(varios_lancamentos):
+    assert iterarLancamentos({"data": datetime(2030, 1, 1)})["Status"] == 404
+    assert iterarLancamentos({"foo": 1})["Status"] == 400
+
+@pytest.mark.parametrize("filtros", [
+    {},
+    {"tipo": "receita"},
+    {"categoria": "Lazer", "tipo": "despesa"},
+    {"data_inicio": datetime(2025, 1, 2), "data_fim": datetime(2025, 2, 4)},
+])
+def test_paginar_lancamentos_com_cursor(varios_lancamentos, filtros):
+    esperado = [l["id"] for l in listarLancamentos(filtros)["Content"]]
+    obtido, cursor = [], None
+    while True:
+        response = paginarLancamentos(filtros, limite=7, cursor=cursor)
+        assert response["Status"] == 200
+        assert len(response["Content"]["lancamentos"]) <= 7
+        obtido += [l["id"] for l in response["Content"]["lancamentos"]]
+        cursor = response["Content"]["proximo_cursor"]
+        if cursor is None:
+            break
+    assert obtido == esperado
+
+def test_paginar_lancamentos_com_offset(varios_lancamentos):
+    esperado = [l["id"] for l in listarLancamentos()["Content"]]
+    response = paginarLancamentos(limite=5, offset=10)
+    assert [l["id"] for l in response["Content"]["lancamentos"]] == esperado[10:15]
+    assert paginarLancamentos(limite=5, offset=len(esperado))["Status"] == 404
+
+@pytest.mark.parametrize("parametros", [
+    {"limite": 0}, {"limite": "10"}, {"offset": -1}, {"cursor": "abc"}, {"filtros": {"foo": 1}}
+])
+def test_paginar_lancamentos_parametros_invalidos(parametros):
+    assert paginarLancamentos(**parametros)["Status"] == 400
+
 # ---------- TESTES: saldo mensal ----------
 def test_calcular_saldo_mensal_valido():
     response = calcularSaldoMensal(6, 2025)
@@ -159,3 +284,364 @@ def test_calcular_saldo_sem_lancamentos(mes, ano):
     response = calcularSaldoMensal(mes, ano)
     assert response["Status"] == 200
     assert response["Content"]["saldo"] == 0.0
+
+def _saldo_por_varredura(mes, ano):
+    saldo = 0.0
+    for l in listarLancamentos()["Content"]:
+        if l["data"].month == mes and l["data"].year == ano:
+            saldo += l["valor"] if l["tipo"] == "receita" else -l["valor"]
+    return round(saldo, 2)
+
+def test_calcular_saldo_mensal_acompanha_edicoes(varios_lancamentos):
+    for mes in (1, 2, 3):
+        assert calcularSaldoMensal(mes, 2025)["Content"]["saldo"] == _saldo_por_varredura(mes, 2025)
+
+    alvo = listarLancamentos({"data_inicio": datetime(2025, 3, 1)})["Content"][0]
+    editarLancamento(alvo["id"], {**alvo, "data": datetime(2024, 12, 31), "valor": 999.0})
+    removerLancamento(listarLancamentos({"data_fim": datetime(2025, 1, 31)})["Content"][0]["id"])
+    for mes, ano in ((12, 2024), (1, 2025), (3, 2025)):
+        assert calcularSaldoMensal(mes, ano)["Content"]["saldo"] == _saldo_por_varredura(mes, ano)
+
+def test_calcular_saldos_mensais_intervalo(varios_lancamentos):
+    response = calcularSaldosMensais(11, 2024, 4, 2025)
+    assert response["Status"] == 200
+    assert [(s["mes"], s["ano"]) for s in response["Content"]] == [
+        (11, 2024), (12, 2024), (1, 2025), (2, 2025), (3, 2025), (4, 2025)]
+    for saldo in response["Content"]:
+        assert saldo == calcularSaldoMensal(saldo["mes"], saldo["ano"])["Content"]
+
+@pytest.mark.parametrize("intervalo", [(5, 2025, 4, 2025), (0, 2025, 4, 2025), (1, 2025, 13, 2025)])
+def test_calcular_saldos_mensais_intervalo_invalido(intervalo):
+    assert calcularSaldosMensais(*intervalo)["Status"] == 400
+
+# ---------- TESTES: saldo acumulado ----------
+def _saldo_ate_por_varredura(data):
+    lancamentos = listarLancamentos()
+    lancamentos = lancamentos["Content"] if lancamentos["Status"] == 200 else []
+    return round(sum(l["valor"] if l["tipo"] == "receita" else -l["valor"]
+                     for l in lancamentos if l["data"] < data), 2)
+
+_DATAS_SALDO = [datetime(2024, 1, 1), datetime(2025, 1, 1), datetime(2025, 2, 3),
+                datetime(2025, 2, 3, 1), datetime(2025, 3, 5, 12), datetime(2030, 1, 1)]
+
+def test_calcular_saldo_ate_acompanha_operacoes(varios_lancamentos, dados_validos):
+    def confere():
+        for data in _DATAS_SALDO:
+            assert calcularSaldoAte(data)["Content"]["saldo"] == _saldo_ate_por_varredura(data)
+
+    confere()
+    # Inclusões no fim da ordem de datas (estendem as somas de prefixo)
+    for dia in (10, 11, 12):
+        criarLancamento({**dados_validos, "data": datetime(2025, 3, dia)})
+    confere()
+    # Edição e remoção no meio da ordem (invalidam as somas de prefixo)
+    alvo = listarLancamentos({"data": datetime(2025, 2, 3)})["Content"][0]
+    editarLancamento(alvo["id"], {**alvo, "data": datetime(2024, 6, 1), "tipo": "despesa"})
+    removerLancamento(listarLancamentos({"data": datetime(2025, 1, 1)})["Content"][-1]["id"])
+    confere()
+    # Remoção do lançamento mais recente
+    removerLancamento(listarLancamentos()["Content"][0]["id"])
+    confere()
+    assert verificarConsistencia()["Status"] == 200
+
+def test_calcular_saldo_ate_sem_lancamentos():
+    assert calcularSaldoAte(datetime(2025, 1, 1))["Content"]["saldo"] == 0.0
+
+@pytest.mark.parametrize("data", ["2025-01-01", None, 2025])
+def test_calcular_saldo_ate_data_invalida(data):
+    assert calcularSaldoAte(data)["Status"] == 400
+
+# ---------- TESTES: agregados ----------
+def test_somar_despesas_por_categoria_acompanha_edicoes(varios_lancamentos):
+    def por_varredura(categoria):
+        return sum(l["valor"] for l in listarLancamentos({"tipo": "despesa", "categoria": categoria})["Content"])
+
+    assert somarDespesasPorCategoria("Lazer") == pytest.approx(por_varredura("Lazer"))
+    alvo = listarLancamentos({"tipo": "despesa", "categoria": "Lazer"})["Content"][0]
+    editarLancamento(alvo["id"], {**alvo, "categoria": "Moradia"})
+    assert somarDespesasPorCategoria("Lazer") == pytest.approx(por_varredura("Lazer"))
+    assert somarDespesasPorCategoria("Moradia") == pytest.approx(por_varredura("Moradia"))
+    assert somarDespesasPorCategoria("Educação") == 0
+
+def test_somar_despesas_por_categoria_no_mes(varios_lancamentos):
+    def por_varredura(categoria, mes, ano):
+        despesas = listarLancamentos({"tipo": "despesa", "categoria": categoria})["Content"]
+        return sum(l["valor"] for l in despesas if (l["data"].month, l["data"].year) == (mes, ano))
+
+    meses = {(l["data"].month, l["data"].year) for l in listarLancamentos()["Content"]}
+    for mes, ano in meses:
+        assert somarDespesasPorCategoria("Lazer", mes, ano) == pytest.approx(por_varredura("Lazer", mes, ano))
+    assert sum(somarDespesasPorCategoria("Lazer", mes, ano) for mes, ano in meses) == pytest.approx(
+        somarDespesasPorCategoria("Lazer"))
+
+    # Edição que muda o mês e a categoria da despesa
+    alvo = listarLancamentos({"tipo": "despesa", "categoria": "Lazer"})["Content"][0]
+    editarLancamento(alvo["id"], {**alvo, "categoria": "Moradia", "data": datetime(2023, 7, 15)})
+    mes, ano = alvo["data"].month, alvo["data"].year
+    assert somarDespesasPorCategoria("Lazer", mes, ano) == pytest.approx(por_varredura("Lazer", mes, ano))
+    assert somarDespesasPorCategoria("Moradia", 7, 2023) == pytest.approx(alvo["valor"])
+    assert somarDespesasPorCategoria("Moradia", 12, 2023) == 0
+    assert verificarConsistencia()["Status"] == 200
+
+def test_verificar_consistencia_apos_operacoes(varios_lancamentos):
+    assert verificarConsistencia()["Status"] == 200
+    ids = [l["id"] for l in listarLancamentos()["Content"]]
+    for i, id_lanc in enumerate(ids):
+        if i % 3 == 0:
+            removerLancamento(id_lanc)
+        elif i % 3 == 1:
+            editarLancamento(id_lanc, {
+                "descricao": "Editado", "valor": 12.34, "data": datetime(2023, 1 + i % 12, 1),
+                "tipo": "despesa", "categoria": "Transporte"})
+    assert verificarConsistencia()["Status"] == 200
+    resetarDados()
+    assert verificarConsistencia()["Status"] == 200
+
+# ---------- TESTES: persistência (snapshot + journal) ----------
+def _estado():
+    response = listarLancamentos()
+    return response["Content"] if response["Status"] == 200 else []
+
+def test_journal_reaplicado_ao_recarregar(armazenamento_com_journal, tmp_path, dados_validos):
+    arquivo = str(tmp_path / "lancamentos.json")
+    setArquivoPersistencia(arquivo)
+    resetarDados()
+    ids = [criarLancamento({**dados_validos, "valor": float(i + 1)})["Content"]["id"] for i in range(5)]
+    editarLancamento(ids[1], {**dados_validos, "descricao": "Editado", "data": datetime(2024, 1, 1)})
+    removerLancamento(ids[3])
+    esperado = _estado()
+
+    # Simula um reinício: o snapshot foi gravado apenas no reset
+    setArquivoPersistencia(arquivo)
+    assert _estado() == esperado
+    assert verificarConsistencia()["Status"] == 200
+    assert criarLancamento(dados_validos)["Content"]["id"] == ids[-1] + 1
+
+def test_journal_compactado_em_snapshot(armazenamento_com_journal, tmp_path, dados_validos, monkeypatch):
+    monkeypatch.setattr(modulo_armazenamento, "_LIMITE_JOURNAL", 4)
+    arquivo = tmp_path / "lancamentos.json"
+    setArquivoPersistencia(str(arquivo))
+    resetarDados()
+    for _ in range(10):
+        criarLancamento(dados_validos)
+    journal = tmp_path / "lancamentos.journal"
+    assert len(journal.read_text(encoding="utf-8").splitlines()) < 10
+    esperado = _estado()
+    setArquivoPersistencia(str(arquivo))
+    assert _estado() == esperado
+
+def test_journal_com_linha_incompleta(armazenamento_com_journal, tmp_path, dados_validos):
+    arquivo = str(tmp_path / "lancamentos.json")
+    setArquivoPersistencia(arquivo)
+    resetarDados()
+    criarLancamento(dados_validos)
+    esperado = _estado()
+    with open(tmp_path / "lancamentos.journal", "a", encoding="utf-8") as journal:
+        journal.write('{"op":"criar","lanc')
+
+    setArquivoPersistencia(arquivo)
+    assert _estado() == esperado
+    criarLancamento(dados_validos)
+    setArquivoPersistencia(arquivo)
+    assert len(_estado()) == 2
+
+@pytest.mark.parametrize("linha", ['{"op":"criar"}', '[1, 2]', '{"op":"remover","id":"1"}',
+                                   '{"op":"editar","lancamento":{"id":1,"data":"ontem"}}'])
+def test_journal_com_linha_mal_formada(armazenamento_com_journal, tmp_path, dados_validos, linha):
+    arquivo = str(tmp_path / "lancamentos.json")
+    setArquivoPersistencia(arquivo)
+    resetarDados()
+    criarLancamento(dados_validos)
+    esperado = _estado()
+    with open(tmp_path / "lancamentos.journal", "a", encoding="utf-8") as journal:
+        journal.write(linha + "\n")
+
+    setArquivoPersistencia(arquivo)
+    assert _estado() == esperado
+    assert verificarConsistencia()["Status"] == 200
+    criarLancamento(dados_validos)
+    setArquivoPersistencia(arquivo)
+    assert len(_estado()) == 2
+
+@pytest.mark.parametrize("sincronizar", [True, False])
+def test_journal_sincronizado_com_o_disco(armazenamento_com_journal, tmp_path, dados_validos, monkeypatch,
+                                          sincronizar):
+    setArquivoPersistencia(str(tmp_path / "lancamentos.json"))
+    resetarDados()
+    monkeypatch.setattr(modulo_armazenamento, "_SINCRONIZAR", sincronizar)
+    chamadas = []
+    monkeypatch.setattr(modulo_armazenamento.os, "fsync", chamadas.append)
+    id_lanc = criarLancamento(dados_validos)["Content"]["id"]
+    editarLancamento(id_lanc, {**dados_validos, "descricao": "Editado"})
+    removerLancamento(id_lanc)
+    assert len(chamadas) == (3 if sincronizar else 0)
+
+def test_sqlite_persiste_entre_execucoes(ambiente_limpo, tmp_path, dados_validos):
+    if ambiente_limpo != "sqlite":
+        pytest.skip("Teste específico do armazenamento SQLite")
+    arquivo = str(tmp_path / "ledger.json")
+    setArquivoPersistencia(arquivo)
+    resetarDados()
+    id_lanc = criarLancamento(dados_validos)["Content"]["id"]
+    editarLancamento(id_lanc, {**dados_validos, "descricao": "Editado"})
+    criarLancamento(dados_validos)
+    esperado = _estado()
+
+    setArquivoPersistencia(arquivo)
+    assert os.path.exists(tmp_path / "ledger.sqlite3")
+    assert _estado() == esperado
+    assert esperado[0]["descricao"] == "Editado"
+
+def test_set_armazenamento_desconhecido():
+    with pytest.raises(ValueError):
+        setArmazenamento("planilha")
+
+def test_colunar_le_arquivos_do_armazenamento_em_memoria(tmp_path, dados_validos):
+    arquivo = str(tmp_path / "lancamentos.json")
+    setArquivoPersistencia(arquivo)
+    setArmazenamento("memoria")
+    resetarDados()
+    for i in range(4):
+        criarLancamento({**dados_validos, "descricao": "Mercado", "data": datetime(2025, 6, 1 + i % 2)})
+    esperado = _estado()
+
+    setArmazenamento("colunar")
+    assert _estado() == esperado
+    assert verificarConsistencia()["Status"] == 200
+
+# ---------- TESTES: carga sob demanda ----------
+def test_arquivo_lido_apenas_no_primeiro_acesso(tmp_path, dados_validos):
+    arquivo = str(tmp_path / "lancamentos.json")
+    setArquivoPersistencia(arquivo)
+    resetarDados()
+    criarLancamento(dados_validos)
+    esperado = _estado()
+
+    setArquivoPersistencia(arquivo)
+    assert modulo_lancamento._armazenamento is None
+    assert _estado() == esperado
+    assert modulo_lancamento._armazenamento is not None
+
+def test_aquecer_lancamentos_abre_armazenamento(tmp_path, dados_validos):
+    arquivo = str(tmp_path / "lancamentos.json")
+    setArquivoPersistencia(arquivo)
+    resetarDados()
+    criarLancamento(dados_validos)
+    setArquivoPersistencia(arquivo)
+    versao = obterVersaoDados()
+
+    aquecerLancamentos()
+    assert modulo_lancamento._armazenamento is not None
+    assert obterVersaoDados() == versao
+    assert len(_estado()) == 1
+
+def test_alteracoes_desde_uma_versao(dados_validos):
+    versao = obterVersaoDados()
+    id_lanc = criarLancamento(dados_validos)["Content"]["id"]
+    editarLancamento(id_lanc, {**dados_validos, "descricao": "Editado"})
+    removerLancamento(id_lanc)
+
+    alteracoes = obterAlteracoesDesde(versao)
+    assert [id_alterado for id_alterado, _ in alteracoes] == [id_lanc] * 3
+    assert alteracoes[1][1]["descricao"] == "Editado"
+    assert alteracoes[2][1] is None
+    assert obterAlteracoesDesde(obterVersaoDados()) == []
+    resetarDados()
+    assert obterAlteracoesDesde(versao) is None
+
+# ---------- TESTES: importação em lote ----------
+def _linhas_importacao(quantidade, ano=2025):
+    return [{"descricao": f"Extrato {i}", "valor": float(i % 9 + 1), "data": datetime(ano, 1 + i % 12, 1 + i % 28),
+             "tipo": "despesa" if i % 3 else "receita", "categoria": ["Moradia", "Lazer", "Salario"][i % 3]}
+            for i in range(quantidade)]
+
+def test_importar_lancamentos(dados_validos):
+    criado = criarLancamento(dados_validos)["Content"]["id"]
+    linhas = _linhas_importacao(50)
+    linhas[3] = {**linhas[3], "valor": -1}
+    linhas[10] = {**linhas[10], "categoria": "OutroX"}
+    linhas.insert(20, "não é um lançamento")
+
+    response = importarLancamentos(iter(linhas), tamanho_lote=7)
+    assert response["Status"] == 201
+    assert response["Content"] == {"importados": 48, "ids": [criado + 1, criado + 48], "rejeitados": [4, 11, 21]}
+
+    validos = [l for i, l in enumerate(linhas) if i not in (3, 10, 20)]
+    assert sorted((l["descricao"], l["valor"], l["data"]) for l in _estado() if l["id"] != criado) == sorted(
+        (l["descricao"], l["valor"], l["data"]) for l in validos)
+    assert criarLancamento(dados_validos)["Content"]["id"] == criado + 49
+    assert verificarConsistencia()["Status"] == 200
+
+def test_importar_fora_de_ordem_mantem_indices(varios_lancamentos):
+    assert calcularSaldoAte(datetime(2030, 1, 1))["Status"] == 200  # somas de prefixo já calculadas
+    # Um ano anterior ao ledger e um posterior, em lotes pequenos
+    importarLancamentos(_linhas_importacao(40, ano=2024), tamanho_lote=9)
+    importarLancamentos(_linhas_importacao(40, ano=2026), tamanho_lote=9)
+
+    assert verificarConsistencia()["Status"] == 200
+    filtros = {"data_inicio": datetime(2024, 6, 1), "data_fim": datetime(2026, 2, 1), "tipo": "despesa"}
+    assert listarLancamentos(filtros)["Content"] == _listar_por_varredura(filtros)
+    for data in _DATAS_SALDO + [datetime(2024, 7, 1), datetime(2026, 12, 31)]:
+        assert calcularSaldoAte(data)["Content"]["saldo"] == _saldo_ate_por_varredura(data)
+    assert somarDespesasPorCategoria("Lazer", 2, 2024) == pytest.approx(
+        sum(l["valor"] for l in _linhas_importacao(40, ano=2024)
+            if l["categoria"] == "Lazer" and l["data"].month == 2 and l["tipo"] == "despesa"))
+
+def test_importar_lancamentos_persistidos(tmp_path, monkeypatch):
+    monkeypatch.setattr(modulo_armazenamento, "_LIMITE_JOURNAL", 20)
+    arquivo = str(tmp_path / "lancamentos.json")
+    setArquivoPersistencia(arquivo)
+    resetarDados()
+    importarLancamentos(_linhas_importacao(30))           # maior que o journal: vira snapshot
+    importarLancamentos(_linhas_importacao(5, ano=2023))  # acrescentado ao journal
+    esperado = _estado()
+    assert len(esperado) == 35
+
+    setArquivoPersistencia(arquivo)
+    assert _estado() == esperado
+    assert verificarConsistencia()["Status"] == 200
+
+def test_importar_sem_lancamentos_validos():
+    versao = obterVersaoDados()
+    response = importarLancamentos([{"descricao": ""}, None])
+    assert response == {"Status": 400, "Content": {"importados": 0, "ids": None, "rejeitados": [1, 2]}}
+    assert importarLancamentos([])["Content"]["importados"] == 0
+    assert obterVersaoDados() == versao
+
+def test_ler_lancamentos_csv_e_jsonl(tmp_path):
+    csv_arquivo = tmp_path / "extrato.csv"
+    csv_arquivo.write_text(
+        "data;descricao;valor;tipo;categoria;banco\n"
+        "2025-03-01;Aluguel;1500.00;despesa;Moradia;X\n"
+        "2025-03-05T12:30:00;Cinema;45.5;despesa;Lazer;X\n"
+        "2025-03-06;Valor ruim;abc;despesa;Lazer;X\n"
+        "01/03/2025;Data ruim;10;despesa;Lazer;X\n"
+        "2025-03-07;Não numérico;nan;despesa;Lazer;X\n", encoding="utf-8")
+    jsonl_arquivo = tmp_path / "extrato.jsonl"
+    jsonl_arquivo.write_text(
+        '{"descricao": "Salário", "valor": 5000, "data": "2025-03-01T00:00:00+00:00", '
+        '"tipo": "receita", "categoria": "Salario"}\n'
+        '\n'
+        '{"descricao": "Incompleta"\n'
+        '{"descricao": "Ônibus", "valor": "4.40", "data": "2025-03-02", "tipo": "despesa", "categoria": "Transporte"}\n',
+        encoding="utf-8")
+
+    linhas = list(lerLancamentosCSV(str(csv_arquivo), delimitador=";"))
+    assert linhas[1] == {"descricao": "Cinema", "valor": 45.5, "data": datetime(2025, 3, 5, 12, 30),
+                         "tipo": "despesa", "categoria": "Lazer"}
+    assert importarLancamentos(linhas)["Content"]["rejeitados"] == [3, 4, 5]
+
+    response = importarLancamentos(lerLancamentosJSONL(str(jsonl_arquivo)))
+    assert response["Content"]["importados"] == 2
+    assert response["Content"]["rejeitados"] == [3]  # número da linha no arquivo
+    salario = listarLancamentos({"categoria": "Salario"})["Content"][0]
+    assert salario["data"] == datetime(2025, 3, 1)
+    assert calcularSaldoMensal(3, 2025)["Content"]["saldo"] == round(5000 - 1500 - 45.5 - 4.40, 2)
+
+def test_ler_lancamentos_csv_com_bom(tmp_path):
+    csv_arquivo = tmp_path / "extrato.csv"
+    csv_arquivo.write_text("descricao,valor,data,tipo,categoria\n"
+                           "Aluguel,1500.00,2025-03-01,despesa,Moradia\n", encoding="utf-8-sig")
+    response = importarLancamentos(lerLancamentosCSV(str(csv_arquivo)))
+    assert response["Content"]["importados"] == 1
+    assert response["Content"]["rejeitados"] == []
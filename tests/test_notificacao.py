@@ -1,6 +1,15 @@
 import pytest
 import os
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import time
+from datetime import datetime, timedelta
+from config import (url_api_telegram, timeout_telegram, janela_telegram, espera_telegram,
+                    retencao_notificacoes_quantidade, retencao_notificacoes_dias)
+from modulos.notificacao.envio import Despachante, EnvioInterrompido, falha_transitoria
 from modulos.notificacao import *
+from modulos.notificacao import notificacao as modulo_notificacao
 
 from dotenv import load_dotenv
 
@@ -10,6 +19,7 @@ load_dotenv()
 CHAT_ID_VALIDO = int(os.getenv("TELEGRAM_CHAT_ID", "0"))  # Pode ser mockado
 BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 ARQUIVO_TESTE = os.path.join(BASE_DIR, "tests", "data", "notificacoes.json")
+CAIXA_TESTE = os.path.join(BASE_DIR, "tests", "data", "notificacoes.outbox")
 
 # Fixture para preparar ambiente limpo
 @pytest.fixture(autouse=True)
@@ -19,6 +29,8 @@ def ambiente_limpo():
     if os.path.exists(ARQUIVO_TESTE):
         os.remove(ARQUIVO_TESTE)
     yield
+    setArquivoPersistencia(ARQUIVO_TESTE)
+    resetarNotificacoes()  # apaga também a caixa de saída
     if os.path.exists(ARQUIVO_TESTE):
         os.remove(ARQUIVO_TESTE)
 
@@ -55,7 +67,7 @@ def test_enviar_notificacao_valida(monkeypatch):
         class MockResponse:
             def raise_for_status(self): pass
         return MockResponse()
-    monkeypatch.setattr("requests.post", mock_post)
+    monkeypatch.setattr("requests.Session.post", mock_post)
     response = enviarNotificacao(CHAT_ID_VALIDO, "Saldo abaixo do esperado.")
     assert response["Status"] == 200
     assert response["Content"] == "Mensagem enviada com sucesso"
@@ -70,4 +82,575 @@ def test_enviar_notificacao_chat_invalido(chat_invalido):
 def test_enviar_notificacao_conteudo_invalido(mensagem_invalida):
     response = enviarNotificacao(123456, mensagem_invalida)
     assert response["Status"] == 404
-    assert response["Content"] == "Chat não encontrado"
\ No newline at end of file
+    assert response["Content"] == "Chat não encontrado"
+# Carga sob demanda
+def test_notificacoes_lidas_apenas_no_primeiro_acesso():
+    salvarNotificacao("Persistida")
+    modulo_notificacao._salvar_notificacoes()
+
+    setArquivoPersistencia(ARQUIVO_TESTE)
+    assert modulo_notificacao._notificacoes is None
+    response = listarNotificacoes()
+    assert response["Status"] == 200
+    assert response["Content"][0]["conteudo"] == "Persistida"
+
+def test_aquecer_notificacoes_carrega_arquivo():
+    salvarNotificacao("Persistida")
+    modulo_notificacao._salvar_notificacoes()
+    setArquivoPersistencia(ARQUIVO_TESTE)
+
+    aquecerNotificacoes()
+    assert [n["conteudo"] for n in modulo_notificacao._notificacoes] == ["Persistida"]
+
+def test_notificacoes_nao_carregadas_nao_sao_gravadas():
+    setArquivoPersistencia(ARQUIVO_TESTE)
+    modulo_notificacao._salvar_notificacoes()
+    assert not os.path.exists(ARQUIVO_TESTE)
+
+# Envio contra um servidor HTTP local (stub da API do Telegram)
+CHAT_RECUSADO = 999
+
+class _StubTelegram(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # mantém a conexão aberta entre requisições
+    disable_nagle_algorithm = True  # resposta sem esperar o ACK atrasado do cliente
+
+    def do_POST(self):
+        corpo = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        self.server.recebidas.append((self.path, corpo, self.client_address))
+        status = 400 if corpo["chat_id"] == CHAT_RECUSADO else 200
+        if self.server.falhas > 0:  # falhas transitórias simuladas
+            self.server.falhas -= 1
+            status = 503
+        resposta = json.dumps({"ok": status == 200}).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(resposta)))
+        self.end_headers()
+        self.wfile.write(resposta)
+
+    def log_message(self, *args):
+        pass
+
+@pytest.fixture
+def servidor_telegram():
+    servidor = ThreadingHTTPServer(("127.0.0.1", 0), _StubTelegram)
+    servidor.recebidas = []
+    servidor.falhas = 0
+    thread = threading.Thread(target=servidor.serve_forever, args=(0.05,), daemon=True)
+    thread.start()
+    configurarEnvio(url_base=f"http://127.0.0.1:{servidor.server_port}", timeout=5, janela=0.05, espera=0.01)
+    yield servidor
+    configurarEnvio(url_base=url_api_telegram, timeout=timeout_telegram, janela=janela_telegram,
+                    espera=espera_telegram)
+    servidor.shutdown()
+    servidor.server_close()
+
+def test_enviar_notificacao_servidor_local(servidor_telegram):
+    response = enviarNotificacao(123456, "Saldo abaixo do esperado.")
+    assert response == {"Status": 200, "Content": "Mensagem enviada com sucesso"}
+    caminho, corpo, _ = servidor_telegram.recebidas[0]
+    assert caminho.endswith("/sendMessage")
+    assert corpo == {"chat_id": 123456, "text": "Saldo abaixo do esperado."}
+    assert listarNotificacoes()["Content"][0]["conteudo"] == "Saldo abaixo do esperado."
+
+def test_enviar_notificacao_reaproveita_conexao(servidor_telegram):
+    for i in range(5):
+        assert enviarNotificacao(123456, f"Mensagem {i}")["Status"] == 200
+    assert len({cliente for _, _, cliente in servidor_telegram.recebidas}) == 1
+
+def test_enviar_notificacao_recusada_pelo_servidor(servidor_telegram):
+    response = enviarNotificacao(CHAT_RECUSADO, "Mensagem")
+    assert response == {"Status": 404, "Content": "Chat não encontrado"}
+    assert listarNotificacoes()["Status"] == 404
+
+def test_enviar_notificacao_assincrona(servidor_telegram):
+    ids = [enviarNotificacao(123456, f"Mensagem {i}", assincrono=True) for i in range(3)]
+    assert all(r["Status"] == 202 for r in ids)
+    for r in ids:
+        assert aguardarEnvio(r["Content"], timeout=5)["Status"] == 200
+    assert aguardarEnvio(ids[0]["Content"])["Status"] == 404  # resultado entregue uma vez
+    assert [c["text"] for _, c, _ in servidor_telegram.recebidas] == ["Mensagem 0\nMensagem 1\nMensagem 2"]
+    assert len(listarNotificacoes()["Content"]) == 3
+
+def test_enviar_notificacao_assincrona_recusada(servidor_telegram):
+    response = enviarNotificacao(CHAT_RECUSADO, "Mensagem", assincrono=True)
+    assert aguardarEnvio(response["Content"], timeout=5) == {"Status": 404, "Content": "Chat não encontrado"}
+
+def test_enviar_notificacao_servidor_indisponivel(servidor_telegram):
+    configurarEnvio(url_base="http://127.0.0.1:1", timeout=1)
+    response = enviarNotificacao(123456, "Mensagem")
+    assert response["Status"] == 500
+
+def test_enfileirar_notificacao_nao_guarda_resultado(servidor_telegram):
+    envios = len(modulo_notificacao._envios)
+    for i in range(2):
+        assert enfileirarNotificacao(123456, f"Alerta {i}") == {"Status": 202, "Content": "Notificação enfileirada."}
+    assert len(modulo_notificacao._envios) == envios
+    assert enviarNotificacao(123456, "agora")["Status"] == 200  # leva os alertas pendentes do chat
+    assert [c["text"] for _, c, _ in servidor_telegram.recebidas] == ["Alerta 0\nAlerta 1\nagora"]
+    assert len(listarNotificacoes()["Content"]) == 3
+
+@pytest.mark.parametrize("chat_id, conteudo", [(0, "Alerta"), ("123", "Alerta"), (123456, "  ")])
+def test_enfileirar_notificacao_invalida(chat_id, conteudo):
+    assert enfileirarNotificacao(chat_id, conteudo)["Status"] == 404
+
+def test_aguardar_envio_desconhecido():
+    assert aguardarEnvio("inexistente") == {"Status": 404, "Content": "Envio não encontrado."}
+
+def _estatistica(chave):
+    return obterEstatisticasEnvio()["Content"][chave]
+
+def test_mensagens_do_mesmo_chat_agrupadas(servidor_telegram):
+    ids = [enviarNotificacao(123456, texto, assincrono=True)["Content"] for texto in ("a", "b", "c")]
+    outro = enviarNotificacao(654321, "d", assincrono=True)["Content"]
+    for id_envio in ids + [outro]:
+        assert aguardarEnvio(id_envio, timeout=5)["Status"] == 200
+    enviadas = sorted((c["chat_id"], c["text"]) for _, c, _ in servidor_telegram.recebidas)
+    assert enviadas == [(123456, "a\nb\nc"), (654321, "d")]
+    assert len(listarNotificacoes()["Content"]) == 4
+
+def test_envio_sincrono_leva_mensagens_pendentes_do_chat(servidor_telegram):
+    configurarEnvio(janela=60)
+    pendente = enviarNotificacao(123456, "pendente", assincrono=True)["Content"]
+    assert enviarNotificacao(123456, "agora")["Status"] == 200
+    assert aguardarEnvio(pendente, timeout=0)["Status"] == 200
+    assert [c["text"] for _, c, _ in servidor_telegram.recebidas] == ["pendente\nagora"]
+
+def test_falha_transitoria_repetida(servidor_telegram):
+    repeticoes = _estatistica("repeticoes")
+    servidor_telegram.falhas = 2
+    assert enviarNotificacao(123456, "Mensagem")["Status"] == 200
+    assert len(servidor_telegram.recebidas) == 3
+    assert _estatistica("repeticoes") == repeticoes + 2
+
+def test_falha_transitoria_esgota_tentativas(servidor_telegram):
+    servidor_telegram.falhas = 10
+    configurarEnvio(tentativas=3)
+    try:
+        response = enviarNotificacao(123456, "Mensagem")
+    finally:
+        configurarEnvio(tentativas=4)
+    assert response["Status"] == 500
+    assert len(servidor_telegram.recebidas) == 3
+    assert listarNotificacoes()["Status"] == 404
+
+def test_chat_recusado_nao_e_repetido(servidor_telegram):
+    assert enviarNotificacao(CHAT_RECUSADO, "Mensagem")["Status"] == 404
+    assert len(servidor_telegram.recebidas) == 1
+
+def test_estatisticas_de_envio(servidor_telegram):
+    configurarEnvio(janela=60)
+    entregues = _estatistica("mensagens_entregues")
+    pendente = enviarNotificacao(123456, "pendente", assincrono=True)["Content"]
+    estatisticas = obterEstatisticasEnvio()["Content"]
+    assert estatisticas["fila"] == 1 and estatisticas["chats_pendentes"] == 1
+
+    configurarEnvio(janela=0)
+    assert aguardarEnvio(pendente, timeout=5)["Status"] == 200
+    estatisticas = obterEstatisticasEnvio()["Content"]
+    assert estatisticas["fila"] == 0
+    assert estatisticas["mensagens_entregues"] == entregues + 1
+    assert estatisticas["latencia_maxima_ms"] > 0
+
+def test_despachante_respeita_limite_de_taxa():
+    instantes = []
+    despachante = Despachante(lambda chat, texto: instantes.append(time.monotonic()),
+                              janela=0, taxa=20, rajada=1, tentativas=1, espera=0)
+    futuros = [despachante.submeter(chat, "Mensagem", imediato=True) for chat in range(5)]
+    despachante.encerrar()
+    assert all(f.result() is None for f in futuros)
+    assert instantes[-1] - instantes[0] >= 4 / 20 * 0.9
+
+def test_despachante_divide_mensagens_longas():
+    enviadas = []
+    despachante = Despachante(lambda chat, texto: enviadas.append(texto),
+                              janela=60, taxa=100, rajada=100, tentativas=1, espera=0)
+    for _ in range(3):
+        despachante.submeter(123456, "x" * 2000)
+    despachante.encerrar()  # envia o que está na fila sem esperar a janela
+    assert [len(texto) for texto in enviadas] == [4001, 2000]
+
+def test_despachante_sobrevive_a_ao_concluir_com_erro(caplog):
+    enviadas = []
+    despachante = Despachante(lambda chat, texto: enviadas.append(texto),
+                              janela=0, taxa=100, rajada=100, tentativas=1, espera=0)
+
+    def ao_concluir(erro):
+        raise OSError("disco cheio")
+
+    primeiro = despachante.submeter(123456, "Mensagem 1", imediato=True, ao_concluir=ao_concluir)
+    assert primeiro.result(timeout=3) is None
+    assert despachante.submeter(123456, "Mensagem 2", imediato=True).result(timeout=3) is None
+    despachante.encerrar()
+    assert enviadas == ["Mensagem 1", "Mensagem 2"]
+    assert "disco cheio" in caplog.text
+
+def test_despachante_encerra_sem_esperar_repeticoes():
+    import requests
+    transmitindo = threading.Event()
+
+    def transmitir(chat, texto):
+        transmitindo.set()
+        raise requests.exceptions.ConnectionError("Telegram fora do ar")
+
+    erros = {}
+    despachante = Despachante(transmitir, janela=60, taxa=100, rajada=100, tentativas=4, espera=10)
+    em_andamento = despachante.submeter(1, "Mensagem 1", imediato=True,
+                                        ao_concluir=lambda erro: erros.setdefault(1, erro))
+    na_fila = despachante.submeter(2, "Mensagem 2", ao_concluir=lambda erro: erros.setdefault(2, erro))
+    assert transmitindo.wait(3)
+
+    inicio = time.monotonic()
+    despachante.encerrar(timeout=0.2)
+    assert time.monotonic() - inicio < 2
+    assert isinstance(na_fila.exception(timeout=3), EnvioInterrompido)
+    assert isinstance(em_andamento.exception(timeout=3), requests.exceptions.ConnectionError)
+    # Continuam pendentes na caixa de saída: falha transitória ou ao_concluir não chamado
+    assert falha_transitoria(erros[1]) and 2 not in erros
+    assert despachante.estatisticas()["fila"] == 0
+
+# Caixa de saída (outbox) e recuperação após queda
+def _linhas_caixa(arquivo_json):
+    caixa = os.path.splitext(arquivo_json)[0] + ".outbox"
+    if not os.path.exists(caixa):
+        return []
+    with open(caixa, encoding="utf-8") as f:
+        return [json.loads(linha) for linha in f]
+
+def _escrever_caixa(arquivo_json, registros, final=""):
+    with open(os.path.splitext(arquivo_json)[0] + ".outbox", "w", encoding="utf-8") as f:
+        f.writelines(json.dumps(r) + "\n" for r in registros)
+        f.write(final)
+
+def test_envio_registrado_antes_da_entrega(servidor_telegram, tmp_path):
+    arquivo = str(tmp_path / "notificacoes.json")
+    setArquivoPersistencia(arquivo)
+    configurarEnvio(janela=60)
+    id_envio = enviarNotificacao(123456, "Mensagem", assincrono=True)["Content"]
+    assert _linhas_caixa(arquivo) == [{"op": "pendente", "id": id_envio, "chat_id": 123456, "conteudo": "Mensagem"}]
+
+    configurarEnvio(janela=0)
+    assert aguardarEnvio(id_envio, timeout=5)["Status"] == 200
+    entrega = _linhas_caixa(arquivo)[-1]
+    assert entrega["op"] == "entregue" and entrega["notificacao"]["conteudo"] == "Mensagem"
+
+def test_entregas_sobrevivem_sem_gravar_json(servidor_telegram, tmp_path):
+    arquivo = str(tmp_path / "notificacoes.json")
+    setArquivoPersistencia(arquivo)
+    assert enviarNotificacao(123456, "Mensagem")["Status"] == 200
+
+    setArquivoPersistencia(arquivo)  # reinício sem passar pelo atexit
+    assert not os.path.exists(arquivo)
+    assert [n["conteudo"] for n in listarNotificacoes()["Content"]] == ["Mensagem"]
+
+def test_recuperacao_reenvia_pendentes(servidor_telegram, tmp_path):
+    arquivo = str(tmp_path / "notificacoes.json")
+    _escrever_caixa(arquivo, [
+        {"op": "pendente", "id": "a", "chat_id": 123456, "conteudo": "Entregue"},
+        {"op": "entregue", "id": "a", "notificacao": {"data": "2025-06-01T10:00:00", "conteudo": "Entregue"}},
+        {"op": "pendente", "id": "b", "chat_id": 123456, "conteudo": "Pendente"},
+    ])
+    setArquivoPersistencia(arquivo)
+    aquecerNotificacoes()
+
+    # O resultado do reenvio não é guardado para aguardarEnvio
+    assert aguardarEnvio("b")["Status"] == 404
+    modulo_notificacao.envio.encerrar()  # espera o reenvio
+    assert [c["text"] for _, c, _ in servidor_telegram.recebidas] == ["Pendente"]
+    assert [n["conteudo"] for n in listarNotificacoes()["Content"]] == ["Entregue", "Pendente"]
+
+def test_falha_definitiva_nao_e_reenviada(servidor_telegram, tmp_path):
+    arquivo = str(tmp_path / "notificacoes.json")
+    setArquivoPersistencia(arquivo)
+    assert enviarNotificacao(CHAT_RECUSADO, "Mensagem")["Status"] == 404
+    assert _linhas_caixa(arquivo)[-1]["op"] == "falha"
+
+    setArquivoPersistencia(arquivo)
+    aquecerNotificacoes()
+    assert len(servidor_telegram.recebidas) == 1
+
+def test_gravar_json_compacta_caixa(servidor_telegram, tmp_path):
+    arquivo = str(tmp_path / "notificacoes.json")
+    setArquivoPersistencia(arquivo)
+    assert enviarNotificacao(123456, "Mensagem")["Status"] == 200
+    modulo_notificacao._salvar_notificacoes()
+    assert _linhas_caixa(arquivo) == []
+
+    setArquivoPersistencia(arquivo)
+    assert len(listarNotificacoes()["Content"]) == 1
+
+def test_recuperacao_nao_duplica_entregas_ja_gravadas(tmp_path):
+    arquivo = str(tmp_path / "notificacoes.json")
+    notificacao = {"data": "2025-06-01T10:00:00", "conteudo": "Mensagem"}
+    with open(arquivo, "w", encoding="utf-8") as f:
+        json.dump([notificacao], f)
+    # Queda entre gravar o JSON e compactar a caixa
+    _escrever_caixa(arquivo, [{"op": "entregue", "id": "a", "notificacao": notificacao}])
+    setArquivoPersistencia(arquivo)
+    assert listarNotificacoes()["Content"] == [notificacao]
+
+def test_recuperacao_descarta_linha_incompleta(tmp_path):
+    arquivo = str(tmp_path / "notificacoes.json")
+    notificacao = {"data": "2025-06-01T10:00:00", "conteudo": "Mensagem"}
+    _escrever_caixa(arquivo, [{"op": "entregue", "id": "a", "notificacao": notificacao}], final='{"op": "pend')
+    setArquivoPersistencia(arquivo)
+    assert listarNotificacoes()["Content"] == [notificacao]
+    assert len(_linhas_caixa(arquivo)) == 1
+
+@pytest.mark.parametrize("linha", ['{"op": "entregue", "id": "b"}', '[1, 2]',
+                                   '{"op": "pendente", "id": "b", "conteudo": "Sem chat"}'])
+def test_recuperacao_descarta_linha_mal_formada(tmp_path, linha):
+    arquivo = str(tmp_path / "notificacoes.json")
+    notificacao = {"data": "2025-06-01T10:00:00", "conteudo": "Mensagem"}
+    _escrever_caixa(arquivo, [{"op": "entregue", "id": "a", "notificacao": notificacao}], final=linha + "\n")
+    setArquivoPersistencia(arquivo)
+    assert listarNotificacoes()["Content"] == [notificacao]
+    assert len(_linhas_caixa(arquivo)) == 1
+
+def test_caixa_sincronizada_com_o_disco(tmp_path, monkeypatch):
+    arquivo = str(tmp_path / "notificacoes.json")
+    setArquivoPersistencia(arquivo)
+    chamadas = []
+    monkeypatch.setattr(os, "fsync", chamadas.append)
+    modulo_notificacao._obter_caixa().registrar("a", 123456, "Mensagem")
+    modulo_notificacao._obter_caixa().entregue("a", {"data": "2025-06-01T10:00:00", "conteudo": "Mensagem"})
+    assert len(chamadas) == 2
+
+# Consulta por período (índice por data)
+def _filtrar_por_varredura(notificacoes, inicio, fim):
+    inicio = datetime.strptime(inicio, "%d/%m/%Y").date()
+    fim = datetime.strptime(fim, "%d/%m/%Y").date()
+    resultado = []
+    for n in notificacoes:
+        try:
+            if inicio <= datetime.fromisoformat(n["data"]).date() <= fim:
+                resultado.append(n)
+        except Exception:
+            continue
+    return resultado
+
+def _data_sem_fuso(data):
+    return datetime.fromisoformat(data).replace(tzinfo=None)
+
+@pytest.fixture
+def historico(tmp_path):
+    notificacoes = [{"data": (datetime(2025, 1, 1, 8) + timedelta(hours=13 * i)).isoformat(timespec="seconds"),
+                     "conteudo": f"Notificação {i}"} for i in range(200)]
+    notificacoes.insert(50, {"data": "ontem", "conteudo": "Mal formatada"})
+    notificacoes.insert(120, {"data": "2025-01-03T10:00:00+00:00", "conteudo": "Com fuso"})
+    notificacoes.append({"data": "2025-01-02T00:00:00", "conteudo": "Fora de ordem"})
+    arquivo = str(tmp_path / "notificacoes.json")
+    with open(arquivo, "w", encoding="utf-8") as f:
+        json.dump(notificacoes, f)
+    setArquivoPersistencia(arquivo)
+    return notificacoes
+
+@pytest.mark.parametrize("inicio,fim", [
+    ("01/01/2025", "31/12/2025"), ("02/01/2025", "02/01/2025"), ("03/01/2025", "10/01/2025"),
+    ("15/02/2025", "20/02/2025"), ("01/01/2024", "31/12/2024"), ("31/12/9999", "31/12/9999")])
+def test_filtrar_por_periodo_equivale_a_varredura(historico, inicio, fim):
+    esperado = sorted(_filtrar_por_varredura(historico, inicio, fim),
+                      key=lambda n: _data_sem_fuso(n["data"]))
+    response = filtrarNotificacoesPorPeriodo(inicio, fim)
+    if esperado:
+        assert response == {"Status": 200, "Content": esperado}
+    else:
+        assert response == {"Status": 404, "Content": "Nenhuma notificação no período."}
+
+def test_filtrar_por_periodo_inclui_novas_notificacoes(historico):
+    salvarNotificacao("Nova")
+    hoje = datetime.now().strftime("%d/%m/%Y")
+    assert filtrarNotificacoesPorPeriodo(hoje, hoje)["Content"][-1]["conteudo"] == "Nova"
+    assert listarNotificacoes()["Content"][-1]["conteudo"] == "Nova"
+
+@pytest.mark.parametrize("inicio,fim,status", [
+    ("2025-01-01", "31/12/2025", 400), ("10/01/2025", "01/01/2025", 400)])
+def test_filtrar_por_periodo_invalido(inicio, fim, status):
+    assert filtrarNotificacoesPorPeriodo(inicio, fim)["Status"] == status
+
+# Retenção e arquivos mensais
+@pytest.fixture
+def retencao():
+    yield configurarRetencao
+    configurarRetencao(quantidade=retencao_notificacoes_quantidade, dias=retencao_notificacoes_dias)
+
+def _gravar_historico(arquivo, datas):
+    notificacoes = [{"data": data.isoformat(timespec="seconds"), "conteudo": f"Notificação {i}"}
+                    for i, data in enumerate(datas)]
+    with open(arquivo, "w", encoding="utf-8") as f:
+        json.dump(notificacoes, f)
+    setArquivoPersistencia(arquivo)
+    return notificacoes
+
+def test_rotacao_por_quantidade(tmp_path, retencao):
+    arquivo = str(tmp_path / "notificacoes.json")
+    recentes = datetime.now() - timedelta(days=30)
+    notificacoes = _gravar_historico(arquivo, [recentes + timedelta(hours=7 * i) for i in range(25)])
+    retencao(quantidade=10, dias=365)
+    aquecerNotificacoes()
+    modulo_notificacao._salvar_notificacoes()
+
+    assert listarNotificacoes()["Content"] == notificacoes[-10:]
+    with open(arquivo, encoding="utf-8") as f:
+        assert json.load(f) == notificacoes[-10:]
+    assert sorted(os.listdir(tmp_path / "notificacoes_arquivo"))[0].endswith(".jsonl.gz")
+
+    inicio = recentes.strftime("%d/%m/%Y")
+    fim = (recentes + timedelta(days=30)).strftime("%d/%m/%Y")
+    assert filtrarNotificacoesPorPeriodo(inicio, fim)["Content"] == notificacoes
+
+def test_rotacao_por_idade(tmp_path, retencao):
+    arquivo = str(tmp_path / "notificacoes.json")
+    agora = datetime.now()
+    notificacoes = _gravar_historico(arquivo, [agora - timedelta(days=dias) for dias in (400, 200, 95, 10, 1)])
+    retencao(quantidade=1000, dias=90)
+    aquecerNotificacoes()
+    modulo_notificacao._salvar_notificacoes()
+
+    assert listarNotificacoes()["Content"] == notificacoes[3:]
+    assert len(os.listdir(tmp_path / "notificacoes_arquivo")) == 3
+    antiga = (agora - timedelta(days=400)).strftime("%d/%m/%Y")
+    assert filtrarNotificacoesPorPeriodo(antiga, antiga)["Content"] == notificacoes[:1]
+
+    setArquivoPersistencia(arquivo)  # as arquivadas continuam consultáveis após recarregar
+    inicio = (agora - timedelta(days=500)).strftime("%d/%m/%Y")
+    assert filtrarNotificacoesPorPeriodo(inicio, agora.strftime("%d/%m/%Y"))["Content"] == notificacoes
+
+def test_retencao_desativada_por_padrao(tmp_path):
+    arquivo = str(tmp_path / "notificacoes.json")
+    notificacoes = _gravar_historico(arquivo, [datetime(2025, 6, 30, 22, 34), datetime(2025, 6, 30, 22, 55)])
+    aquecerNotificacoes()
+    modulo_notificacao._salvar_notificacoes()
+
+    assert not os.path.exists(tmp_path / "notificacoes_arquivo")
+    setArquivoPersistencia(arquivo)
+    assert listarNotificacoes()["Content"] == notificacoes
+
+def test_listar_nao_le_os_arquivos_mensais(tmp_path, retencao, monkeypatch):
+    arquivo = str(tmp_path / "notificacoes.json")
+    agora = datetime.now()
+    _gravar_historico(arquivo, [agora - timedelta(days=dias) for dias in (400, 200)])
+    retencao(dias=90)
+    aquecerNotificacoes()
+    modulo_notificacao._salvar_notificacoes()
+
+    def falhar(*args):
+        raise AssertionError("arquivos mensais lidos")
+
+    monkeypatch.setattr(modulo_notificacao, "consultar", falhar)
+    assert modulo_notificacao._notificacoes == []
+    assert listarNotificacoes()["Status"] == 404
+
+def test_cada_rotacao_grava_um_arquivo_do_mes(tmp_path, retencao):
+    arquivo = str(tmp_path / "notificacoes.json")
+    retencao(quantidade=2, dias=365)
+    setArquivoPersistencia(arquivo)
+    resetarNotificacoes()
+    for i in range(4):  # a 4ª notificação atinge o dobro do limite e dispara a rotação
+        salvarNotificacao(f"Mensagem {i}")
+    assert len(listarNotificacoes()["Content"]) == 2
+    for i in range(4, 8):
+        salvarNotificacao(f"Mensagem {i}")
+
+    hoje = datetime.now().strftime("%d/%m/%Y")
+    conteudos = [n["conteudo"] for n in filtrarNotificacoesPorPeriodo(hoje, hoje)["Content"]]
+    assert conteudos == [f"Mensagem {i}" for i in range(8)]
+    mensais = os.listdir(tmp_path / "notificacoes_arquivo")
+    assert len(mensais) == 3  # rotações ao chegar a 4 notificações em memória
+    assert all(nome.startswith(datetime.now().strftime("%Y-%m.")) for nome in mensais)
+
+def test_arquivo_mensal_corrompido_nao_afeta_rotacoes_seguintes(tmp_path, retencao):
+    arquivo = str(tmp_path / "notificacoes.json")
+    retencao(quantidade=2, dias=365)
+    setArquivoPersistencia(arquivo)
+    resetarNotificacoes()
+    for i in range(4):
+        salvarNotificacao(f"Mensagem {i}")
+    (mensal,) = (tmp_path / "notificacoes_arquivo").iterdir()
+    mensal.write_bytes(mensal.read_bytes()[:-6])  # membro gzip rasgado por uma queda
+    for i in range(4, 6):
+        salvarNotificacao(f"Mensagem {i}")
+
+    hoje = datetime.now().strftime("%d/%m/%Y")
+    conteudos = [n["conteudo"] for n in filtrarNotificacoesPorPeriodo(hoje, hoje)["Content"]]
+    # As linhas do arquivo rasgado podem ou não ser recuperadas; as rotações seguintes, sempre
+    assert conteudos[-4:] == [f"Mensagem {i}" for i in range(2, 6)]
+
+def test_rotacao_interrompida_nao_duplica_notificacoes(tmp_path, retencao):
+    arquivo = str(tmp_path / "notificacoes.json")
+    agora = datetime.now()
+    notificacoes = _gravar_historico(arquivo, [agora - timedelta(days=dias) for dias in (200, 100, 1)])
+    retencao(dias=90)
+    aquecerNotificacoes()
+    modulo_notificacao._rotacionar()  # queda antes de regravar o JSON
+
+    periodo = ((agora - timedelta(days=250)).strftime("%d/%m/%Y"), agora.strftime("%d/%m/%Y"))
+    setArquivoPersistencia(arquivo)
+    assert len(listarNotificacoes()["Content"]) == 3
+    assert filtrarNotificacoesPorPeriodo(*periodo)["Content"] == notificacoes
+
+    modulo_notificacao._salvar_notificacoes()  # arquiva as mesmas notificações de novo
+    assert len(os.listdir(tmp_path / "notificacoes_arquivo")) == 4
+    setArquivoPersistencia(arquivo)
+    assert filtrarNotificacoesPorPeriodo(*periodo)["Content"] == notificacoes
+
+def test_periodo_consulta_arquivo_apos_insercao_fora_de_ordem(tmp_path, retencao):
+    arquivo = str(tmp_path / "notificacoes.json")
+    agora = datetime.now()
+    notificacoes = _gravar_historico(arquivo, [agora - timedelta(days=dias) for dias in (200, 100, 1)])
+    retencao(dias=90)
+    aquecerNotificacoes()
+    modulo_notificacao._salvar_notificacoes()
+
+    # Uma notificação mais antiga que as arquivadas entra depois da rotação
+    antiga = {"data": (agora - timedelta(days=300)).isoformat(timespec="seconds"), "conteudo": "Recuperada"}
+    modulo_notificacao._acrescentar_notificacao(antiga)
+    periodo = ((agora - timedelta(days=250)).strftime("%d/%m/%Y"), agora.strftime("%d/%m/%Y"))
+    assert filtrarNotificacoesPorPeriodo(*periodo)["Content"] == notificacoes
+
+    # O limite das arquivadas também vale depois de recarregar
+    setArquivoPersistencia(arquivo)
+    aquecerNotificacoes()
+    modulo_notificacao._acrescentar_notificacao(antiga)
+    assert filtrarNotificacoesPorPeriodo(*periodo)["Content"] == notificacoes
+
+def test_rotacao_nao_bloqueia_acrescimos(tmp_path, retencao, monkeypatch):
+    arquivo = str(tmp_path / "notificacoes.json")
+    agora = datetime.now()
+    notificacoes = _gravar_historico(arquivo, [agora - timedelta(days=dias) for dias in (200, 100, 1)])
+    retencao(dias=90)
+    aquecerNotificacoes()
+    # Entra no meio do prefixo que está sendo arquivado
+    intrusa = {"data": (agora - timedelta(days=150)).isoformat(timespec="seconds"), "conteudo": "Durante"}
+    arquivar_original = modulo_notificacao.arquivar
+
+    def arquivar_com_acrescimo(diretorio, antigas):
+        acrescimo = threading.Thread(target=modulo_notificacao._acrescentar_notificacao, args=(intrusa,))
+        acrescimo.start()
+        acrescimo.join(timeout=3)
+        assert not acrescimo.is_alive()  # a trava do histórico não está presa durante a gravação
+        arquivar_original(diretorio, antigas)
+
+    monkeypatch.setattr(modulo_notificacao, "arquivar", arquivar_com_acrescimo)
+    modulo_notificacao._salvar_notificacoes()
+
+    assert modulo_notificacao._notificacoes == [notificacoes[2], intrusa]
+    assert modulo_notificacao._notificacoes_indice == [intrusa, notificacoes[2]]
+    periodo = ((agora - timedelta(days=250)).strftime("%d/%m/%Y"), agora.strftime("%d/%m/%Y"))
+    assert filtrarNotificacoesPorPeriodo(*periodo)["Content"] == [notificacoes[0], intrusa] + notificacoes[1:]
+
+def test_arquivo_mensal_truncado_e_tolerado(tmp_path, retencao):
+    arquivo = str(tmp_path / "notificacoes.json")
+    data = datetime.now() - timedelta(days=400)
+    notificacoes = _gravar_historico(arquivo, [data, data + timedelta(hours=1)])
+    retencao(dias=90)
+    aquecerNotificacoes()
+    modulo_notificacao._salvar_notificacoes()
+    (mensal,) = (tmp_path / "notificacoes_arquivo").iterdir()
+    mensal.write_bytes(mensal.read_bytes()[:-6])  # queda durante a gravação
+
+    # O trailer do gzip se perdeu, mas as linhas já descomprimidas continuam legíveis
+    resposta = filtrarNotificacoesPorPeriodo(data.strftime("%d/%m/%Y"),
+                                             (data + timedelta(days=1)).strftime("%d/%m/%Y"))
+    assert resposta["Status"] == 200
+    assert resposta["Content"] == notificacoes
@@ -8,13 +8,19 @@ import pytest
 from modulos import planejamento
 from unittest.mock import patch
 from datetime import datetime
-from modulos.lancamento import criarLancamento, resetarDados
+from modulos.lancamento import criarLancamento, removerLancamento, resetarDados
+from modulos.lancamento import setArquivoPersistencia as setArquivoLancamentos
 from modulos.planejamento import (
     calculaDivisaoGastos,
     editarDivisaoGastos,
     obterDivisaoSalva,
     setArquivoPersistencia,
-    resetarPlanejamento)
+    resetarPlanejamento,
+    aquecerPlanejamento,
+    criarLancamentoComPlanejamento,
+    obterAcompanhamentoOrcamento,
+    configurarPeriodoPlanejamento)
+from modulos.planejamento import planejamento as modulo_planejamento
 
 
 # Caminho do arquivo de dados usado pelo módulo
@@ -111,3 +117,161 @@ def test_calcula_divisao_com_dados_reais():
     print(resultado)
     assert resultado["Success"] == 200
     assert isinstance(resultado["Content"], dict)
+
+
+def test_planejamento_lido_apenas_no_primeiro_acesso(tmp_path):
+    arquivo = str(tmp_path / "planejamento.json")
+    setArquivoPersistencia(arquivo)
+    planejamento.calculaDivisaoGastos(5000)
+    modulo_planejamento._salvar_dados()
+
+    setArquivoPersistencia(arquivo)
+    assert modulo_planejamento._dados_planejamento is None
+    assert planejamento.obterLimiteDaCategoria("Moradia") == 1500.0
+    assert modulo_planejamento._dados_planejamento is not None
+
+
+def test_aquecer_planejamento_carrega_arquivo(tmp_path):
+    arquivo = str(tmp_path / "planejamento.json")
+    setArquivoPersistencia(arquivo)
+    planejamento.calculaDivisaoGastos(5000)
+    modulo_planejamento._salvar_dados()
+    setArquivoPersistencia(arquivo)
+
+    aquecerPlanejamento()
+    assert modulo_planejamento._dados_planejamento["salario"] == 5000
+
+
+def test_planejamento_nao_carregado_nao_e_gravado(tmp_path):
+    arquivo = str(tmp_path / "planejamento.json")
+    setArquivoPersistencia(arquivo)
+    modulo_planejamento._salvar_dados()
+    assert not os.path.exists(arquivo)
+
+
+# ---------- TESTES: acompanhamento do orçamento ----------
+@pytest.fixture
+def orcamento(tmp_path):
+    """Planejamento com limite de 1000 para Alimentação e notificações interceptadas"""
+    setArquivoLancamentos(str(tmp_path / "lancamentos.json"))
+    setArquivoPersistencia(str(tmp_path / "planejamento.json"))
+    calculaDivisaoGastos(5000)
+    with patch.object(modulo_planejamento, "enfileirarNotificacao") as enviar:
+        yield enviar
+    configurarPeriodoPlanejamento(1)
+
+
+def _despesa(valor, categoria="Alimentação", data=datetime(2025, 6, 1)):
+    return criarLancamentoComPlanejamento({"descricao": "Compra", "valor": valor, "data": data,
+                                           "tipo": "despesa", "categoria": categoria})
+
+
+def test_notifica_uma_unica_vez_ao_ultrapassar_limite(orcamento, capsys):
+    for valor in (600, 300, 200, 50, 50):
+        assert _despesa(valor)["Status"] == 201
+
+    orcamento.assert_called_once()
+    assert "Alimentação" in orcamento.call_args.args[1]
+    assert capsys.readouterr().out == ""
+    assert obterAcompanhamentoOrcamento()["Content"] == [{
+        "categoria": "Alimentação", "mes": 6, "ano": 2025,
+        "gasto": 1200.0, "limite": 1000.0, "ultrapassado": True}]
+
+
+def test_alerta_usa_chat_id_do_env(orcamento, tmp_path, monkeypatch):
+    import dotenv
+    arquivo_env = tmp_path / ".env"
+    arquivo_env.write_text("TELEGRAM_CHAT_ID=4242\n", encoding="utf-8")
+    carregar = dotenv.load_dotenv
+    monkeypatch.setattr(dotenv, "load_dotenv", lambda: carregar(arquivo_env))
+    monkeypatch.setenv("TELEGRAM_CHAT_ID", "")
+    monkeypatch.delenv("TELEGRAM_CHAT_ID")  # restaurada ao final do teste
+    monkeypatch.setattr(modulo_planejamento, "_CHAT_ID_VALIDO", None)
+
+    _despesa(1200)
+    assert orcamento.call_args.args[0] == 4242
+
+
+def test_notifica_de_novo_depois_de_voltar_ao_limite(orcamento):
+    _despesa(700)
+    acima = _despesa(400)["Content"]["id"]
+    assert orcamento.call_count == 1
+
+    removerLancamento(acima)
+    _despesa(100)
+    assert orcamento.call_count == 1
+    _despesa(300)
+    assert orcamento.call_count == 2
+
+
+def test_categoria_ja_acima_do_limite_nao_notifica(orcamento):
+    criarLancamento({"descricao": "Mercado", "valor": 1500.0, "data": datetime(2025, 6, 1),
+                     "tipo": "despesa", "categoria": "Alimentação"})
+    _despesa(10)
+    orcamento.assert_not_called()
+
+
+def test_novo_planejamento_reavalia_limite(orcamento):
+    _despesa(1100)
+    assert orcamento.call_count == 1
+
+    calculaDivisaoGastos(10000)  # limite de Alimentação passa para 2000
+    _despesa(500)
+    assert orcamento.call_count == 1
+    _despesa(500)
+    assert orcamento.call_count == 2
+
+
+def test_categorias_independentes(orcamento):
+    _despesa(1100)
+    _despesa(300, "Transporte")  # limite de 250
+    _despesa(10, "Transporte")
+    assert [chamada.args[1].rsplit(" ", 1)[-1] for chamada in orcamento.call_args_list] == [
+        "Alimentação", "Transporte"]
+
+
+def test_limite_da_categoria_com_acento():
+    calculaDivisaoGastos(5000)
+    assert planejamento.obterLimiteDaCategoria("Saúde") == 500.0
+    assert planejamento.obterLimiteDaCategoria("SAÚDE") == 500.0
+    assert planejamento.obterLimiteDaCategoria("Inexistente") == float("inf")
+
+
+def test_limite_vale_por_mes(orcamento):
+    # Um ano inteiro gastando 900 por mês: nenhum mês ultrapassa o limite de 1000
+    for mes in range(1, 13):
+        _despesa(900, data=datetime(2024, mes, 10))
+    orcamento.assert_not_called()
+
+    _despesa(1100, data=datetime(2025, 1, 5))
+    _despesa(50, data=datetime(2025, 1, 6))
+    _despesa(1100, data=datetime(2025, 2, 5))  # novo mês: alerta de novo
+    assert orcamento.call_count == 2
+
+
+def test_despesa_retroativa_conta_no_seu_mes(orcamento):
+    _despesa(900, data=datetime(2025, 5, 10))
+    _despesa(900, data=datetime(2025, 6, 10))
+    orcamento.assert_not_called()
+
+    _despesa(200, data=datetime(2025, 5, 20))
+    assert orcamento.call_count == 1
+    assert [(e["mes"], e["ultrapassado"]) for e in obterAcompanhamentoOrcamento()["Content"]] == [
+        (5, True), (6, False)]
+
+
+def test_periodo_de_varios_meses(orcamento):
+    assert configurarPeriodoPlanejamento(3)["Success"] == 200
+    for mes in (4, 5):
+        _despesa(1000, data=datetime(2025, mes, 1))
+    orcamento.assert_not_called()
+
+    _despesa(1100, data=datetime(2025, 6, 1))  # 3100 nos três meses > 3 x 1000
+    assert orcamento.call_count == 1
+    _despesa(10, data=datetime(2025, 7, 1))    # período maio-julho: 2110
+    assert orcamento.call_count == 1
+
+
+@pytest.mark.parametrize("meses", [0, -1, 1.5, "2"])
+def test_periodo_invalido(meses):
+    assert configurarPeriodoPlanejamento(meses)["Error"] == 400
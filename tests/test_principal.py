@@ -1,3 +1,6 @@
+import os
+import subprocess
+import sys
 import pytest
 from datetime import datetime
 from modulos.lancamento import (
@@ -119,3 +122,30 @@ def test_gerar_relatorio_e_comparativo(lancamento_teste):
     comparativo = gerar_comparativo(2024, 2025, PDF=False)
     assert comparativo["Status"] == 200
     assert "diferencas" in comparativo["Content"]
+
+# === Teste de importação (bibliotecas pesadas só no primeiro uso) ===
+
+def test_importar_modulos_nao_carrega_bibliotecas_pesadas():
+    codigo = (
+        "import sys\n"
+        "import modulos.lancamento, modulos.relatorio, modulos.notificacao, modulos.planejamento\n"
+        "print(','.join(m for m in ('matplotlib', 'fpdf', 'numpy', 'requests', 'dotenv') if m in sys.modules))\n"
+    )
+    raiz = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    resultado = subprocess.run([sys.executable, "-c", codigo], cwd=raiz,
+                               capture_output=True, text=True, check=True)
+    assert resultado.stdout.strip() == ""
+
+
+def test_importar_modulos_nao_le_arquivos_de_dados():
+    codigo = (
+        "import modulos.lancamento, modulos.notificacao, modulos.planejamento\n"
+        "from modulos.lancamento import lancamento\n"
+        "from modulos.notificacao import notificacao\n"
+        "from modulos.planejamento import planejamento\n"
+        "print(lancamento._armazenamento, notificacao._notificacoes, planejamento._dados_planejamento)\n"
+    )
+    raiz = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    resultado = subprocess.run([sys.executable, "-c", codigo], cwd=raiz,
+                               capture_output=True, text=True, check=True)
+    assert resultado.stdout.strip() == "None None None"
@@ -1,6 +1,25 @@
+import os
+import shutil
+import pytest
+import threading
 from modulos.relatorio import *
+from modulos.relatorio import relatorio as modulo_relatorio
+from modulos.lancamento import (
+    criarLancamento, editarLancamento, removerLancamento, setArquivoPersistencia, setArmazenamento,
+    obterVersaoDados, obterSnapshotLancamentos
+)
 from datetime import datetime
 
+ARQUIVO_DADOS = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "lancamentos.json")
+
+# Fixture: cada teste usa uma cópia do ledger de testes (2020-2025)
+@pytest.fixture(autouse=True)
+def ledger_de_teste(tmp_path):
+    arquivo = tmp_path / "lancamentos.json"
+    shutil.copy(ARQUIVO_DADOS, arquivo)
+    setArmazenamento("memoria")
+    setArquivoPersistencia(str(arquivo))
+
 # --- Casos de testes automatizados para a geração do relatório ---
 def test_gerar_relatorio_financeiro_sucesso():
     periodo = {"data_inicio": datetime(2025, 1, 1),
@@ -31,6 +50,27 @@ def test_gerar_relatorio_financeiro_periodo_invalido():
     assert response["Content"] == "Período inválido."
 
 
+def test_gerar_relatorio_financeiro_confere_com_soma_manual():
+    inicio, fim = datetime(2024, 1, 1), datetime(2025, 1, 1)
+    lancamentos = obterSnapshotLancamentos()
+    esperado = {"receitas": {}, "despesas": {}}
+    saldo_inicial = 0.0
+    for l in lancamentos:
+        sinal = 1 if l["tipo"] == "receita" else -1
+        if l["data"] < inicio:
+            saldo_inicial += sinal * l["valor"]
+        elif l["data"] < fim:
+            grupo = esperado["receitas" if sinal == 1 else "despesas"]
+            grupo[l["categoria"]] = grupo.get(l["categoria"], 0.0) + l["valor"]
+
+    relatorio = gerar_relatorio_financeiro({"data_inicio": inicio, "data_final": fim})["Content"]
+    assert relatorio["saldoInicial"] == pytest.approx(saldo_inicial, abs=0.01)
+    for chave in ("receitas", "despesas"):
+        categorias_ = {c: v for c, v in relatorio[chave].items() if c != "total"}
+        assert categorias_ == pytest.approx(esperado[chave], abs=0.01)
+        assert relatorio[chave]["total"] == pytest.approx(sum(esperado[chave].values()), abs=0.01)
+
+
 # --- Casos de testes automatizados para a geraçao do comparativo ---
 
 def test_gerar_comparativo_sucesso():
@@ -43,4 +83,190 @@ def test_gerar_comparativo_sucesso():
 def test_gerar_comparativo_ano_invalido():
     response = gerar_comparativo(-2024, 2025)
     assert response["Status"] == 400
-    assert response["Content"] == "Ano inválido"
\ No newline at end of file
+    assert response["Content"] == "Ano inválido"
+
+
+# --- Casos de testes automatizados para o snapshot compartilhado ---
+
+def test_snapshot_reaproveitado_enquanto_dados_nao_mudam():
+    versao = obterVersaoDados()
+    assert obterSnapshotLancamentos() is obterSnapshotLancamentos()
+    assert obterVersaoDados() == versao
+
+
+def test_relatorio_ve_alteracoes_em_memoria():
+    periodo = {"data_inicio": datetime(2023, 1, 1), "data_final": datetime(2024, 1, 1)}
+    antes = gerar_relatorio_financeiro(periodo)["Content"]
+
+    id_lanc = criarLancamento({"descricao": "Bônus", "valor": 500.0, "data": datetime(2023, 3, 1),
+                               "tipo": "receita", "categoria": "Salario"})["Content"]["id"]
+    depois = gerar_relatorio_financeiro(periodo)["Content"]
+    assert depois["receitas"]["total"] == round(antes["receitas"]["total"] + 500.0, 2)
+
+    removerLancamento(id_lanc)
+    assert gerar_relatorio_financeiro(periodo)["Content"]["receitas"] == antes["receitas"]
+
+
+def test_relatorio_aplica_alteracoes_sem_reler_o_snapshot(monkeypatch, tmp_path):
+    periodo = {"data_inicio": datetime(2023, 1, 1), "data_final": datetime(2024, 1, 1)}
+    gerar_relatorio_financeiro(periodo)
+
+    def falhar():
+        raise AssertionError("snapshot relido")
+
+    monkeypatch.setattr("modulos.relatorio.relatorio.obterSnapshotLancamentos", falhar)
+    dados = {"descricao": "Extra", "valor": 10.0, "tipo": "despesa", "categoria": "Lazer"}
+    ids = [criarLancamento({**dados, "data": datetime(2023, 1 + i, 5)})["Content"]["id"] for i in range(6)]
+    gerar_relatorio_financeiro(periodo)
+    editarLancamento(ids[0], {**dados, "valor": 99.0, "data": datetime(2022, 12, 31)})
+    removerLancamento(ids[1])
+    editarLancamento(ids[2], {**dados, "tipo": "receita", "categoria": "Salario", "data": datetime(2023, 7, 1)})
+    incremental = gerar_relatorio_financeiro(periodo)["Content"]
+    comparativo = gerar_comparativo_anos([2022, 2023])["Content"]
+
+    monkeypatch.undo()
+    setArquivoPersistencia(str(tmp_path / "lancamentos.json"))  # força a releitura completa
+    assert gerar_relatorio_financeiro(periodo)["Content"] == incremental
+    assert gerar_comparativo_anos([2022, 2023])["Content"] == comparativo
+
+
+# --- Casos de testes automatizados para o comparativo de vários anos ---
+
+def test_gerar_comparativo_anos_confere_com_relatorios_anuais():
+    anos = list(range(2016, 2026))
+    response = gerar_comparativo_anos(anos)
+    assert response["Status"] == 200
+    assert list(response["Content"]) == anos
+
+    for ano, resumo in response["Content"].items():
+        relatorio = gerar_relatorio_financeiro({"data_inicio": datetime(ano, 1, 1),
+                                                "data_final": datetime(ano + 1, 1, 1)})
+        if relatorio["Status"] == 404:
+            assert resumo["lancamentos"] == 0
+            assert resumo["receitas"] == {"total": 0.0} and resumo["despesas"] == {"total": 0.0}
+            continue
+        for chave in ("saldoInicial", "receitas", "despesas", "saldoFinal", "variacao"):
+            assert resumo[chave] == relatorio["Content"][chave]
+
+
+@pytest.mark.parametrize("anos", [[], [2024, -1], [2024, "2025"], [10000]])
+def test_gerar_comparativo_anos_invalidos(anos):
+    response = gerar_comparativo_anos(anos)
+    assert response["Status"] == 400
+    assert response["Content"] == "Ano inválido"
+
+
+# --- Casos de testes automatizados para a exportação em PDF ---
+
+@pytest.fixture
+def diretorio_pdf(tmp_path):
+    diretorio = tmp_path / "pdf"
+    definir_diretorio_pdf(str(diretorio))
+    yield diretorio
+    definir_diretorio_pdf(os.path.join(os.path.dirname(os.path.dirname(ARQUIVO_DADOS)), "pdf_files"))
+
+
+def test_exportar_pdf_em_segundo_plano(diretorio_pdf):
+    ids = [
+        gerar_relatorio_financeiro({"data_inicio": datetime(2025, mes, 1), "data_final": datetime(2025, mes + 1, 1)},
+                                   PDF=True, assincrono=True)["Content"]["pdf"]
+        for mes in (5, 6, 7)
+    ]
+    ids.append(gerar_comparativo(2024, 2025, PDF=True, assincrono=True)["Content"]["pdf"])
+
+    caminhos = [aguardar_pdf(id_trabalho, timeout=60) for id_trabalho in ids]
+    assert all(c["Status"] == 200 for c in caminhos)
+    assert sorted(os.listdir(diretorio_pdf)) == [
+        "comparativo_2024_2025.pdf",
+        "relatorio_2025-05-01_2025-06-01.pdf",
+        "relatorio_2025-06-01_2025-07-01.pdf",
+        "relatorio_2025-07-01_2025-08-01.pdf",
+    ]
+    assert all((diretorio_pdf / nome).read_bytes().startswith(b"%PDF") for nome in os.listdir(diretorio_pdf))
+    # O resultado é entregue uma vez
+    assert aguardar_pdf(ids[0])["Status"] == 404
+
+
+def test_exportar_pdf_sincrono_usa_diretorio_configurado(diretorio_pdf):
+    gerar_relatorio_financeiro({"data_inicio": datetime(2025, 1, 1), "data_final": datetime(2026, 1, 1)}, PDF=True)
+    assert (diretorio_pdf / "relatorio.pdf").exists()
+
+
+def test_trabalhos_nao_aguardados_nao_se_acumulam(diretorio_pdf, monkeypatch):
+    monkeypatch.setattr(modulo_relatorio, "_LIMITE_TRABALHOS_CONCLUIDOS", 2)
+    resumo = {"resumo": "Relatório"}
+    terminados = threading.Semaphore(0)
+    concluir = modulo_relatorio._concluir_trabalho
+
+    def concluir_e_avisar(id_trabalho):
+        concluir(id_trabalho)
+        terminados.release()
+
+    monkeypatch.setattr(modulo_relatorio, "_concluir_trabalho", concluir_e_avisar)
+    ids = [exportar_pdf(resumo, f"relatorio_{i}.pdf") for i in range(3)]
+    assert all(terminados.acquire(timeout=60) for _ in ids)
+
+    assert not set(ids) & set(modulo_relatorio._trabalhos)
+    assert len(modulo_relatorio._concluidos) == 2
+    assert aguardar_pdf(ids[0])["Status"] == 404
+    assert aguardar_pdf(ids[2])["Status"] == 200
+    assert not modulo_relatorio._concluidos.get(ids[2])
+
+
+# --- Casos de testes automatizados para o gráfico sem interface ---
+
+def _relatorio_2025():
+    return gerar_relatorio_financeiro({"data_inicio": datetime(2025, 1, 1), "data_final": datetime(2026, 1, 1)})
+
+
+@pytest.mark.parametrize("formato,assinatura", [("png", b"\x89PNG"), ("svg", b"<?xml")])
+def test_grafico_pizza_sem_interface(formato, assinatura):
+    response = gerar_grafico_pizza_despesas(_relatorio_2025(), formato=formato)
+    assert response["Status"] == 200
+    assert response["Content"].startswith(assinatura)
+
+
+def test_grafico_pizza_reaproveita_cache(monkeypatch):
+    primeiro = gerar_grafico_pizza_despesas(_relatorio_2025(), formato="png")["Content"]
+
+    def falhar(*args):
+        raise AssertionError("matplotlib não deveria ser chamado")
+
+    monkeypatch.setattr("modulos.relatorio.relatorio._renderizar_grafico_pizza", falhar)
+    assert gerar_grafico_pizza_despesas(_relatorio_2025(), formato="png")["Content"] is primeiro
+
+
+def test_grafico_pizza_em_segundo_plano():
+    relatorio = gerar_relatorio_financeiro({"data_inicio": datetime(2025, 5, 1), "data_final": datetime(2025, 6, 1)})
+    response = gerar_grafico_pizza_despesas(relatorio, formato="svg", assincrono=True)
+    assert response["Status"] == 202
+    grafico = aguardar_grafico(response["Content"], timeout=60)
+    assert grafico["Status"] == 200
+    assert grafico["Content"].startswith(b"<?xml")
+
+
+def test_cache_de_graficos_entre_threads(monkeypatch):
+    monkeypatch.setattr(modulo_relatorio, "_LIMITE_CACHE_GRAFICOS", 4)
+    monkeypatch.setattr(modulo_relatorio, "_cache_graficos", modulo_relatorio.OrderedDict())
+    erros = []
+
+    def usar_cache(deslocamento):
+        try:
+            for i in range(5000):
+                chave = str((i + deslocamento) % 8)
+                if modulo_relatorio._obter_grafico(chave) is None:
+                    modulo_relatorio._guardar_grafico(chave, b"imagem")
+        except Exception as erro:
+            erros.append(erro)
+
+    threads = [threading.Thread(target=usar_cache, args=(n,)) for n in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert not erros
+    assert len(modulo_relatorio._cache_graficos) <= 4
+
+
+def test_grafico_pizza_formato_invalido():
+    assert gerar_grafico_pizza_despesas(_relatorio_2025(), formato="gif")["Status"] == 400